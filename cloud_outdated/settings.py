@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
 import os
+from datetime import timedelta
 from pathlib import Path
 
 import environ
@@ -270,9 +271,87 @@ structlog.configure(
 )
 
 # Service polling configurations
+POLLING_ENGINE = "threads"  # one of services.tasks.POLLING_ENGINES
 POLLING_THREADS = 4
+POLLING_HOST_CONCURRENCY = 2  # max concurrent requests to a single host
+# adaptive schedule of services.tasks.poll_due, see ServicePollState.schedule
+POLLING_MIN_INTERVAL = timedelta(hours=2)
+POLLING_DEFAULT_INTERVAL = timedelta(hours=12)
+POLLING_MAX_INTERVAL = timedelta(days=2)
+POLLING_TARGET_CHANGES_PER_POLL = 0.25
+POLLING_CHANGE_RATE_SMOOTHING = 0.3
+# consecutive failures opening the circuit breaker of a source, see ServicePollState
+POLLING_BREAKER_THRESHOLD = 3
+POLLING_BREAKER_MAX_BACKOFF = timedelta(days=7)  # max interval between probes
+# due services are split into shards polled by separate Lambda invocations
+POLLING_SHARD_SIZE = 8
+POLLING_SHARD_TIME_LIMIT = timedelta(seconds=540)  # Lambda timeout is 600s
+POLLING_COMMIT_MARGIN = timedelta(seconds=60)  # left to commit fetched services
+POLLING_LEASE = timedelta(minutes=15)  # longer than the Lambda timeout
+POLLING_REGION_CONCURRENCY = 8  # max regions polled concurrently by a service
+POLLING_AWS_PAGE_SIZE = 100  # items per page of paginated AWS API calls
+# latency stats of the PollResult admin, a recent window unless filtered by date
+POLLING_STATS_WINDOW = timedelta(days=7)
+POLLING_STATS_MAX_RESULTS = 20000  # latest results the stats are computed from
+# regions of services polled in every region, see services.tasks.in_regions
+POLLING_GCP_REGIONS = [
+    "asia-east1",
+    "asia-northeast1",
+    "asia-south1",
+    "asia-southeast1",
+    "australia-southeast1",
+    "europe-central2",
+    "europe-north1",
+    "europe-west1",
+    "europe-west2",
+    "europe-west3",
+    "northamerica-northeast1",
+    "southamerica-east1",
+    "us-central1",
+    "us-east1",
+    "us-east4",
+    "us-west1",
+]
+# polled where botocore knows the service is available, see services.tasks.aws_regions
+POLLING_AWS_REGIONS = [
+    "ap-northeast-1",
+    "ap-northeast-2",
+    "ap-northeast-3",
+    "ap-south-1",
+    "ap-southeast-1",
+    "ap-southeast-2",
+    "ca-central-1",
+    "eu-central-1",
+    "eu-north-1",
+    "eu-west-1",
+    "eu-west-2",
+    "eu-west-3",
+    "sa-east-1",
+    "us-east-1",
+    "us-east-2",
+    "us-west-1",
+    "us-west-2",
+]
+# raw source responses recorded by record_poll_fixtures, replayed by benchmark_poll_fns
+POLLING_FIXTURES_DIR = BASE_DIR / "services" / "tests" / "fixtures" / "sources"
+
+# raw source payloads kept for reparsing, see services.snapshots
+SNAPSHOT_STORAGE = env.str("SNAPSHOT_STORAGE", default="")  # "local", "s3" or "" (off)
+SNAPSHOT_DIR = BASE_DIR / "snapshots"
+SNAPSHOT_S3_BUCKET = env.str("SNAPSHOT_S3_BUCKET", default="")
+SNAPSHOT_S3_PREFIX = "snapshots/"
+# Google API discovery documents bundled with the deploy, see refresh_gcp_discovery
+GCP_DISCOVERY_DIR = BASE_DIR / "services" / "discovery"
+GCP_DISCOVERY_APIS = ["sqladmin:v1"]
+HTTP_CONNECT_TIMEOUT = 5  # in seconds
+HTTP_READ_TIMEOUT = 30  # in seconds
+HTTP_MAX_TRIES = 3
+HTTP_POOL_CONNECTIONS = 20  # number of hosts to keep connection pools for
+HTTP_POOL_MAXSIZE = POLLING_HOST_CONCURRENCY
 NOTIFICATIONS_MAX_RETRIES = 10
 NOTIFICATIONS_MAX_TIME = 60 * 5
+# version events newer than this may still be in uncommitted poll transactions
+NOTIFICATIONS_CURSOR_LAG = timedelta(minutes=10)
 
 GOOGLE_ANALYTICS_GTAG_PROPERTY_ID = env("GOOGLE_ANALYTICS_GTAG_PROPERTY_ID")
 
@@ -0,0 +1,48 @@
+import time
+from unittest.mock import Mock
+
+from django.test import SimpleTestCase
+
+from core.util import AlertBuffer
+
+
+class AlertBufferTestCase(SimpleTestCase):
+    def test_alerts_are_deduplicated_in_one_digest(self):
+        send = Mock()
+
+        with AlertBuffer(send) as alerts:
+            alerts.add(("aws_es", "ScrappingError"), "aws_es is broken")
+            alerts.add(("aws_es", "ScrappingError"), "aws_es is still broken")
+            alerts.add(("aws_es", "Timeout"), "aws_es timed out")
+            alerts.add(("aws_kafka", "ScrappingError"), "aws_kafka is broken")
+            send.assert_not_called()
+
+        send.assert_called_once()
+        digest = send.call_args.args[0]
+        assert digest.startswith("3 alerts:")
+        assert "aws_es is broken\n(occurred 2 times)" in digest
+        assert "still broken" not in digest
+        assert "aws_es timed out" in digest
+        assert "aws_kafka is broken" in digest
+
+    def test_nothing_sent_without_alerts(self):
+        send = Mock()
+
+        with AlertBuffer(send):
+            pass
+
+        send.assert_not_called()
+
+    def test_flushed_at_deadline(self):
+        send = Mock()
+
+        with AlertBuffer(send) as alerts:
+            alerts.flush_at(time.monotonic() + 0.05)
+            alerts.add(("aws_es", "ScrappingError"), "aws_es is broken")
+            time.sleep(0.2)
+            send.assert_called_once()
+
+            alerts.add(("aws_kafka", "ScrappingError"), "aws_kafka is broken")
+
+        assert send.call_count == 2
+        assert "aws_kafka" in send.call_args.args[0]
@@ -1,3 +1,6 @@
+import threading
+import time
+
 from anymail.message import AnymailMessageMixin
 from django.conf import settings
 from templated_mail.mail import BaseEmailMessage
@@ -10,3 +13,78 @@ class NotifyOperatorEmail(BaseEmailMessage, AnymailMessageMixin):
 def notify_operator(message):
     ctx = {"message": message}
     NotifyOperatorEmail(context=ctx).send(to=settings.OPERATORS_EMAIL)
+
+
+class AlertBuffer:
+    """Operator alerts collected in memory and sent as a single digest.
+
+    Alerts are deduplicated by key, e.g. (service, error type), only the
+    first message of a key is kept along with the number of times it was
+    added. The digest is sent by `flush`, at the latest when the deadline
+    set with `flush_at` is reached, and by `close`.
+
+    Safe to use from multiple threads.
+
+    Attributes:
+        send: sends the digest message, `notify_operator` by default
+    """
+
+    def __init__(self, send=notify_operator):
+        self.send = send
+        self._alerts = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, key, message):
+        """Buffer an alert.
+
+        Args:
+            key (tuple): deduplication key
+            message (str): alert message
+        """
+        with self._lock:
+            if key in self._alerts:
+                self._alerts[key][1] += 1
+            else:
+                self._alerts[key] = [message, 1]
+
+    def flush(self):
+        """Send buffered alerts as a single digest, if any."""
+        with self._lock:
+            alerts = list(self._alerts.values())
+            self._alerts = {}
+        if not alerts:
+            return
+
+        sections = [
+            message if count == 1 else f"{message}\n(occurred {count} times)"
+            for message, count in alerts
+        ]
+        self.send(f"{len(alerts)} alerts:\n\n" + "\n\n".join(sections))
+
+    def flush_at(self, deadline):
+        """Flush buffered alerts once a deadline is reached, e.g. before a timeout.
+
+        Args:
+            deadline (float): `time.monotonic()` to flush at
+        """
+        self._cancel_timer()
+        self._timer = threading.Timer(max(deadline - time.monotonic(), 0), self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def close(self):
+        """Cancel the deadline flush and flush remaining alerts."""
+        self._cancel_timer()
+        self.flush()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
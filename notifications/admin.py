@@ -1,6 +1,11 @@
 from django.contrib import admin
 
-from notifications.models import Notification, NotificationItem, NotificationPixel
+from notifications.models import (
+    Notification,
+    NotificationCursor,
+    NotificationItem,
+    NotificationPixel,
+)
 
 
 class NotificationItemInlineAdmin(admin.TabularInline):
@@ -49,3 +54,10 @@ class NotificationPixelAdmin(admin.ModelAdmin):
     date_hierarchy = "created"
     list_select_related = ["notification"]
     raw_id_fields = ["notification"]
+
+
+@admin.register(NotificationCursor)
+class NotificationCursorAdmin(admin.ModelAdmin):
+    list_display = ["id", "name", "position", "updated"]
+    search_fields = ["id", "name"]
+    date_hierarchy = "created"
@@ -0,0 +1,48 @@
+# Generated by Django 3.2.12 on 2026-10-18 15:40
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_notificationpixel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationCursor",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                (
+                    "position",
+                    models.DateTimeField(
+                        help_text="Changes up to this timestamp have been notified"
+                    ),
+                ),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ("-created",),
+                "abstract": False,
+            },
+        ),
+    ]
@@ -139,3 +139,20 @@ class NotificationPixel(BaseModelMixin):
         on_delete=models.CASCADE,
     )
     metadata = models.JSONField()
+
+
+class NotificationCursor(BaseModelMixin):
+    """Position of a notification planner in the version changes.
+
+    Version events and release or deprecation dates up to `position` have
+    been handled by the last successful run of the planner.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    position = models.DateTimeField(
+        help_text="Changes up to this timestamp have been notified"
+    )
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{str(self.id)} | {self.name} {self.position}"
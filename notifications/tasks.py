@@ -1,17 +1,22 @@
 import logging
+from collections import defaultdict
 
 import backoff
 import structlog
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from services.models import Version
+from django.db.models import Q
+from django.utils import timezone
+from services.models import Version, VersionEvent
 from subscriptions.models import Subscription
 
-from notifications.models import Notification, NotificationItem
+from notifications.models import Notification, NotificationCursor, NotificationItem
 
 UserProfile = get_user_model()
 logger = structlog.get_logger(__name__)
 
+NOTIFICATIONS_CURSOR = "send_notifications"
+
 # daily (or n times per day) task that:
 # get all Subscriptions that are not disabled
 # get all Versions that are not deprecated and released is <= than today
@@ -25,20 +30,108 @@ def send_notifications():
 
     A user should get a grouped notification with all the new versions
     for the services they are subscribed to.
+
+    Only services which versions changed since the last successful run and
+    subscriptions created since then are planned, see `plan_notifications`,
+    the run ends after looking them up when there are none. The first run,
+    without a cursor, goes through every active user.
     """
-    for user in UserProfile.objects.filter(is_active=True):
-        send_user_notification(user)
+    until = timezone.now() - settings.NOTIFICATIONS_CURSOR_LAG
+    cursor = NotificationCursor.objects.filter(name=NOTIFICATIONS_CURSOR).first()
+
+    if cursor is None:
+        for user in UserProfile.objects.filter(is_active=True):
+            send_user_notification(user)
+        NotificationCursor.objects.create(name=NOTIFICATIONS_CURSOR, position=until)
+        return
+
+    plan = plan_notifications(cursor.position, until)
+    if not plan:
+        logger.info("Nothing changed, skipping.", since=cursor.position.isoformat())
+        return
+
+    for user in UserProfile.objects.filter(id__in=list(plan), is_active=True):
+        send_user_notification(user, plan[user.id])
+
+    # only moved once every user was handled, a failed run is retried
+    cursor.position = until
+    cursor.save()
+
+
+def plan_notifications(since, until):
+    """Get the services every user may have to be notified about.
+
+    Users are planned for the services they are subscribed to which
+    versions changed, see `get_changed_services`, and for services they
+    subscribed to, or subscribed to again, in the meantime.
+
+    Args:
+        since (datetime.datetime): changes already handled up to this time
+        until (datetime.datetime): changes to handle up to this time
+
+    Returns:
+        dict: set[str] of service keys by user id
+    """
+    subscriptions = Subscription.objects.filter(disabled=None).order_by()
+    # unsubscribing disables the subscription, subscribing again creates a new one
+    planned = list(
+        subscriptions.filter(created__gt=since, created__lte=until).values_list(
+            "user", "service"
+        )
+    )
+    service_keys = get_changed_services(since, until)
+    if service_keys:
+        planned += subscriptions.filter(service__in=service_keys).values_list(
+            "user", "service"
+        )
+
+    plan = defaultdict(set)
+    for user_id, service in planned:
+        plan[user_id].add(service)
+    return dict(plan)
+
+
+def get_changed_services(since, until):
+    """Get services which available or unsupported versions changed.
+
+    Versions change with polling, see `services.models.VersionEvent`, and
+    when their release or deprecation date is reached.
+
+    Args:
+        since (datetime.datetime): changes already handled up to this time
+        until (datetime.datetime): changes to handle up to this time
+
+    Returns:
+        set[str]: service keys as stored in db
+    """
+    events = (
+        VersionEvent.objects.filter(created__gt=since, created__lte=until)
+        .order_by()
+        .values_list("service", flat=True)
+    )
+    # see `Version.available` and `Version.unsupported`
+    dates_reached = (
+        Version.objects.filter(
+            Q(released__gt=since.date(), released__lte=until.date())
+            | Q(deprecated__gte=since.date(), deprecated__lt=until.date())
+        )
+        .order_by()
+        .values_list("service", flat=True)
+    )
+    return set(events.union(dates_reached))
 
 
-def send_user_notification(user):
+def send_user_notification(user, service_keys=None):
     """Send user notification for new versions.
 
     Args:
         user (users.models.UserProfile): user instance
+        service_keys (list[str]): only notify about these services if set
     """
-    subscribed_service_keys = Subscription.objects.filter(
-        user=user, disabled=None
-    ).values_list("service", flat=True)
+    subscriptions = Subscription.objects.filter(user=user, disabled=None)
+    if service_keys is not None:
+        subscriptions = subscriptions.filter(service__in=service_keys)
+    subscribed_service_keys = subscriptions.values_list("service", flat=True)
 
     subscribed_services_count = len(subscribed_service_keys)
     if subscribed_services_count == 0:
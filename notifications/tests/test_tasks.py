@@ -3,8 +3,10 @@ from unittest.mock import call, patch
 
 from django.test import TestCase
 from django.utils import timezone
-from notifications.models import Notification, NotificationItem
+from notifications.models import Notification, NotificationCursor, NotificationItem
 from notifications.tasks import (
+    NOTIFICATIONS_CURSOR,
+    get_changed_services,
     get_deprecated_versions_for_user,
     get_new_versions_for_user,
     notify_user,
@@ -12,6 +14,7 @@ from notifications.tasks import (
     send_user_notification,
 )
 from notifications.tests.factories import NotificationFactory, NotificationItemFactory
+from services.models import VersionEvent
 from services.tests.factories import VersionFactory
 from subscriptions.tests.factories import SubscriptionFactory
 from users.tests.factories import UserProfileFactory
@@ -37,6 +40,107 @@ class SendNotificationsTestCase(TestCase):
         calls = [call(user_1), call(user_2)]
         mocked_send_user_notification.assert_has_calls(calls, any_order=True)
 
+    @patch("notifications.tasks.send_user_notification")
+    def test_first_run_creates_cursor(self, mocked_send_user_notification):
+        send_notifications()
+
+        cursor = NotificationCursor.objects.get(name=NOTIFICATIONS_CURSOR)
+        assert cursor.position < timezone.now() - timedelta(minutes=9)
+
+
+class IncrementalSendNotificationsTestCase(TestCase):
+    def setUp(self):
+        self.cursor = NotificationCursor.objects.create(
+            name=NOTIFICATIONS_CURSOR, position=timezone.now() - timedelta(hours=6)
+        )
+
+    def add_event(self, service, created):
+        version = VersionFactory(service=service, created=created)
+        return VersionEvent.objects.create(
+            service=service, version=version, kind=VersionEvent.ADDED, created=created
+        )
+
+    @patch("notifications.tasks.send_user_notification")
+    def test_nothing_changed(self, mocked_send_user_notification):
+        UserProfileFactory(is_active=True)
+        old_position = self.cursor.position
+
+        with self.assertNumQueries(3):
+            send_notifications()
+
+        mocked_send_user_notification.assert_not_called()
+        self.cursor.refresh_from_db()
+        assert self.cursor.position == old_position
+
+    @patch("notifications.tasks.send_user_notification")
+    def test_only_subscribers_of_changed_services(self, mocked_send_user_notification):
+        self.add_event("aws_kafka", timezone.now() - timedelta(hours=1))
+        self.add_event("aws_es", timezone.now() - timedelta(days=1))  # already handled
+        kafka_user = SubscriptionFactory(service="aws_kafka").user
+        SubscriptionFactory(user=kafka_user, service="aws_eks")
+        SubscriptionFactory(service="aws_es")
+        SubscriptionFactory(service="aws_kafka", disabled=timezone.now())
+        SubscriptionFactory(service="aws_kafka", user__is_active=False)
+
+        send_notifications()
+
+        mocked_send_user_notification.assert_called_once_with(kafka_user, {"aws_kafka"})
+        self.cursor.refresh_from_db()
+        assert self.cursor.position > timezone.now() - timedelta(minutes=11)
+
+    @patch("notifications.tasks.notify_user")
+    def test_new_subscription_to_unchanged_service(self, mocked_notify_user):
+        version = VersionFactory(
+            service="aws_kafka", created=timezone.now() - timedelta(days=30)
+        )
+        user = SubscriptionFactory(
+            service="aws_kafka", created=timezone.now() - timedelta(hours=1)
+        ).user
+        SubscriptionFactory(user=user, service="aws_eks")
+
+        send_notifications()
+
+        mocked_notify_user.assert_called_once_with(user, [str(version.id)])
+
+    @patch("notifications.tasks.send_user_notification")
+    def test_events_within_lag_are_left_for_next_run(
+        self, mocked_send_user_notification
+    ):
+        self.add_event("aws_kafka", timezone.now() - timedelta(minutes=1))
+        SubscriptionFactory(service="aws_kafka")
+
+        send_notifications()
+
+        mocked_send_user_notification.assert_not_called()
+
+    @patch("notifications.tasks.send_user_notification")
+    def test_failed_run_keeps_cursor(self, mocked_send_user_notification):
+        mocked_send_user_notification.side_effect = RuntimeError("SES down")
+        self.add_event("aws_kafka", timezone.now() - timedelta(hours=1))
+        SubscriptionFactory(service="aws_kafka")
+        old_position = self.cursor.position
+
+        with self.assertRaises(RuntimeError):
+            send_notifications()
+
+        self.cursor.refresh_from_db()
+        assert self.cursor.position == old_position
+
+
+class GetChangedServicesTestCase(TestCase):
+    def test_release_and_deprecation_dates_reached(self):
+        today = timezone.now().date()
+        VersionFactory(service="aws_kafka", released=today)
+        VersionFactory(service="aws_es", deprecated=today - timedelta(days=1))
+        VersionFactory(service="aws_eks", released=today + timedelta(days=1))
+        VersionFactory(service="aws_mq", deprecated=today)
+
+        changed = get_changed_services(
+            timezone.now() - timedelta(days=1), timezone.now()
+        )
+
+        assert changed == {"aws_kafka", "aws_es"}
+
 
 class SendUserNotificationTestCase(TestCase):
     def setUp(self):
@@ -64,6 +168,17 @@ class SendUserNotificationTestCase(TestCase):
 
         mocked_notify_user.assert_called_once()
 
+    @patch("notifications.tasks.notify_user")
+    def test_limited_to_services(self, mocked_notify_user):
+        SubscriptionFactory(user=self.user, service="aws_kafka")
+        kafka_version = VersionFactory(service="aws_kafka")
+        VersionFactory(service="aws_es")
+        SubscriptionFactory(user=self.user, service="aws_es")
+
+        send_user_notification(self.user, ["aws_kafka"])
+
+        mocked_notify_user.assert_called_once_with(self.user, [str(kafka_version.id)])
+
 
 class GetNewVersionsForUserTestCase(TestCase):
     def test_new_versions(self):
@@ -1,7 +1,34 @@
+from collections import defaultdict
+
+from django.conf import settings
 from django.contrib import admin
+from django.utils import timezone
 
-from services.models import Version
 from services.base import services
+from services.models import (
+    PollResult,
+    PollRun,
+    ServicePollState,
+    Snapshot,
+    SourceValidator,
+    Version,
+    VersionEvent,
+    VersionRegion,
+)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile.
+
+    Args:
+        values (list[float]): sorted values
+        p (int): percentile, 0 to 100
+
+    Returns:
+        float: value below which `p` percent of the values fall
+    """
+    rank = max(round(p / 100 * len(values)), 1)
+    return values[rank - 1]
 
 
 @admin.register(Version)
@@ -17,3 +44,183 @@ class VersionAdmin(admin.ModelAdmin):
             return service.platform.name
         else:
             return "-"
+
+
+@admin.register(VersionRegion)
+class VersionRegionAdmin(admin.ModelAdmin):
+    list_display = ["id", "version", "region"]
+    search_fields = ["id", "version__service", "version__version", "region"]
+    list_filter = ["region", "version__service"]
+    date_hierarchy = "created"
+
+
+@admin.register(VersionEvent)
+class VersionEventAdmin(admin.ModelAdmin):
+    list_display = ["id", "created", "service", "version", "kind", "poll_run"]
+    search_fields = ["id", "service", "version__version"]
+    list_filter = ["kind", "service"]
+    date_hierarchy = "created"
+    raw_id_fields = ["version", "poll_run"]
+
+    def has_change_permission(self, request, obj=None):
+        return False  # append-only
+
+
+@admin.register(ServicePollState)
+class ServicePollStateAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "service",
+        "last_changed",
+        "last_polled",
+        "next_poll_at",
+        "change_rate",
+        "failures",
+        "circuit_opened",
+        "subscribers",
+    ]
+    search_fields = ["id", "service"]
+    list_filter = ["service", "last_changed", "circuit_opened"]
+    date_hierarchy = "created"
+
+
+@admin.register(Snapshot)
+class SnapshotAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "created",
+        "service",
+        "key",
+        "kind",
+        "size",
+        "compressed_size",
+    ]
+    search_fields = ["id", "key", "digest"]
+    list_filter = ["service", "kind"]
+    date_hierarchy = "created"
+    raw_id_fields = ["poll_run"]
+
+
+@admin.register(SourceValidator)
+class SourceValidatorAdmin(admin.ModelAdmin):
+    list_display = ["id", "url", "etag", "last_modified", "updated"]
+    search_fields = ["id", "url"]
+    list_filter = ["updated"]
+    date_hierarchy = "created"
+
+
+class PollResultInline(admin.TabularInline):
+    model = PollResult
+    fields = [
+        "service",
+        "outcome",
+        "fetch_duration",
+        "parse_duration",
+        "diff_duration",
+        "bytes_received",
+        "added",
+        "deprecated",
+        "renewed",
+        "error_class",
+    ]
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+
+
+@admin.register(PollRun)
+class PollRunAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "created",
+        "label",
+        "engine",
+        "duration",
+        "services_count",
+        "cache_hits",
+        "bytes_saved",
+        "token_fetches",
+    ]
+    search_fields = ["id", "label"]
+    list_filter = ["label", "engine"]
+    date_hierarchy = "created"
+    inlines = [PollResultInline]
+
+
+@admin.register(PollResult)
+class PollResultAdmin(admin.ModelAdmin):
+    """Poll results with latency percentiles per service of the filtered results.
+
+    The percentiles cover the last `settings.POLLING_STATS_WINDOW` unless the
+    results are filtered by date, and at most the latest
+    `settings.POLLING_STATS_MAX_RESULTS` results.
+    """
+
+    list_display = [
+        "id",
+        "created",
+        "service",
+        "outcome",
+        "fetch_duration",
+        "parse_duration",
+        "diff_duration",
+        "bytes_received",
+        "api_pages",
+        "added",
+        "deprecated",
+        "renewed",
+        "error_class",
+    ]
+    search_fields = ["id", "service", "error_class"]
+    list_filter = ["service", "outcome", "error_class"]
+    date_hierarchy = "created"
+    raw_id_fields = ["poll_run"]
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context=extra_context)
+        if not hasattr(response, "context_data"):
+            return response  # redirect, e.g. after an action
+
+        queryset = response.context_data["cl"].queryset
+        if not any(param.startswith("created__") for param in request.GET):
+            since = timezone.now() - settings.POLLING_STATS_WINDOW
+            queryset = queryset.filter(created__gte=since)
+            response.context_data["latency_since"] = since
+        response.context_data["latency_stats"] = self.get_latency_stats(
+            queryset, limit=settings.POLLING_STATS_MAX_RESULTS
+        )
+        return response
+
+    @staticmethod
+    def get_latency_stats(queryset, limit=None):
+        """Latency percentiles of every service, slowest first.
+
+        Args:
+            queryset (QuerySet): poll results
+            limit (int): only use the latest results, all of them if not set
+
+        Returns:
+            list[dict]: per service count and p50/p95 of the total, fetch,
+                parse and diff durations
+        """
+        durations = defaultdict(lambda: defaultdict(list))
+        rows = queryset.values_list(
+            "service", "fetch_duration", "parse_duration", "diff_duration"
+        )
+        rows = rows.order_by("-created")[:limit] if limit else rows.order_by()
+        for service, fetch, parse, diff in rows:
+            service_durations = durations[service]
+            service_durations["total"].append(fetch + parse + diff)
+            service_durations["fetch"].append(fetch)
+            service_durations["parse"].append(parse)
+            service_durations["diff"].append(diff)
+
+        stats = []
+        for service, service_durations in durations.items():
+            row = {"service": service, "count": len(service_durations["total"])}
+            for name, values in service_durations.items():
+                values.sort()
+                row[f"{name}_p50"] = percentile(values, 50)
+                row[f"{name}_p95"] = percentile(values, 95)
+            stats.append(row)
+        return sorted(stats, key=lambda row: row["total_p95"], reverse=True)
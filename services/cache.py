@@ -0,0 +1,130 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# cache of the polling run in progress, see `run_cache`
+_active_cache = None
+
+
+class RunCache:
+    """Fetch-once cache shared by all poll functions of a single polling run.
+
+    Every source (a docs page, an API call, ...) is stored under a key and is
+    fetched and parsed only once per run, even if multiple services running in
+    different threads ask for it at the same time. Failures are cached as
+    well so a broken source is not retried by every service depending on it.
+
+    It also holds the HTTP validators of sources, loaded from the database
+    before the run starts, so conditional requests can be made from worker
+    threads without touching the database.
+
+    Attributes:
+        validators: services.models.SourceValidator instances by URL
+        hits: number of lookups served from the cache
+        misses: number of lookups that had to fetch the source
+        not_modified: number of conditional requests answered with 304
+        bytes_saved: size of the full responses 304 answers stood in for
+    """
+
+    def __init__(self, validators: dict = None):
+        self.validators = validators or {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, key: Hashable, fetch_fn: Callable) -> Any:
+        """Get cached value for key, fetch it with `fetch_fn` if missing.
+
+        Args:
+            key (Hashable): source identifier, URL or API call
+            fetch_fn (Callable): called without arguments to fetch the value
+
+        Raises:
+            Exception: whatever `fetch_fn` raised when the source was fetched
+
+        Returns:
+            Any: value returned by `fetch_fn`
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # only one thread fetches a given key, others wait for it
+        with key_lock:
+            entry = self._entries.get(key)
+            with self._lock:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+
+            if entry is None:
+                try:
+                    entry = (fetch_fn(), None)
+                except Exception as e:
+                    entry = (None, e)
+                self._entries[key] = entry
+
+        value, error = entry
+        if error is not None:
+            raise error
+        return value
+
+    def record_not_modified(self, validator):
+        """Count a 304 response for a source with known validator.
+
+        Args:
+            validator (services.models.SourceValidator): validator of the source
+        """
+        with self._lock:
+            self.not_modified += 1
+            self.bytes_saved += validator.content_length
+
+
+@contextmanager
+def run_cache(validators: dict = None):
+    """Activate a new `RunCache` for the duration of a polling run.
+
+    Args:
+        validators (dict): services.models.SourceValidator instances by URL
+    """
+    global _active_cache
+
+    _active_cache = RunCache(validators)
+    try:
+        yield _active_cache
+    finally:
+        _active_cache = None
+
+
+def fetch_once(key: Hashable, fetch_fn: Callable) -> Any:
+    """Fetch a source once per polling run.
+
+    Outside of a polling run `fetch_fn` is simply called.
+
+    Args:
+        key (Hashable): source identifier, URL or API call
+        fetch_fn (Callable): called without arguments to fetch the value
+
+    Returns:
+        Any: value returned by `fetch_fn`
+    """
+    if _active_cache is None:
+        return fetch_fn()
+    return _active_cache.get_or_fetch(key, fetch_fn)
+
+
+def get_run_cache():
+    """Get cache of the polling run in progress.
+
+    Returns:
+        RunCache or None: None outside of a polling run
+    """
+    return _active_cache
@@ -0,0 +1,186 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+
+import backoff
+import httpx
+import requests
+import structlog
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = structlog.get_logger(__name__)
+
+try:
+    # urllib3 decodes brotli responses only when a brotli package is installed
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# process wide session, survives warm Lambda invocations
+_session = None
+_session_lock = threading.Lock()
+# client of the event loop polling with the asyncio engine, see `async_client`
+_async_client = contextvars.ContextVar("async_client", default=None)
+
+
+def get_default_headers():
+    """Headers sent with every request, by both the session and the async client."""
+    return {
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "User-Agent": f"{settings.COMPANY_NAME} ({settings.BASE_URL})",
+    }
+
+
+def get_session():
+    """Get shared session with a keep-alive connection pool per host.
+
+    Returns:
+        requests.Session: session shared by all scrapers
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(
+                pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(get_default_headers())
+            _session = session
+    return _session
+
+
+def is_permanent_error(e):
+    """Check if a failed request should not be retried.
+
+    Connection errors, timeouts, throttling and server errors are retried,
+    any other client error is permanent.
+
+    Args:
+        e (requests.RequestException or httpx.HTTPError): request exception
+
+    Returns:
+        bool: True if retrying will not help
+    """
+    response = getattr(e, "response", None)
+    return (
+        response is not None
+        and 400 <= response.status_code < 500
+        and response.status_code != 429
+    )
+
+
+@backoff.on_exception(
+    backoff.expo,
+    requests.RequestException,
+    max_tries=settings.HTTP_MAX_TRIES,
+    giveup=is_permanent_error,
+    jitter=backoff.full_jitter,
+    backoff_log_level=logging.WARN,
+)
+def get(url, headers=None):
+    """GET a URL with timeouts and jittered retries.
+
+    Args:
+        url (str): URL
+        headers (dict): extra request headers
+
+    Raises:
+        requests.RequestException: When the request keeps failing.
+
+    Returns:
+        requests.Response: response, 2xx or 304
+    """
+    started = time.monotonic()
+    response = get_session().get(
+        url,
+        headers=headers,
+        timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT),
+    )
+    response.raise_for_status()
+
+    logger.info(
+        "HTTP request",
+        url=url,
+        status_code=response.status_code,
+        duration=round(time.monotonic() - started, 3),
+        bytes=len(response.content),
+    )
+    return response
+
+
+@asynccontextmanager
+async def async_client():
+    """Open the HTTP client used by `get_async` in the running event loop.
+
+    Connections are kept alive for the duration of the block, the client is
+    bound to the event loop and can not outlive it.
+
+    Yields:
+        httpx.AsyncClient: client
+    """
+    client = httpx.AsyncClient(
+        headers=get_default_headers(),
+        timeout=httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(max_keepalive_connections=settings.HTTP_POOL_CONNECTIONS),
+        follow_redirects=True,
+    )
+    token = _async_client.set(client)
+    try:
+        yield client
+    finally:
+        _async_client.reset(token)
+        await client.aclose()
+
+
+@backoff.on_exception(
+    backoff.expo,
+    httpx.HTTPError,
+    max_tries=settings.HTTP_MAX_TRIES,
+    giveup=is_permanent_error,
+    jitter=backoff.full_jitter,
+    backoff_log_level=logging.WARN,
+)
+async def get_async(url, headers=None):
+    """GET a URL without blocking the event loop, as `get` does otherwise.
+
+    Must be awaited in an `async_client` block.
+
+    Args:
+        url (str): URL
+        headers (dict): extra request headers
+
+    Raises:
+        httpx.HTTPError: When the request keeps failing.
+
+    Returns:
+        httpx.Response: response, 2xx or 304
+    """
+    client = _async_client.get()
+    if client is None:
+        raise RuntimeError("get_async must be awaited in an async_client block")
+
+    started = time.monotonic()
+    response = await client.get(url, headers=headers)
+    if response.status_code != 304:
+        # unlike requests, httpx also raises for redirects and 304
+        response.raise_for_status()
+
+    logger.info(
+        "HTTP request",
+        url=url,
+        status_code=response.status_code,
+        duration=round(time.monotonic() - started, 3),
+        bytes=len(response.content),
+    )
+    return response
@@ -0,0 +1,57 @@
+import time
+
+import boto3
+from django.core.management.base import BaseCommand
+
+from services import tasks
+
+AWS_POLLED_SERVICES = [
+    "docdb",
+    "elasticache",
+    "es",
+    "kafka",
+    "memorydb",
+    "mq",
+    "neptune",
+    "opensearch",
+    "rds",
+]
+
+
+class Command(BaseCommand):
+    help = "Compares AWS client creation time with and without the client cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument("--region", default="eu-central-1")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        region = options["region"]
+
+        # what every poll function used to do: new session and client per call
+        started = time.monotonic()
+        for _ in range(iterations):
+            for service_name in AWS_POLLED_SERVICES:
+                boto3.session.Session().client(service_name, region_name=region)
+        uncached = time.monotonic() - started
+
+        started = time.monotonic()
+        for _ in range(iterations):
+            for service_name in AWS_POLLED_SERVICES:
+                tasks.get_aws_client(service_name, region_name=region)
+        cached = time.monotonic() - started
+
+        polls = iterations * len(AWS_POLLED_SERVICES)
+        self.stdout.write(f"Client lookups: {polls}")
+        self.stdout.write(
+            f"New session and client per poll: {uncached:.3f}s "
+            f"({uncached / polls * 1000:.1f}ms per poll)"
+        )
+        self.stdout.write(
+            f"Cached session and clients: {cached:.3f}s "
+            f"({cached / polls * 1000:.1f}ms per poll)"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Saved per run: {uncached - cached:.3f}s")
+        )
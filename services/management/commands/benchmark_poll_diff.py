@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from services.base import services
+from services.models import Version
+from services.tasks import PollService
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures PollService diff cost while the Version table grows across "
+        "other services. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000])
+        parser.add_argument("--service", default="aws_mysql")
+        parser.add_argument("--versions", type=int, default=50)
+
+    def handle(self, *args, **options):
+        service = services[options["service"]]
+        other_services = [name for name in services if name != service.name]
+        supported_versions = [f"5.{i}" for i in range(options["versions"])]
+
+        for size in options["sizes"]:
+            try:
+                with transaction.atomic():
+                    # other services share version strings with the polled one
+                    Version.objects.bulk_create(
+                        [
+                            Version(
+                                service=other_services[i % len(other_services)],
+                                version=f"5.{i // len(other_services)}",
+                            )
+                            for i in range(size)
+                        ],
+                        batch_size=1000,
+                    )
+
+                    poll_service = PollService(service, lambda: supported_versions)
+                    started = time.monotonic()
+                    with CaptureQueriesContext(connection) as ctx:
+                        poll_service.poll()
+                    duration = time.monotonic() - started
+
+                    self.stdout.write(
+                        f"Other services' versions: {size:>7} | "
+                        f"queries: {len(ctx.captured_queries):>3} | "
+                        f"added: {len(poll_service.added_versions):>4} | "
+                        f"duration: {duration * 1000:.1f}ms"
+                    )
+                    raise Rollback()
+            except Rollback:
+                pass
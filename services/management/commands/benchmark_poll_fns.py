@@ -0,0 +1,99 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from services.sources import REPLAY, source_mode
+from services.tasks import all_poll_services
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays recorded fixtures through every poll function without network "
+        "and reports parse time, peak memory and extracted versions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--service", action="append", dest="service_names")
+        parser.add_argument(
+            "--docs-pages",
+            action="store_true",
+            help="Only services scraped from public docs pages, no credentials needed",
+        )
+        parser.add_argument("--fixtures-dir", default=settings.POLLING_FIXTURES_DIR)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--json", dest="json_path", help="Write results to file")
+
+    def handle(self, *args, **options):
+        poll_services = all_poll_services(options["service_names"])
+        if options["docs_pages"]:
+            poll_services = [ps for ps in poll_services if ps.service.source_url]
+        results = []
+
+        with source_mode(REPLAY, options["fixtures_dir"]):
+            for poll_service in poll_services:
+                try:
+                    results.append(self.benchmark(poll_service, options["repeat"]))
+                except Exception as e:
+                    results.append(
+                        {
+                            "service": poll_service.service.name,
+                            "error": f"{type(e).__name__}: {e}",
+                        }
+                    )
+
+        for result in results:
+            if "error" in result:
+                self.stdout.write(
+                    self.style.ERROR(f"{result['service']:<28} {result['error']}")
+                )
+            else:
+                self.stdout.write(
+                    f"{result['service']:<28} "
+                    f"{result['duration_ms']:>9.2f}ms "
+                    f"{result['peak_memory_kib']:>9.1f}KiB "
+                    f"{len(result['versions']):>4} versions: "
+                    f"{', '.join(result['versions'])}"
+                )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as f:
+                json.dump(results, f, indent=2)
+
+        failed = [result["service"] for result in results if "error" in result]
+        if failed:
+            raise CommandError(f"Poll functions failed: {', '.join(failed)}")
+
+    def benchmark(self, poll_service, repeat):
+        """Run a poll function against fixtures.
+
+        Args:
+            poll_service (services.tasks.PollService): service to benchmark
+            repeat (int): number of timed runs
+
+        Returns:
+            dict: median duration, peak memory and extracted versions
+        """
+        durations = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            poll_service.poll_fn()
+            durations.append(time.perf_counter() - started)
+
+        # separate run, tracing allocations slows the code down
+        tracemalloc.start()
+        try:
+            versions = poll_service.poll_fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "service": poll_service.service.name,
+            "duration_ms": statistics.median(durations) * 1000,
+            "peak_memory_kib": peak / 1024,
+            "versions": [str(v) for v in versions],
+        }
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from services.sources import RECORD, source_mode
+from services.tasks import all_poll_services
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs every poll function against live sources and records raw "
+        "responses as fixtures for benchmark_poll_fns"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--service", action="append", dest="service_names")
+        parser.add_argument(
+            "--docs-pages",
+            action="store_true",
+            help="Only services scraped from public docs pages, no credentials needed",
+        )
+        parser.add_argument("--fixtures-dir", default=settings.POLLING_FIXTURES_DIR)
+
+    def handle(self, *args, **options):
+        poll_services = all_poll_services(options["service_names"])
+        if options["docs_pages"]:
+            poll_services = [ps for ps in poll_services if ps.service.source_url]
+
+        failed = []
+        with source_mode(RECORD, options["fixtures_dir"]):
+            for poll_service in poll_services:
+                try:
+                    versions = poll_service.poll_fn()
+                except Exception as e:
+                    failed.append(poll_service.service.name)
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"{poll_service.service.name}: {type(e).__name__} {e}"
+                        )
+                    )
+                    continue
+                self.stdout.write(
+                    f"{poll_service.service.name}: recorded, {len(versions)} versions"
+                )
+
+        if failed:
+            raise CommandError(f"Poll functions failed: {', '.join(failed)}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Fixtures recorded to {options['fixtures_dir']}")
+        )
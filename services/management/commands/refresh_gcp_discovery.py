@@ -0,0 +1,44 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from googleapiclient.discovery import V2_DISCOVERY_URI
+
+from services import http
+from services.tasks import get_gcp_discovery_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Downloads discovery documents of the polled Google APIs so they are "
+        "bundled with the deploy instead of being fetched when polling"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--api",
+            action="append",
+            dest="apis",
+            help="API as name:version, e.g. sqladmin:v1, all polled APIs if not set",
+        )
+
+    def handle(self, *args, **options):
+        for api in options["apis"] or settings.GCP_DISCOVERY_APIS:
+            service_name, _, version = api.partition(":")
+            if not version:
+                raise CommandError(f"Invalid API {api}, expected name:version")
+
+            url = V2_DISCOVERY_URI.format(api=service_name, apiVersion=version)
+            content = http.get(url).text
+            document = json.loads(content)
+            if document.get("name") != service_name:
+                raise CommandError(f"{url} is not the discovery document of {api}")
+
+            path = get_gcp_discovery_path(service_name, version)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{api} revision {document.get('revision')} saved to {path}"
+                )
+            )
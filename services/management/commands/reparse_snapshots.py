@@ -0,0 +1,138 @@
+import tempfile
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from services.models import ServicePollState, Snapshot, Version, VersionEvent
+from services.snapshots import get_snapshot_store
+from services.sources import REPLAY, FixtureNotFound, fixture_path, source_mode
+from services.tasks import all_poll_services
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-runs the current poll functions over archived source snapshots, "
+        "oldest first, and backfills versions that were missed along with "
+        "their events, deprecated if the source no longer returns them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--service", action="append", dest="service_names")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report missing versions without creating them",
+        )
+
+    def handle(self, *args, **options):
+        store = get_snapshot_store()
+        if store is None:
+            raise CommandError("Snapshots are disabled, see SNAPSHOT_STORAGE")
+
+        poll_services = all_poll_services(options["service_names"])
+        first_seen = {ps.service.name: {} for ps in poll_services}
+        # versions the latest replayed step no longer returns, with when they went
+        dropped = {ps.service.name: {} for ps in poll_services}
+        latest_versions = {ps.service.name: set() for ps in poll_services}
+        errors = {}
+        steps = 0
+
+        # Snapshots are replayed as fixtures: every step adds the payloads
+        # first seen in a polling run to those still current, then every
+        # poll function is run against that state of the sources.
+        snapshots = Snapshot.objects.order_by("created").iterator()
+        with tempfile.TemporaryDirectory() as fixtures_dir, source_mode(
+            REPLAY, fixtures_dir
+        ):
+            for _, step in groupby(snapshots, key=lambda s: s.poll_run_id or s.id):
+                step = list(step)
+                for snapshot in step:
+                    path = fixture_path(snapshot.key, snapshot.kind)
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(store.get(snapshot.digest))
+
+                seen_at = step[0].created
+                for poll_service in poll_services:
+                    try:
+                        versions = poll_service.poll_fn()
+                    except FixtureNotFound:
+                        continue  # sources of the service not archived yet
+                    except Exception as e:
+                        errors[poll_service.service.name] = f"{type(e).__name__}: {e}"
+                        continue
+                    service_name = poll_service.service.name
+                    versions = {str(version) for version in versions}
+                    for version in versions:
+                        first_seen[service_name].setdefault(version, seen_at)
+                        dropped[service_name].pop(version, None)
+                    for version in latest_versions[service_name] - versions:
+                        dropped[service_name][version] = seen_at
+                    latest_versions[service_name] = versions
+                steps += 1
+
+        stored_versions = set(
+            Version.objects.filter(service__in=list(first_seen)).values_list(
+                "service", "version"
+            )
+        )
+        missing_versions = [
+            Version(
+                service=service_name,
+                version=version,
+                created=seen_at,
+                deprecated=(
+                    dropped[service_name][version].date()
+                    if version in dropped[service_name]
+                    else None
+                ),
+            )
+            for service_name, versions in first_seen.items()
+            for version, seen_at in versions.items()
+            if (service_name, version) not in stored_versions
+        ]
+
+        self.stdout.write(f"Replayed {steps} polling runs")
+        for service_name, error in sorted(errors.items()):
+            self.stdout.write(self.style.WARNING(f"{service_name:<28} {error}"))
+        for version in missing_versions:
+            deprecated = (
+                f", deprecated {version.deprecated}" if version.deprecated else ""
+            )
+            self.stdout.write(
+                f"{version.service:<28} {version.version} "
+                f"first seen {version.created}{deprecated}"
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(missing_versions)} missing versions")
+            return
+        events = [
+            VersionEvent(
+                service=version.service,
+                version=version,
+                kind=VersionEvent.ADDED,
+                created=version.created,
+            )
+            for version in missing_versions
+        ] + [
+            VersionEvent(
+                service=version.service,
+                version=version,
+                kind=VersionEvent.DEPRECATED,
+                created=dropped[version.service][version.version],
+            )
+            for version in missing_versions
+            if version.deprecated
+        ]
+        with transaction.atomic():
+            Version.objects.bulk_create(missing_versions)
+            VersionEvent.objects.bulk_create(events)
+            # the next poll diffs these services again instead of short
+            # circuiting on an unchanged source, see `ServicePollState.fingerprint`
+            ServicePollState.objects.filter(
+                service__in={version.service for version in missing_versions}
+            ).update(fingerprint="")
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(missing_versions)} missing versions backfilled")
+        )
@@ -0,0 +1,54 @@
+# Generated by Django 3.2.12 on 2026-10-18 15:05
+
+import uuid
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0006_alter_version_service"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SourceValidator",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("url", models.URLField(max_length=500, unique=True)),
+                ("etag", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "last_modified",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "content_length",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Size of the last full response in bytes"
+                    ),
+                ),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ("-created",),
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 3.2.12 on 2026-10-18 15:06
+
+import uuid
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0007_sourcevalidator"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServicePollState",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                (
+                    "service",
+                    models.CharField(
+                        choices=[
+                            ("aws_eks", "EKS"),
+                            ("gcp_gke", "GKE"),
+                            ("azure_aks", "AKS"),
+                            ("gcp_cloudsql_postgres", "CloudSQL Postgres"),
+                            ("gcp_cloudsql_sqlserver", "CloudSQL SQL Server"),
+                            ("gcp_cloudsql_mysql", "CloudSQL MySQL"),
+                            ("gcp_dataproc", "Dataproc"),
+                            ("gcp_dataproc_os", "Dataproc OS Images"),
+                            ("gcp_memorystore_redis", "Memorystore Redis"),
+                            ("aws_elasticache_redis", "ElastiCache Redis"),
+                            ("aws_elasticache_memcached", "ElastiCache Memcached"),
+                            ("aws_kafka", "Kafka"),
+                            ("aws_es", "ElasticSearch"),
+                            ("aws_opensearch", "OpenSearch"),
+                            ("aws_neptune", "Neptune"),
+                            ("aws_docdb", "DocumentDB"),
+                            ("aws_memorydb", "MemoryDB"),
+                            ("aws_rabbitmq", "RabbitMQ"),
+                            ("aws_activemq", "ActiveMQ"),
+                            ("aws_aurora", "Aurora MySQL (MySQL 5.6 compatible)"),
+                            (
+                                "aws_aurora_mysql",
+                                "Aurora MySQL (MySQL 5.7+ compatible)",
+                            ),
+                            ("aws_aurora_postgres", "Aurora Postgres"),
+                            ("aws_mariadb", "MariaDB"),
+                            ("aws_mysql", "MySQL"),
+                            ("aws_postgres", "Postgres"),
+                            ("aws_oracle_ee", "Oracle EE"),
+                            ("aws_oracle_ee_cdb", "Oracle EE CDB"),
+                            ("aws_oracle_se2", "Oracle SE2"),
+                            ("aws_oracle_se2_cdb", "Oracle SE2 CDB"),
+                            ("aws_sqlserver_ee", "SQL Server EE"),
+                            ("aws_sqlserver_se", "SQL Server SE"),
+                            ("aws_sqlserver_ex", "SQL Server EX"),
+                            ("aws_sqlserver_web", "SQL Server Web"),
+                            ("aws_lambda_nodejs", "AWS Lambda Node.js"),
+                            ("aws_lambda_python", "AWS Lambda Python"),
+                            ("aws_lambda_ruby", "AWS Lambda Ruby"),
+                            ("aws_lambda_java", "AWS Lambda Java"),
+                            ("aws_lambda_go", "AWS Lambda Go"),
+                            ("aws_lambda_dotnet", "AWS Lambda .NET"),
+                            ("aws_lambda_custom", "AWS Lambda Custom"),
+                            ("azure_mariadb_server", "MariaDB Server"),
+                            ("azure_postgresql_server", "PostgreSQL Server"),
+                            ("azure_redis_server", "Redis Server"),
+                            ("azure_mysql_server", "MySQL Server"),
+                            ("azure_hdinsight", "HDInsight"),
+                            ("azure_databricks", "Databricks"),
+                        ],
+                        max_length=255,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Hash of the supported versions as of the last poll",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "last_changed",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When supported versions last changed",
+                        null=True,
+                    ),
+                ),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ("-created",),
+                "abstract": False,
+            },
+        ),
+    ]
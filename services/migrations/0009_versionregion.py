@@ -0,0 +1,52 @@
+# Generated by Django 3.2.12 on 2026-10-18 15:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0008_servicepollstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionRegion",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("region", models.CharField(max_length=50)),
+                (
+                    "version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="regions",
+                        to="services.version",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="versionregion",
+            constraint=models.UniqueConstraint(
+                fields=("version", "region"), name="unique_version_region"
+            ),
+        ),
+    ]
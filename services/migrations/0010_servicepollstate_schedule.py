@@ -0,0 +1,53 @@
+# Generated by Django 3.2.12 on 2026-10-18 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0009_versionregion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicepollstate",
+            name="change_rate",
+            field=models.FloatField(
+                default=0, help_text="Moving average of observed changes per day"
+            ),
+        ),
+        migrations.AddField(
+            model_name="servicepollstate",
+            name="failures",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of consecutive failed polls"
+            ),
+        ),
+        migrations.AddField(
+            model_name="servicepollstate",
+            name="last_polled",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the service was last polled successfully",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="servicepollstate",
+            name="next_poll_at",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="When the service is due to be polled, now if not set",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="servicepollstate",
+            name="subscribers",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Active subscriptions as of the last poll"
+            ),
+        ),
+    ]
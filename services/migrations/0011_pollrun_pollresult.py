@@ -0,0 +1,174 @@
+# Generated by Django 3.2.12 on 2026-10-18 15:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0010_servicepollstate_schedule"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PollRun",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="Polled platform or shard", max_length=50
+                    ),
+                ),
+                ("engine", models.CharField(max_length=50)),
+                (
+                    "duration",
+                    models.FloatField(blank=True, help_text="Seconds", null=True),
+                ),
+                ("services_count", models.PositiveIntegerField(default=0)),
+                ("cache_hits", models.PositiveIntegerField(default=0)),
+                ("cache_misses", models.PositiveIntegerField(default=0)),
+                ("bytes_saved", models.PositiveBigIntegerField(default=0)),
+                ("token_fetches", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ("-created",),
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="PollResult",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                (
+                    "service",
+                    models.CharField(
+                        choices=[
+                            ("aws_eks", "EKS"),
+                            ("gcp_gke", "GKE"),
+                            ("azure_aks", "AKS"),
+                            ("gcp_cloudsql_postgres", "CloudSQL Postgres"),
+                            ("gcp_cloudsql_sqlserver", "CloudSQL SQL Server"),
+                            ("gcp_cloudsql_mysql", "CloudSQL MySQL"),
+                            ("gcp_dataproc", "Dataproc"),
+                            ("gcp_dataproc_os", "Dataproc OS Images"),
+                            ("gcp_memorystore_redis", "Memorystore Redis"),
+                            ("aws_elasticache_redis", "ElastiCache Redis"),
+                            ("aws_elasticache_memcached", "ElastiCache Memcached"),
+                            ("aws_kafka", "Kafka"),
+                            ("aws_es", "ElasticSearch"),
+                            ("aws_opensearch", "OpenSearch"),
+                            ("aws_neptune", "Neptune"),
+                            ("aws_docdb", "DocumentDB"),
+                            ("aws_memorydb", "MemoryDB"),
+                            ("aws_rabbitmq", "RabbitMQ"),
+                            ("aws_activemq", "ActiveMQ"),
+                            ("aws_aurora", "Aurora MySQL (MySQL 5.6 compatible)"),
+                            (
+                                "aws_aurora_mysql",
+                                "Aurora MySQL (MySQL 5.7+ compatible)",
+                            ),
+                            ("aws_aurora_postgres", "Aurora Postgres"),
+                            ("aws_mariadb", "MariaDB"),
+                            ("aws_mysql", "MySQL"),
+                            ("aws_postgres", "Postgres"),
+                            ("aws_oracle_ee", "Oracle EE"),
+                            ("aws_oracle_ee_cdb", "Oracle EE CDB"),
+                            ("aws_oracle_se2", "Oracle SE2"),
+                            ("aws_oracle_se2_cdb", "Oracle SE2 CDB"),
+                            ("aws_sqlserver_ee", "SQL Server EE"),
+                            ("aws_sqlserver_se", "SQL Server SE"),
+                            ("aws_sqlserver_ex", "SQL Server EX"),
+                            ("aws_sqlserver_web", "SQL Server Web"),
+                            ("aws_lambda_nodejs", "AWS Lambda Node.js"),
+                            ("aws_lambda_python", "AWS Lambda Python"),
+                            ("aws_lambda_ruby", "AWS Lambda Ruby"),
+                            ("aws_lambda_java", "AWS Lambda Java"),
+                            ("aws_lambda_go", "AWS Lambda Go"),
+                            ("aws_lambda_dotnet", "AWS Lambda .NET"),
+                            ("aws_lambda_custom", "AWS Lambda Custom"),
+                            ("azure_mariadb_server", "MariaDB Server"),
+                            ("azure_postgresql_server", "PostgreSQL Server"),
+                            ("azure_redis_server", "Redis Server"),
+                            ("azure_mysql_server", "MySQL Server"),
+                            ("azure_hdinsight", "HDInsight"),
+                            ("azure_databricks", "Databricks"),
+                        ],
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "outcome",
+                    models.CharField(
+                        choices=[
+                            ("changed", "Changed"),
+                            ("unchanged", "Unchanged"),
+                            ("not_modified", "Not modified"),
+                            ("failed", "Failed"),
+                            ("skipped", "Skipped"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("fetch_duration", models.FloatField(default=0)),
+                ("parse_duration", models.FloatField(default=0)),
+                ("diff_duration", models.FloatField(default=0)),
+                ("bytes_received", models.PositiveBigIntegerField(default=0)),
+                ("api_pages", models.PositiveIntegerField(default=0)),
+                ("added", models.PositiveIntegerField(default=0)),
+                ("deprecated", models.PositiveIntegerField(default=0)),
+                ("renewed", models.PositiveIntegerField(default=0)),
+                (
+                    "error_class",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "poll_run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="services.pollrun",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="pollresult",
+            index=models.Index(
+                fields=["service", "created"], name="pollresult_service_created"
+            ),
+        ),
+    ]
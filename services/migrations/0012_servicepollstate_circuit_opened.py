@@ -0,0 +1,22 @@
+# Generated by Django 3.2.12 on 2026-10-18 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("services", "0011_pollrun_pollresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicepollstate",
+            name="circuit_opened",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When consecutive failures opened the circuit breaker, closed if not set",
+                null=True,
+            ),
+        ),
+    ]
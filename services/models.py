@@ -1,6 +1,8 @@
-from datetime import datetime
+import hashlib
+from datetime import datetime, timedelta
 
 from core.models import BaseModelMixin
+from django.conf import settings
 from django.db import models
 from django.db.models import Q
 from django.utils import timezone
@@ -21,7 +23,6 @@ class Version(BaseModelMixin):
     deprecated = models.DateField(
         null=True, blank=True, help_text="If date of deprecation is known"
     )
-    # TODO region availability
 
     class Meta:
         constraints = [
@@ -122,3 +123,360 @@ class Version(BaseModelMixin):
             return self.service_obj.public
         else:
             return False
+
+
+class VersionRegion(BaseModelMixin):
+    """Region a version is available in.
+
+    Only known for services polled in every region, see
+    `services.tasks.in_regions`.
+    """
+
+    version = models.ForeignKey(
+        Version, on_delete=models.CASCADE, related_name="regions"
+    )
+    region = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["version", "region"],
+                name="unique_version_region",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{str(self.id)} | {self.version_id} {self.region}"
+
+
+class ServicePollState(BaseModelMixin):
+    """Polling state of a single service.
+
+    Also drives the adaptive polling schedule and the circuit breaker of
+    failing sources, see `schedule`.
+    """
+
+    service = models.CharField(choices=service_choices, max_length=255, unique=True)
+    fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Hash of the supported versions as of the last poll",
+    )
+    last_changed = models.DateTimeField(
+        null=True, blank=True, help_text="When supported versions last changed"
+    )
+    last_polled = models.DateTimeField(
+        null=True, blank=True, help_text="When the service was last polled successfully"
+    )
+    next_poll_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="When the service is due to be polled, now if not set",
+    )
+    change_rate = models.FloatField(
+        default=0, help_text="Moving average of observed changes per day"
+    )
+    failures = models.PositiveIntegerField(
+        default=0, help_text="Number of consecutive failed polls"
+    )
+    subscribers = models.PositiveIntegerField(
+        default=0, help_text="Active subscriptions as of the last poll"
+    )
+    circuit_opened = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When consecutive failures opened the circuit breaker, closed if not set",
+    )
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{str(self.id)} | {self.service}"
+
+    def schedule(self, now, changed=False, failed=False, subscribers=0):
+        """Record a poll and schedule the next one.
+
+        The change rate is an exponentially weighted moving average of the
+        changes per day observed by each poll. Services are polled so that
+        about `settings.POLLING_TARGET_CHANGES_PER_POLL` changes happen
+        between two polls, services nobody is subscribed to half as often.
+
+        Failed polls are retried after the minimum interval until
+        `settings.POLLING_BREAKER_THRESHOLD` consecutive failures open the
+        circuit breaker. The source is then only probed, with an interval
+        doubling on every failed probe up to `settings.POLLING_BREAKER_MAX_BACKOFF`.
+        A successful poll closes the circuit.
+
+        Args:
+            now (datetime): time of the poll
+            changed (bool): supported versions changed
+            failed (bool): poll failed
+            subscribers (int): active subscriptions to the service
+        """
+        self.subscribers = subscribers
+        if failed:
+            self.failures += 1
+            self.next_poll_at = now + self.get_retry_interval()
+            if self.failures >= settings.POLLING_BREAKER_THRESHOLD:
+                self.circuit_opened = self.circuit_opened or now
+            return
+
+        if self.last_polled is None:
+            interval = settings.POLLING_DEFAULT_INTERVAL
+        else:
+            elapsed_days = max(
+                now - self.last_polled, settings.POLLING_MIN_INTERVAL
+            ) / (timedelta(days=1))
+            smoothing = settings.POLLING_CHANGE_RATE_SMOOTHING
+            self.change_rate = (
+                smoothing * int(changed) / elapsed_days
+                + (1 - smoothing) * self.change_rate
+            )
+            interval = self.get_poll_interval()
+
+        self.failures = 0
+        self.circuit_opened = None
+        self.last_polled = now
+        self.next_poll_at = now + interval
+
+    @property
+    def circuit_open(self):
+        return self.circuit_opened is not None
+
+    def get_retry_interval(self):
+        """Interval before polling a failing source again.
+
+        Returns:
+            timedelta: minimum interval, backed off once the circuit is open
+        """
+        probes = self.failures - settings.POLLING_BREAKER_THRESHOLD
+        if probes < 0:
+            return settings.POLLING_MIN_INTERVAL
+        return min(
+            settings.POLLING_MIN_INTERVAL * 2**probes,
+            settings.POLLING_BREAKER_MAX_BACKOFF,
+        )
+
+    def get_poll_interval(self):
+        """Interval between polls adapted to the change rate and subscribers.
+
+        Returns:
+            timedelta: interval, within the configured bounds
+        """
+        if self.change_rate > 0:
+            interval = timedelta(
+                days=settings.POLLING_TARGET_CHANGES_PER_POLL / self.change_rate
+            )
+        else:
+            interval = settings.POLLING_MAX_INTERVAL
+        if not self.subscribers:
+            interval *= 2
+        return max(
+            settings.POLLING_MIN_INTERVAL, min(interval, settings.POLLING_MAX_INTERVAL)
+        )
+
+    @staticmethod
+    def get_fingerprint(supported_versions, version_regions=None):
+        """Hash of a normalized set of supported versions.
+
+        Args:
+            supported_versions (list[str]): versions as returned by a poll function
+            version_regions (dict): regions by version, for services polled in
+                every region
+
+        Returns:
+            str: hex digest that does not depend on order or duplicates
+        """
+        normalized = set(str(v).strip() for v in supported_versions)
+        if version_regions is not None:
+            normalized = set(
+                f"{str(v).strip()} {','.join(sorted(set(regions)))}"
+                for v, regions in version_regions.items()
+            )
+        normalized = sorted(normalized)
+        return hashlib.sha256("\n".join(normalized).encode()).hexdigest()
+
+
+class SourceValidator(BaseModelMixin):
+    """HTTP cache validators of the last successfully processed source response.
+
+    Used to poll sources with conditional requests so unchanged sources are
+    neither downloaded nor parsed again.
+    """
+
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=255, blank=True, default="")
+    content_length = models.PositiveIntegerField(
+        default=0, help_text="Size of the last full response in bytes"
+    )
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{str(self.id)} | {self.url}"
+
+    @property
+    def headers(self):
+        """Conditional request headers.
+
+        Returns:
+            dict: If-None-Match and If-Modified-Since headers if known
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PollRun(BaseModelMixin):
+    """Polling run, see `services.tasks.run_polling`."""
+
+    label = models.CharField(max_length=50, help_text="Polled platform or shard")
+    engine = models.CharField(max_length=50)
+    duration = models.FloatField(null=True, blank=True, help_text="Seconds")
+    services_count = models.PositiveIntegerField(default=0)
+    cache_hits = models.PositiveIntegerField(default=0)
+    cache_misses = models.PositiveIntegerField(default=0)
+    bytes_saved = models.PositiveBigIntegerField(default=0)
+    token_fetches = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{str(self.id)} | {self.label} {self.created}"
+
+
+class PollResult(BaseModelMixin):
+    """Outcome and timings of a single service in a polling run.
+
+    Durations are in seconds: `fetch_duration` is wall-clock time waiting on HTTP
+    requests and API pages, `parse_duration` is the rest of the poll
+    function and `diff_duration` the commit of the changes. Of services
+    sharing a fetch, only the one that ran it has fetch and parse durations.
+    """
+
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    NOT_MODIFIED = "not_modified"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    OUTCOME_CHOICES = [
+        (CHANGED, "Changed"),
+        (UNCHANGED, "Unchanged"),
+        (NOT_MODIFIED, "Not modified"),
+        (FAILED, "Failed"),
+        (SKIPPED, "Skipped"),
+    ]
+
+    poll_run = models.ForeignKey(
+        PollRun, on_delete=models.CASCADE, related_name="results"
+    )
+    service = models.CharField(choices=service_choices, max_length=255)
+    outcome = models.CharField(choices=OUTCOME_CHOICES, max_length=20)
+    fetch_duration = models.FloatField(default=0)
+    parse_duration = models.FloatField(default=0)
+    diff_duration = models.FloatField(default=0)
+    bytes_received = models.PositiveBigIntegerField(default=0)
+    api_pages = models.PositiveIntegerField(default=0)
+    added = models.PositiveIntegerField(default=0)
+    deprecated = models.PositiveIntegerField(default=0)
+    renewed = models.PositiveIntegerField(default=0)
+    error_class = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["service", "created"], name="pollresult_service_created"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{str(self.id)} | {self.service} {self.outcome}"
+
+    @property
+    def duration(self):
+        return self.fetch_duration + self.parse_duration + self.diff_duration
+
+
+class Snapshot(BaseModelMixin):
+    """Raw source payload archived by content address, see `services.snapshots`.
+
+    One row per distinct payload of a source, `created` is when it was first
+    seen. Payloads are stored once per digest, whatever their source.
+    """
+
+    HTML = "html"
+    JSON = "json"
+    KIND_CHOICES = [(HTML, "HTML page"), (JSON, "API response")]
+
+    service = models.CharField(
+        choices=service_choices,
+        max_length=255,
+        help_text="Service that first fetched the payload",
+    )
+    key = models.CharField(max_length=500, help_text="Page URL or API call key")
+    kind = models.CharField(choices=KIND_CHOICES, max_length=10)
+    digest = models.CharField(max_length=64, help_text="SHA-256 of the payload")
+    size = models.PositiveBigIntegerField(help_text="Payload size in bytes")
+    compressed_size = models.PositiveBigIntegerField(
+        help_text="Stored size in bytes, 0 if stored for another source"
+    )
+    poll_run = models.ForeignKey(
+        PollRun,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="snapshots",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key", "digest"],
+                name="unique_snapshot_key_digest",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{str(self.id)} | {self.key} {self.digest[:12]}"
+
+
+class VersionEvent(BaseModelMixin):
+    """Append-only log of the changes applied to versions by polling.
+
+    Written in the transaction of the diff so consumers can follow changes
+    incrementally instead of diffing the versions table.
+    """
+
+    ADDED = "added"
+    DEPRECATED = "deprecated"
+    RENEWED = "renewed"
+    KIND_CHOICES = [
+        (ADDED, "Added"),
+        (DEPRECATED, "Deprecated"),
+        (RENEWED, "Renewed"),
+    ]
+
+    service = models.CharField(choices=service_choices, max_length=255)
+    version = models.ForeignKey(
+        Version, on_delete=models.CASCADE, related_name="events"
+    )
+    kind = models.CharField(choices=KIND_CHOICES, max_length=20)
+    poll_run = models.ForeignKey(
+        PollRun,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="version_events",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["service", "created"], name="versionevent_service_created"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{str(self.id)} | {self.service} {self.kind} {self.version_id}"
@@ -0,0 +1,247 @@
+import codecs
+from dataclasses import dataclass
+from functools import lru_cache
+from html.parser import HTMLParser
+from operator import itemgetter
+from typing import Callable, List, Optional, Tuple, Union
+
+# size of the chunks fed to the parser, parsing stops between chunks
+CHUNK_SIZE = 64 * 1024
+
+
+class ScrappingError(Exception):
+    pass
+
+
+class TableNotFound(ScrappingError):
+    pass
+
+
+@dataclass(frozen=True)
+class TableLocator:
+    """Where to find a table in a page.
+
+    Attributes:
+        anchor_id: the first table following the element with this id
+        marker: the first table containing this text, used when the table has
+            no anchor; when both are set, the first table following the anchor
+            that contains the text
+    """
+
+    anchor_id: Optional[str] = None
+    marker: Optional[str] = None
+
+
+class _Table:
+    """Table being read."""
+
+    def __init__(self, locator_index):
+        self.locator_index = locator_index
+        self.rows = []
+        self.text = []
+        self.row = None
+        self.cell = None
+        self.depth = 1  # nested tables are read as part of this one
+
+
+class TableExtractor(HTMLParser):
+    """Streaming HTML parser reading only the tables it was asked for.
+
+    No tree is built, only the cells of the located tables are kept and
+    parsing stops as soon as all of them have been read so the rest of the
+    page is never parsed.
+
+    Rows are lists of the stripped text of their `td` cells, rows without
+    `td` cells (headers) are skipped.
+    """
+
+    def __init__(self, locators: List[TableLocator]):
+        super().__init__(convert_charrefs=True)
+        self.locators = locators
+        self.tables = [None] * len(locators)
+        # locators which anchor has been seen, waiting for their table
+        self._armed = {i for i, locator in enumerate(locators) if not locator.anchor_id}
+        self._table = None
+
+    @property
+    def done(self):
+        return all(table is not None for table in self.tables)
+
+    def handle_starttag(self, tag, attrs):
+        if self._table is not None:
+            self._read_starttag(tag)
+            return
+
+        anchor_id = dict(attrs).get("id")
+        if anchor_id:
+            for i, locator in enumerate(self.locators):
+                if locator.anchor_id == anchor_id and self.tables[i] is None:
+                    self._armed.add(i)
+
+        if tag == "table":
+            pending = [i for i in sorted(self._armed) if self.tables[i] is None]
+            if pending:
+                self._table = _Table(pending)
+
+    def _read_starttag(self, tag):
+        table = self._table
+        if tag == "table":
+            table.depth += 1
+        elif tag == "tr" and table.depth == 1:
+            table.row = []
+        elif tag == "td" and table.row is not None:
+            table.cell = []
+
+    def handle_endtag(self, tag):
+        table = self._table
+        if table is None:
+            return
+
+        if tag == "td" and table.cell is not None:
+            table.row.append("".join(table.cell).strip())
+            table.cell = None
+        elif tag == "tr" and table.row is not None and table.depth == 1:
+            if table.row:
+                table.rows.append(table.row)
+            table.row = None
+        elif tag == "table":
+            table.depth -= 1
+            if table.depth == 0:
+                self._close_table()
+
+    def handle_data(self, data):
+        table = self._table
+        if table is None:
+            return
+        table.text.append(data)
+        if table.cell is not None:
+            table.cell.append(data)
+
+    def _close_table(self):
+        table = self._table
+        self._table = None
+        text = "".join(table.text)
+        for i in table.locator_index:
+            marker = self.locators[i].marker
+            if marker is None or marker in text:
+                self.tables[i] = table.rows
+                self._armed.discard(i)
+
+
+def extract_tables(
+    content: Union[bytes, str], locators: List[TableLocator]
+) -> List[List[List[str]]]:
+    """Read located tables from a page, stopping once they have all been read.
+
+    Args:
+        content (bytes or str): page content, bytes are decoded as UTF-8
+        locators (list[TableLocator]): tables to read
+
+    Raises:
+        TableNotFound: When a table was not found.
+
+    Returns:
+        list[list[list[str]]]: rows of every located table
+    """
+    extractor = TableExtractor(locators)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    for start in range(0, len(content), CHUNK_SIZE):
+        chunk = content[start : start + CHUNK_SIZE]
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        extractor.feed(chunk)
+        if extractor.done:
+            break
+    else:
+        extractor.close()
+
+    missing = [
+        locator for locator, table in zip(locators, extractor.tables) if table is None
+    ]
+    if missing:
+        raise TableNotFound(f"Tables not found: {missing}")
+    return extractor.tables
+
+
+def extract_table(content: Union[bytes, str], locator: TableLocator) -> List[List[str]]:
+    """Read a located table from a page, see `extract_tables`.
+
+    Args:
+        content (bytes or str): page content, bytes are decoded as UTF-8
+        locator (TableLocator): table to read
+
+    Raises:
+        TableNotFound: When the table was not found.
+
+    Returns:
+        list[list[str]]: table rows
+    """
+    return extract_tables(content, [locator])[0]
+
+
+@dataclass(frozen=True)
+class ScraperSpec:
+    """Declarative description of a docs page scraper.
+
+    Attributes:
+        url: page URL
+        tables: located tables, all read in a single pass over the page
+        error: message of the ScrappingError raised when a table has no value
+        column: index of the cell kept from every row, whole rows if None
+        row_filter: rows for which it returns a falsy value are skipped
+        post_process: applied to the values of all tables
+    """
+
+    url: str
+    tables: Tuple[TableLocator, ...]
+    error: str
+    column: Optional[int] = 0
+    row_filter: Optional[Callable[[List[str]], bool]] = None
+    post_process: Optional[Callable[[list], list]] = None
+
+
+class CompiledScraper:
+    """Scraper spec ready to extract values from page contents."""
+
+    def __init__(self, spec: ScraperSpec):
+        self.spec = spec
+        self.locators = list(spec.tables)
+        self.get_value = list if spec.column is None else itemgetter(spec.column)
+        self.row_filter = spec.row_filter or bool
+
+    def extract(self, content: Union[bytes, str]) -> list:
+        """Extract values from page content.
+
+        Args:
+            content (bytes or str): page content
+
+        Raises:
+            ScrappingError: When a table is missing or has no value.
+
+        Returns:
+            list: values of all tables, post processed
+        """
+        values = []
+        for rows in extract_tables(content, self.locators):
+            table_values = [self.get_value(row) for row in rows if self.row_filter(row)]
+            if table_values == []:
+                raise ScrappingError(self.spec.error)
+            values += table_values
+
+        if self.spec.post_process:
+            values = self.spec.post_process(values)
+        return values
+
+
+@lru_cache(maxsize=None)
+def compile_spec(spec: ScraperSpec) -> CompiledScraper:
+    """Compile a scraper spec, once per process.
+
+    Args:
+        spec (ScraperSpec): scraper spec
+
+    Returns:
+        CompiledScraper: compiled scraper
+    """
+    return CompiledScraper(spec)
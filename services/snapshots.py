@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+import boto3
+from botocore.exceptions import ClientError
+from django.conf import settings
+
+
+class SnapshotNotFound(Exception):
+    pass
+
+
+def get_digest(content: bytes) -> str:
+    """Content address of a raw payload.
+
+    Args:
+        content (bytes): raw payload
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def get_blob_name(digest: str) -> str:
+    # fan out so a directory or prefix never holds every snapshot
+    return f"{digest[:2]}/{digest}.gz"
+
+
+class LocalSnapshotStore:
+    """Gzip compressed snapshots in a local directory.
+
+    Also stands in for S3 in development and tests.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def put(self, digest: str, content: bytes) -> int:
+        """Store a payload, once per digest.
+
+        Args:
+            digest (str): content address, see `get_digest`
+            content (bytes): raw payload
+
+        Returns:
+            int: compressed size in bytes
+        """
+        path = self.directory / get_blob_name(digest)
+        if path.exists():
+            return path.stat().st_size
+        compressed = gzip.compress(content)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename so a snapshot is never seen half written
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(compressed)
+        tmp_path.rename(path)
+        return len(compressed)
+
+    def get(self, digest: str) -> bytes:
+        """Load a payload.
+
+        Args:
+            digest (str): content address
+
+        Raises:
+            SnapshotNotFound: When the payload is not stored.
+
+        Returns:
+            bytes: raw payload
+        """
+        path = self.directory / get_blob_name(digest)
+        if not path.exists():
+            raise SnapshotNotFound(digest)
+        return gzip.decompress(path.read_bytes())
+
+
+class S3SnapshotStore:
+    """Gzip compressed snapshots in an S3 bucket."""
+
+    def __init__(self, bucket: str, prefix: str = ""):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.session.Session().client("s3")
+
+    def put(self, digest: str, content: bytes) -> int:
+        """Store a payload, see `LocalSnapshotStore.put`.
+
+        Callers skip digests already indexed so no existence check is made,
+        writing the same content address twice is harmless.
+        """
+        compressed = gzip.compress(content)
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.prefix + get_blob_name(digest),
+            Body=compressed,
+            ContentEncoding="gzip",
+        )
+        return len(compressed)
+
+    def get(self, digest: str) -> bytes:
+        """Load a payload, see `LocalSnapshotStore.get`."""
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self.prefix + get_blob_name(digest)
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                raise SnapshotNotFound(digest) from e
+            raise
+        return gzip.decompress(response["Body"].read())
+
+
+@lru_cache(maxsize=None)
+def get_snapshot_store():
+    """Snapshot store configured by `settings.SNAPSHOT_STORAGE`.
+
+    Returns:
+        LocalSnapshotStore or S3SnapshotStore or None: None when disabled
+    """
+    if settings.SNAPSHOT_STORAGE == "local":
+        return LocalSnapshotStore(settings.SNAPSHOT_DIR)
+    if settings.SNAPSHOT_STORAGE == "s3":
+        return S3SnapshotStore(settings.SNAPSHOT_S3_BUCKET, settings.SNAPSHOT_S3_PREFIX)
+    return None
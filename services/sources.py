@@ -0,0 +1,168 @@
+import json
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+from django.conf import settings
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+# see `source_mode`
+_mode = LIVE
+_fixtures_dir = None
+
+
+class FixtureNotFound(Exception):
+    pass
+
+
+@contextmanager
+def source_mode(mode: str, fixtures_dir: Path = None):
+    """Record raw source payloads to fixtures or replay them without network.
+
+    Args:
+        mode (str): LIVE, RECORD or REPLAY
+        fixtures_dir (Path): `settings.POLLING_FIXTURES_DIR` if not set
+    """
+    global _mode, _fixtures_dir
+
+    _mode = mode
+    _fixtures_dir = Path(fixtures_dir or settings.POLLING_FIXTURES_DIR)
+    try:
+        yield
+    finally:
+        _mode = LIVE
+        _fixtures_dir = None
+
+
+def get_source_mode():
+    return _mode
+
+
+def fixture_path(key: str, extension: str) -> Path:
+    """Path of the fixture of a source.
+
+    Args:
+        key (str): source identifier, URL or API call
+        extension (str): "html" or "json"
+
+    Returns:
+        Path: fixture file path
+    """
+    name = re.sub(r"^https?://", "", key)
+    name = re.sub(r"[^A-Za-z0-9.-]+", "_", name).strip("_")
+    return _fixtures_dir / f"{name}.{extension}"
+
+
+def dump_payload(response) -> str:
+    """Serialize an API response the way it is recorded.
+
+    Args:
+        response (dict or list): JSON serializable response or pages
+
+    Returns:
+        str: stable JSON, keys are sorted
+    """
+    return json.dumps(response, indent=2, sort_keys=True, default=str)
+
+
+def record_page(url: str, content: bytes):
+    """Save raw page content when recording.
+
+    Args:
+        url (str): page URL
+        content (bytes): page content
+    """
+    if _mode == RECORD:
+        path = fixture_path(url, "html")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def replay_page(url: str) -> bytes:
+    """Load raw page content of a recorded page.
+
+    Args:
+        url (str): page URL
+
+    Raises:
+        FixtureNotFound: When the page was not recorded.
+
+    Returns:
+        bytes: page content
+    """
+    path = fixture_path(url, "html")
+    if not path.exists():
+        raise FixtureNotFound(str(path))
+    return path.read_bytes()
+
+
+def fetch_api(key: str, call_fn: Callable) -> dict:
+    """Call a cloud provider API through the record/replay layer.
+
+    Every API call of poll functions goes through here so its raw response
+    can be recorded and replayed like docs pages.
+
+    Args:
+        key (str): API call identifier, e.g. "rds.describe_db_engine_versions.mysql"
+        call_fn (Callable): called without arguments, returns JSON serializable response
+
+    Raises:
+        FixtureNotFound: When replaying a call that was not recorded.
+
+    Returns:
+        dict: API response
+    """
+    if _mode == REPLAY:
+        path = fixture_path(key, "json")
+        if not path.exists():
+            raise FixtureNotFound(str(path))
+        return json.loads(path.read_text())
+
+    response = call_fn()
+    if _mode == RECORD:
+        path = fixture_path(key, "json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(dump_payload(response))
+    return response
+
+
+def fetch_api_pages(key: str, pages_fn: Callable) -> Iterator[dict]:
+    """Stream the pages of a paginated API call through the record/replay layer.
+
+    Pages are yielded as they are received, they are only kept in memory
+    when recording.
+
+    Args:
+        key (str): API call identifier, e.g. "rds.describe_db_engine_versions.mysql"
+        pages_fn (Callable): called without arguments, returns an iterable of
+            JSON serializable pages
+
+    Raises:
+        FixtureNotFound: When replaying a call that was not recorded.
+
+    Yields:
+        dict: API response page
+    """
+    if _mode == REPLAY:
+        path = fixture_path(key, "json")
+        if not path.exists():
+            raise FixtureNotFound(str(path))
+        pages = json.loads(path.read_text())
+        # fixtures recorded with `fetch_api` hold a single page
+        yield from [pages] if isinstance(pages, dict) else pages
+        return
+
+    recorded_pages = []
+    for page in pages_fn():
+        if _mode == RECORD:
+            recorded_pages.append(page)
+        yield page
+
+    if _mode == RECORD:
+        path = fixture_path(key, "json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(dump_payload(recorded_pages))
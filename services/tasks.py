@@ -1,894 +1,2119 @@
+import asyncio
+import contextvars
 import datetime
 import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
 from functools import reduce
-from typing import Callable
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, List
+from urllib.parse import urlparse
 
 import boto3
 import dateutil.parser
 import requests
 import structlog
-from bs4 import BeautifulSoup
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
 from django.utils import timezone
 from google.cloud import container_v1
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
 
-from core.util import notify_operator
+from core.util import AlertBuffer, notify_operator
+from zappa.asynchronous import task
+
+from services import http
 from services.base import Service, services
-from services.models import Version
+from services.cache import fetch_once, get_run_cache, run_cache
+from services.models import (
+    PollResult,
+    PollRun,
+    ServicePollState,
+    Snapshot,
+    SourceValidator,
+    Version,
+    VersionEvent,
+    VersionRegion,
+)
+from services.parsing import (
+    ScraperSpec,
+    ScrappingError,
+    TableLocator,
+    compile_spec,
+)
+from services.snapshots import get_digest, get_snapshot_store
+from services.sources import (
+    REPLAY,
+    dump_payload,
+    fetch_api,
+    fetch_api_pages,
+    get_source_mode,
+    record_page,
+    replay_page,
+)
 
 logger = structlog.get_logger(__name__)
 
 
-class ScrappingError(Exception):
-    pass
+AWS_LAMBDA_RUNTIMES_URL = (
+    "https://docs.aws.amazon.com/lambda/latest/dg/lambda-runtimes.html"
+)
+GCP_SCOPE = "https://www.googleapis.com/auth/cloud-platform"
+# runtime name prefix by service name
+AWS_LAMBDA_RUNTIME_TYPES = {
+    "aws_lambda_nodejs": "Node.js",
+    "aws_lambda_python": "Python",
+    "aws_lambda_ruby": "Ruby",
+    "aws_lambda_java": "Java",
+    "aws_lambda_go": "Go",
+    "aws_lambda_dotnet": ".NET",
+    "aws_lambda_custom": "Custom",
+}
+# service name by RDS engine
+AWS_RDS_ENGINES = {
+    "aurora": "aws_aurora",
+    "aurora-mysql": "aws_aurora_mysql",
+    "aurora-postgresql": "aws_aurora_postgres",
+    "mariadb": "aws_mariadb",
+    "mysql": "aws_mysql",
+    "postgres": "aws_postgres",
+    "oracle-ee": "aws_oracle_ee",
+    "oracle-ee-cdb": "aws_oracle_ee_cdb",
+    "oracle-se2": "aws_oracle_se2",
+    "oracle-se2-cdb": "aws_oracle_se2_cdb",
+    "sqlserver-ee": "aws_sqlserver_ee",
+    "sqlserver-se": "aws_sqlserver_se",
+    "sqlserver-ex": "aws_sqlserver_ex",
+    "sqlserver-web": "aws_sqlserver_web",
+}
+# engine prefix of version names by service name
+GCP_CLOUD_SQL_ENGINES = {
+    "gcp_cloudsql_postgres": "postgres",
+    "gcp_cloudsql_sqlserver": "sqlserver",
+    "gcp_cloudsql_mysql": "mysql",
+}
+
+
+# PollService being fetched by the current thread, or asyncio task with the
+# asyncio engine
+_current_poll = contextvars.ContextVar("current_poll", default=None)
+
+# AWS session and clients by (service, region), see get_aws_client
+_aws_session = None
+_aws_clients = {}
+_aws_lock = threading.Lock()
+
+# Google API clients by (service, version), see get_gcp_service
+_gcp_services = {}
+_gcp_lock = threading.Lock()
+# GCP credentials, see get_gcp_credentials
+_gcp_credentials = None
+_gcp_credentials_lock = threading.Lock()
+
+
+class SourceNotModified(Exception):
+    """Source has not changed since it was last successfully processed."""
+
+
+def snapshots_enabled():
+    """Raw payloads of live sources are archived, see `services.snapshots`."""
+    return get_snapshot_store() is not None and get_source_mode() != REPLAY
+
+
+def capture_snapshot(key, kind, payload):
+    """Keep a raw payload on the service being fetched, archived once it is committed.
 
+    Args:
+        key (str): page URL or API call key, as used by the record/replay layer
+        kind (str): `Snapshot.HTML` or `Snapshot.JSON`
+        payload (bytes or dict or list): page content or API response
+    """
+    poll_service = _current_poll.get()
+    if poll_service is None or not snapshots_enabled():
+        return
+    if kind == Snapshot.JSON:
+        payload = dump_payload(payload).encode()
+    poll_service.add_snapshot(key, kind, payload)
 
-def get_gcp_credentials():
-    """Read GCP credentials from settings in order to use it with GCP clients."""
-
-    # Cleaning gcp credentials from weird new line chars.
-    # Problem is that we want new line chars in private key, but not in the rest
-    # of the json
-    gcp_credentials = json.loads(
-        settings.GOOGLE_APPLICATION_CREDENTIALS.replace('\\n  "', '"')
-        .replace('"\\n', '"')
-        .replace("}\\n", "}")
-    )
-    credentials = service_account.Credentials.from_service_account_info(gcp_credentials)
-    return credentials
 
+def fetch_page(url):
+    """Get a source page, conditionally if its validators are known.
+
+    Validators of a full response are remembered on the PollService being
+    fetched and persisted once that service has been committed. Request
+    duration and size are added to the PollService metrics.
 
-def _gcp_cloud_sql(engine):
-    """Generic function to get Cloud SQL versions.
+    Pages are recorded to or replayed from fixtures, see `services.sources`.
 
     Args:
-        engine (str): Database engine.
+        url (str): page URL
+
+    Raises:
+        SourceNotModified: When the page has not changed since the last poll.
 
     Returns:
-        list(str): List of supported versions.
+        requests.Response: page response
     """
-    with build(
-        "sqladmin",
-        "v1",
-        credentials=get_gcp_credentials(),
-    ) as sqladmin:
-        flags = sqladmin.flags().list().execute()
-    return [
-        v
-        for v in reduce(
-            lambda a, b: set(list(a) + list(b)),
-            [i["appliesTo"] for i in flags["items"]],
-        )
-        if str(v).lower().startswith(str(engine).lower())
-    ]
+    if get_source_mode() == REPLAY:
+        return _replayed_page(url)
+
+    validator = _page_validator(url)
+    poll_service = _current_poll.get()
+    with poll_service.http_request() if poll_service else nullcontext():
+        page = http.get(url, headers=validator.headers if validator else {})
+    return _process_page(url, page, validator)
+
+
+async def fetch_page_async(url):
+    """Get a source page as `fetch_page` does, without blocking the event loop.
 
+    Used by scrapers polled with the asyncio engine, see `scraper`.
 
-def gcp_cloudsql_postgres():
-    """Get GCP CloudSQL Postgres versions.
+    Args:
+        url (str): page URL
+
+    Raises:
+        SourceNotModified: When the page has not changed since the last poll.
 
     Returns:
-        list[str] of supported versions
+        httpx.Response: page response
     """
-    return _gcp_cloud_sql("postgres")
+    if get_source_mode() == REPLAY:
+        return _replayed_page(url)
+
+    validator = _page_validator(url)
+    poll_service = _current_poll.get()
+    with poll_service.http_request() if poll_service else nullcontext():
+        page = await http.get_async(url, headers=validator.headers if validator else {})
+    return _process_page(url, page, validator)
+
+
+def _replayed_page(url):
+    page = requests.Response()
+    page.status_code = 200
+    page._content = replay_page(url)
+    return page
 
 
-def gcp_cloudsql_sqlserver():
-    """Get GCP CloudSQL SQL Server versions.
+def _page_validator(url):
+    cache = get_run_cache()
+    return cache.validators.get(url) if cache else None
+
+
+def _process_page(url, page, validator):
+    """Count, record and archive a fetched page and capture its validators.
+
+    Args:
+        url (str): page URL
+        page (requests.Response or httpx.Response): page response
+        validator (services.models.SourceValidator): validator the page was
+            requested with, if any
+
+    Raises:
+        SourceNotModified: When the page has not changed since the last poll.
 
     Returns:
-        list[str] of supported versions
+        requests.Response or httpx.Response: page response
     """
-    return _gcp_cloud_sql("sqlserver")
+    poll_service = _current_poll.get()
+    if poll_service:
+        poll_service.count_received(len(page.content))
 
+    if validator and page.status_code == 304:
+        cache = get_run_cache()
+        cache.record_not_modified(validator)
+        raise SourceNotModified(url)
 
-def gcp_cloudsql_mysql():
-    """Get GCP MySQL Server versions.
+    if page.status_code == 200:
+        record_page(url, page.content)
+        capture_snapshot(url, Snapshot.HTML, page.content)
+
+    if poll_service and page.status_code == 200:
+        poll_service.fresh_validators[url] = {
+            "etag": page.headers.get("ETag", ""),
+            "last_modified": page.headers.get("Last-Modified", ""),
+            "content_length": len(page.content),
+        }
+    return page
+
+
+def scraper(spec: ScraperSpec) -> Callable:
+    """Build the poll function of a docs page scraper spec.
+
+    The spec is compiled once, when the poll function is built. Its
+    `poll_async` coroutine function is the same poll function fetching the
+    page without blocking, used by the asyncio engine.
+
+    Args:
+        spec (ScraperSpec): scraper spec
 
     Returns:
-        list[str] of supported versions
+        Callable: poll function, returns the extracted values
     """
-    return _gcp_cloud_sql("mysql")
+    compiled = compile_spec(spec)
 
+    def poll_fn():
+        return compiled.extract(fetch_page(spec.url).content)
 
-def gcp_gke():
-    """Get GCP GKE master node supported versions.
+    async def poll_async():
+        return compiled.extract((await fetch_page_async(spec.url)).content)
+
+    poll_fn.poll_async = poll_async
+    return poll_fn
+
+
+def _regional_key(key, region_name):
+    """Record/replay key of an API call made in a given region.
+
+    Args:
+        key (str): API call identifier
+        region_name (str): region, None for the default region
 
     Returns:
-        list(str): List of supported versions
+        str: key
     """
-    client = container_v1.ClusterManagerClient(credentials=get_gcp_credentials())
-    result = client.get_server_config(zone="europe-central2")
-    return result.valid_master_versions
+    return f"{key}.{region_name}" if region_name else key
 
 
-def gcp_dataproc_os():
-    """Get GCP Dataproc OS images compatible versions.
+def in_regions(poll_fn: Callable, regions: List[str]) -> Callable:
+    """Poll a service in many regions concurrently.
+
+    At most `settings.POLLING_REGION_CONCURRENCY` regions are polled at the
+    same time. A failure in any region fails the whole poll so versions are
+    never deprecated because of a single unreachable region, and so does an
+    empty list of regions, e.g. when none of the configured regions has the
+    service, instead of deprecating every version.
+
+    Args:
+        poll_fn (Callable): called with a region name, returns the versions
+            supported in that region, or such lists by service name for
+            multi-service poll functions
+        regions (list[str]): regions to poll
 
     Returns:
-        list[str]: supported versions
+        Callable: poll function returning the regions every supported
+            version is available in, by version (by service name first for
+            multi-service poll functions)
     """
 
-    page = requests.get(
-        "https://cloud.google.com/dataproc/docs/concepts/versioning/overview"
-    )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="how_versioning_works")
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling
-    )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[0].text.strip())
-            if version:
-                supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("Azure Dataproc OS images versions not found")
-    return supported_versions
+    def poll_regions():
+        if not regions:
+            raise ValueError("No region to poll")
+
+        poll_service = _current_poll.get()
+
+        def poll_region(region):
+            token = _current_poll.set(poll_service)
+            try:
+                return poll_fn(region)
+            finally:
+                _current_poll.reset(token)
+
+        with ThreadPoolExecutor(
+            max_workers=settings.POLLING_REGION_CONCURRENCY
+        ) as executor:
+            results = list(executor.map(poll_region, regions))
+
+        if results and all(isinstance(result, dict) for result in results):
+            service_names = dict.fromkeys(name for r in results for name in r)
+            return {
+                name: _merge_regions(regions, [r.get(name, []) for r in results])
+                for name in service_names
+            }
+        return _merge_regions(regions, results)
+
+    return poll_regions
+
+
+def _merge_regions(regions, results):
+    """Merge versions supported in each region into regions by version.
+
+    Args:
+        regions (list[str]): polled regions
+        results (list[list[str]]): supported versions of each region
+
+    Returns:
+        dict: list[str] of regions by version
+    """
+    version_regions = {}
+    for region, versions in zip(regions, results):
+        for version in versions:
+            version_regions.setdefault(version, []).append(region)
+    return version_regions
+
+
+class _GcpCredentials(service_account.Credentials):
+    """Service account credentials counting access token fetches."""
+
+    def refresh(self, request):
+        super().refresh(request)
+        poll_service = _current_poll.get()
+        if poll_service is not None:
+            poll_service.count_token_fetch()
+
+
+def get_gcp_credentials():
+    """Read GCP credentials from settings in order to use it with GCP clients.
+
+    Credentials are parsed once per process and shared by all GCP clients.
+    They are scoped upfront so clients do not make scoped copies of them,
+    the access token is then fetched once and reused by every client until
+    it is about to expire.
+    """
+    global _gcp_credentials
+
+    with _gcp_credentials_lock:
+        if _gcp_credentials is None:
+            # Cleaning gcp credentials from weird new line chars.
+            # Problem is that we want new line chars in private key, but not in the rest
+            # of the json
+            gcp_credentials = json.loads(
+                settings.GOOGLE_APPLICATION_CREDENTIALS.replace('\\n  "', '"')
+                .replace('"\\n', '"')
+                .replace("}\\n", "}")
+            )
+            _gcp_credentials = _GcpCredentials.from_service_account_info(
+                gcp_credentials, scopes=[GCP_SCOPE]
+            )
+        return _gcp_credentials
+
+
+def get_gke_client():
+    """Get cached GKE client, safe to share between threads.
+
+    Returns:
+        container_v1.ClusterManagerClient: client
+    """
+    with _gcp_lock:
+        if "container" not in _gcp_services:
+            _gcp_services["container"] = container_v1.ClusterManagerClient(
+                credentials=get_gcp_credentials()
+            )
+        return _gcp_services["container"]
+
+
+def get_gcp_discovery_path(service_name, version):
+    """Path of the discovery document of a Google API bundled with the deploy.
+
+    Args:
+        service_name (str): Google API, e.g. "sqladmin"
+        version (str): API version, e.g. "v1"
+
+    Returns:
+        Path: document path, see the refresh_gcp_discovery command
+    """
+    return Path(settings.GCP_DISCOVERY_DIR) / f"{service_name}.{version}.json"
+
 
+def get_gcp_service(service_name, version):
+    """Get cached Google API client.
 
-def gcp_dataproc():
-    """Get GCP Dataproc compatible versions.
+    Building a client parses the API discovery document so clients are
+    built once per process. The document bundled with the deploy is used
+    if present, the one shipped with google-api-python-client otherwise, it
+    is never fetched over the network. Clients are not thread safe, each is
+    only used by the poll function of its API.
+
+    Args:
+        service_name (str): Google API, e.g. "sqladmin"
+        version (str): API version, e.g. "v1"
 
     Returns:
-        list[str]: supported versions
+        googleapiclient.discovery.Resource: client
     """
+    key = (service_name, version)
+    with _gcp_lock:
+        if key not in _gcp_services:
+            path = get_gcp_discovery_path(service_name, version)
+            if path.exists():
+                _gcp_services[key] = build_from_document(
+                    path.read_text(), credentials=get_gcp_credentials()
+                )
+            else:
+                _gcp_services[key] = build(
+                    service_name,
+                    version,
+                    credentials=get_gcp_credentials(),
+                    static_discovery=True,
+                )
+        return _gcp_services[key]
+
+
+def _gcp_cloud_sql_flags():
+    """List Cloud SQL database flags, they hold versions of all engines.
+
+    Returns:
+        dict: flags list response
+    """
+
+    def list_flags():
+        return get_gcp_service("sqladmin", "v1").flags().list().execute()
+
+    flags = fetch_api("sqladmin.flags.list", list_flags)
+    capture_snapshot("sqladmin.flags.list", Snapshot.JSON, flags)
+    return flags
 
-    page = requests.get(
-        "https://cloud.google.com/dataproc/docs/concepts/versioning/dataproc-versions"
+
+def gcp_cloud_sql():
+    """Get Cloud SQL versions of all engines.
+
+    Returns:
+        dict: list[str] of supported versions by service name
+    """
+    flags = _gcp_cloud_sql_flags()
+    versions = reduce(
+        lambda a, b: set(list(a) + list(b)),
+        [i["appliesTo"] for i in flags["items"]],
     )
-    final_supported_versions = []
-    soup = BeautifulSoup(page.content, "html.parser")
-    images = {"debian": 6, "ubuntu": 4, "rocky linux": 4}
-    for image, offset in images.items():
-        supported_versions = []
-        server_version_table = soup.find(id=f"{image.replace(' ', '_')}_images")
-        for _ in range(offset):
-            server_version_table = server_version_table.nextSibling
-        for child in server_version_table.findChildren("tr"):
-            data = child.findChildren("td")
-            if data:
-                version = str(data[0].text.strip())
-                if version:
-                    supported_versions.append(version)
-        if supported_versions == []:
-            raise ScrappingError("GCP Dataproc versions not found")
-        final_supported_versions += supported_versions
-    return final_supported_versions
-
-
-def gcp_memorystore_redis():
-    """Get GCP Memorystore for Redis compatible versions.
+    return {
+        service_name: [
+            v for v in versions if str(v).lower().startswith(str(engine).lower())
+        ]
+        for service_name, engine in GCP_CLOUD_SQL_ENGINES.items()
+    }
+
+
+def gcp_gke(region_name="europe-central2"):
+    """Get GCP GKE master node supported versions.
+
+    Args:
+        region_name (str): GCP region
 
     Returns:
-        list[str]: supported versions
+        list(str): List of supported versions
     """
 
-    page = requests.get(
-        "https://cloud.google.com/memorystore/docs/redis/supported-versions"
+    def get_server_config():
+        result = get_gke_client().get_server_config(zone=region_name)
+        return container_v1.ServerConfig.to_dict(result)
+
+    key = f"container.get_server_config.{region_name}"
+    result = fetch_api(key, get_server_config)
+    capture_snapshot(key, Snapshot.JSON, result)
+    return result["valid_master_versions"]
+
+
+# GCP Dataproc OS images compatible versions
+gcp_dataproc_os = scraper(
+    ScraperSpec(
+        url="https://cloud.google.com/dataproc/docs/concepts/versioning/overview",
+        tables=(TableLocator(anchor_id="how_versioning_works"),),
+        row_filter=itemgetter(0),
+        error="Azure Dataproc OS images versions not found",
+    )
+)
+
+
+# GCP Dataproc compatible versions, of all images
+gcp_dataproc = scraper(
+    ScraperSpec(
+        url="https://cloud.google.com/dataproc/docs/concepts/versioning/dataproc-versions",
+        tables=tuple(
+            TableLocator(anchor_id=f"{image}_images")
+            for image in ["debian", "ubuntu", "rocky_linux"]
+        ),
+        row_filter=itemgetter(0),
+        error="GCP Dataproc versions not found",
     )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="current_versions")
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling
+)
+
+
+# GCP Memorystore for Redis compatible versions
+gcp_memorystore_redis = scraper(
+    ScraperSpec(
+        url="https://cloud.google.com/memorystore/docs/redis/supported-versions",
+        tables=(TableLocator(anchor_id="current_versions"),),
+        column=1,
+        row_filter=itemgetter(1),
+        error="Azure Memorystore for Redis versions not found",
     )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[1].text.strip())
-            if version:
-                supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("Azure Memorystore for Redis versions not found")
-    return supported_versions
+)
 
 
 def get_aws_session():
+    """Get process wide AWS session, kept between warm Lambda invocations.
+
+    Returns:
+        boto3.session.Session: shared session
+    """
+    global _aws_session
+
     # credentials used here are from zappa settings
-    return boto3.session.Session()
+    with _aws_lock:
+        if _aws_session is None:
+            _aws_session = boto3.session.Session()
+    return _aws_session
+
+
+def aws_regions(service_name):
+    """Configured AWS regions the service is available in.
+
+    Availability comes from the endpoint data shipped with botocore so
+    regions a service was never launched in do not fail its poll.
+
+    Args:
+        service_name (str): AWS service, e.g. "rds"
+
+    Returns:
+        list[str]: regions of `settings.POLLING_AWS_REGIONS` to poll
+    """
+    available = set(get_aws_session().get_available_regions(service_name))
+    return [region for region in settings.POLLING_AWS_REGIONS if region in available]
+
+
+def get_aws_client(service_name, region_name=None):
+    """Get cached AWS client.
+
+    Creating a client loads botocore service models from disk so clients are
+    created once per process. Sessions are not thread safe so clients are
+    created under a lock, clients themselves are safe to share between threads.
+
+    Args:
+        service_name (str): AWS service, e.g. "rds"
+        region_name (str): AWS region, session default if not set
+
+    Returns:
+        botocore.client.BaseClient: client
+    """
+    key = (service_name, region_name)
+    session = get_aws_session()
+    with _aws_lock:
+        if key not in _aws_clients:
+            _aws_clients[key] = session.client(service_name, region_name=region_name)
+        return _aws_clients[key]
+
+
+def aws_pages(key, service_name, operation_name, region_name=None, **params):
+    """Stream all pages of an AWS API call.
+
+    The boto3 paginator of the operation is used, NextToken is followed by
+    hand for the few operations boto3 has no paginator for. Every page
+    received is counted on the service being polled and all of them are
+    archived as a single snapshot once the last one is received.
+
+    Args:
+        key (str): record/replay key of the call
+        service_name (str): AWS service, e.g. "rds"
+        operation_name (str): client method, e.g. "describe_db_engine_versions"
+        region_name (str): AWS region, session default if not set
+        **params: operation parameters, e.g. server side filters
+
+    Yields:
+        dict: response page
+    """
+    page_size = settings.POLLING_AWS_PAGE_SIZE
+
+    def pages():
+        client = get_aws_client(service_name, region_name)
+        if client.can_paginate(operation_name):
+            paginator = client.get_paginator(operation_name)
+            yield from paginator.paginate(
+                **params, PaginationConfig={"PageSize": page_size}
+            )
+            return
+
+        operation = getattr(client, operation_name)
+        page = operation(**params, MaxResults=page_size)
+        yield page
+        while page.get("NextToken"):
+            page = operation(
+                **params, MaxResults=page_size, NextToken=page["NextToken"]
+            )
+            yield page
+
+    poll_service = _current_poll.get()
+    key = _regional_key(key, region_name)
+    # request metadata (ids, dates) differs on every call, it is not archived
+    snapshot = [] if poll_service is not None and snapshots_enabled() else None
+    api_pages = fetch_api_pages(key, pages)
+    while True:
+        with poll_service.http_request() if poll_service else nullcontext():
+            page = next(api_pages, None)
+        if page is None:
+            if snapshot is not None:
+                capture_snapshot(key, Snapshot.JSON, snapshot)
+            return
+        if snapshot is not None:
+            snapshot.append(
+                {
+                    name: value
+                    for name, value in page.items()
+                    if name != "ResponseMetadata"
+                }
+            )
+        if poll_service is not None:
+            poll_service.count_api_page()
+            poll_service.count_received(
+                int(
+                    page.get("ResponseMetadata", {})
+                    .get("HTTPHeaders", {})
+                    .get("content-length", 0)
+                )
+            )
+        yield page
 
 
-def aws_elasticache_redis():
+def aws_elasticache_redis(region_name=None):
     """Get AWS ElastiCache Redis versions.
 
+    Args:
+        region_name (str): AWS region, session default if not set
+
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("elasticache")
-    versions = client.describe_cache_engine_versions(Engine="redis")[
-        "CacheEngineVersions"
+    return [
+        version["EngineVersion"]
+        for page in aws_pages(
+            "elasticache.describe_cache_engine_versions.redis",
+            "elasticache",
+            "describe_cache_engine_versions",
+            region_name,
+            Engine="redis",
+        )
+        for version in page["CacheEngineVersions"]
     ]
-    return [version["EngineVersion"] for version in versions]
 
 
-def aws_elasticache_memcached():
+def aws_elasticache_memcached(region_name=None):
     """Get AWS ElastiCache Memcached versions.
 
+    Args:
+        region_name (str): AWS region, session default if not set
+
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("elasticache")
-    versions = client.describe_cache_engine_versions(Engine="memcached")[
-        "CacheEngineVersions"
+    return [
+        version["EngineVersion"]
+        for page in aws_pages(
+            "elasticache.describe_cache_engine_versions.memcached",
+            "elasticache",
+            "describe_cache_engine_versions",
+            region_name,
+            Engine="memcached",
+        )
+        for version in page["CacheEngineVersions"]
     ]
-    return [version["EngineVersion"] for version in versions]
 
 
-def aws_kafka():
+def aws_kafka(region_name=None):
     """Get AWS Kafka versions.
 
     Already filters out deprecated versions.
 
+    Args:
+        region_name (str): AWS region, session default if not set
+
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("kafka")
-    versions = client.list_kafka_versions()["KafkaVersions"]
     return [
-        version["Version"] for version in versions if version["Status"] != "DEPRECATED"
+        version["Version"]
+        for page in aws_pages(
+            "kafka.list_kafka_versions", "kafka", "list_kafka_versions", region_name
+        )
+        for version in page["KafkaVersions"]
+        if version["Status"] != "DEPRECATED"
     ]
 
 
-def aws_es():
+def aws_es(region_name=None):
     """Get AWS ElasticSearch versions.
 
+    Args:
+        region_name (str): AWS region, session default if not set
+
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("es")
-    versions = client.list_elasticsearch_versions()["ElasticsearchVersions"]
-    return [version for version in versions]
+    return [
+        version
+        for page in aws_pages(
+            "es.list_elasticsearch_versions",
+            "es",
+            "list_elasticsearch_versions",
+            region_name,
+        )
+        for version in page["ElasticsearchVersions"]
+    ]
 
 
-def aws_opensearch():
+def aws_opensearch(region_name=None):
     """Get AWS OpenSearch versions.
 
     OpenSearch is a community-driven, open-source fork from the last
     ALv2 version of Elasticsearch and Kibana.
 
+    Args:
+        region_name (str): AWS region, session default if not set
+
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("opensearch")
-    versions = client.list_versions()["Versions"]
-    return [version for version in versions]
+    return [
+        version
+        for page in aws_pages(
+            "opensearch.list_versions", "opensearch", "list_versions", region_name
+        )
+        for version in page["Versions"]
+    ]
 
 
-def aws_neptune():
+def aws_neptune(region_name=None):
     """Get AWS Neptune versions.
 
     Neptune is a fully-managed graph database service.
 
+    Args:
+        region_name (str): AWS region, session default if not set
+
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("neptune")
-    versions = client.describe_db_engine_versions(Engine="neptune")["DBEngineVersions"]
-    return [version["EngineVersion"] for version in versions]
+    return [
+        version["EngineVersion"]
+        for page in aws_pages(
+            "neptune.describe_db_engine_versions",
+            "neptune",
+            "describe_db_engine_versions",
+            region_name,
+            Engine="neptune",
+        )
+        for version in page["DBEngineVersions"]
+    ]
 
 
-def aws_docdb():
+def aws_docdb(region_name=None):
     """Get AWS DocDB versions.
 
     DocumentDB is managed Mongo compatible DB.
 
+    Args:
+        region_name (str): AWS region, session default if not set
+
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("docdb")
-    versions = client.describe_db_engine_versions(Engine="docdb")["DBEngineVersions"]
-    return [version["EngineVersion"] for version in versions]
+    return [
+        version["EngineVersion"]
+        for page in aws_pages(
+            "docdb.describe_db_engine_versions",
+            "docdb",
+            "describe_db_engine_versions",
+            region_name,
+            Engine="docdb",
+        )
+        for version in page["DBEngineVersions"]
+    ]
 
 
-def aws_memorydb():
+def aws_memorydb(region_name=None):
     """Get AWS MemoryDB versions.
 
     Redis-compatible, durable, in-memory database service for ultra-fast performance.
 
-    Returns:
-        list[str] of supported versions
-    """
-    client = get_aws_session().client("memorydb")
-    versions = client.describe_engine_versions()["EngineVersions"]
-    return [version["EngineVersion"] for version in versions]
-
-
-def aws_rabbitmq():
-    """Get AWS RabbitMQ versions.
+    Args:
+        region_name (str): AWS region, session default if not set
 
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("mq")
-    engines = client.describe_broker_engine_types(EngineType="rabbitmq")[
-        "BrokerEngineTypes"
+    return [
+        version["EngineVersion"]
+        for page in aws_pages(
+            "memorydb.describe_engine_versions",
+            "memorydb",
+            "describe_engine_versions",
+            region_name,
+        )
+        for version in page["EngineVersions"]
     ]
-    versions = []
-    for engine in engines:
-        if engine["EngineType"] == "RABBITMQ":
-            versions += [version["Name"] for version in engine["EngineVersions"]]
-    return versions
 
 
-def aws_activemq():
-    """Get AWS ActiveMQ versions.
+def _aws_mq(engine_type, region_name=None):
+    """Generic function to get AWS MQ broker versions.
+
+    Args:
+        engine_type (str): broker engine, e.g. "rabbitmq"
+        region_name (str): AWS region, session default if not set
 
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("mq")
-    engines = client.describe_broker_engine_types(EngineType="activemq")[
-        "BrokerEngineTypes"
+    return [
+        version["Name"]
+        for page in aws_pages(
+            f"mq.describe_broker_engine_types.{engine_type}",
+            "mq",
+            "describe_broker_engine_types",
+            region_name,
+            EngineType=engine_type,
+        )
+        for engine in page["BrokerEngineTypes"]
+        if engine["EngineType"] == engine_type.upper()
+        for version in engine["EngineVersions"]
     ]
-    versions = []
-    for engine in engines:
-        if engine["EngineType"] == "ACTIVEMQ":
-            versions += [version["Name"] for version in engine["EngineVersions"]]
-    return versions
 
 
-def _aws_rds(engine):
-    """Generic function to get RDS versions.
+def aws_rabbitmq(region_name=None):
+    """Get AWS RabbitMQ versions.
+
+    Args:
+        region_name (str): AWS region, session default if not set
 
     Returns:
         list[str] of supported versions
     """
-    client = get_aws_session().client("rds")
-    versions = client.describe_db_engine_versions(Engine=engine)["DBEngineVersions"]
-    return [version["EngineVersion"] for version in versions]
+    return _aws_mq("rabbitmq", region_name)
 
 
-def aws_aurora():
-    """Get AWS Aurora for MySQL 5.6 compatible versions.
+def aws_activemq(region_name=None):
+    """Get AWS ActiveMQ versions.
+
+    Args:
+        region_name (str): AWS region, session default if not set
 
     Returns:
         list[str] of supported versions
     """
-    return _aws_rds("aurora")
+    return _aws_mq("activemq", region_name)
 
 
-def aws_aurora_mysql():
-    """Get AWS Aurora for MySQL 5.7+ compatible versions.
-
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("aurora-mysql")
+def aws_rds(region_name=None):
+    """Get versions of all RDS engines with a single paginated call.
 
+    Only available versions of the polled engines are listed, without
+    character sets and time zones, to keep pages small.
 
-def aws_aurora_postgres():
-    """Get AWS Aurora Postgres compatible versions.
+    Args:
+        region_name (str): AWS region, session default if not set
 
     Returns:
-        list[str] of supported versions
+        dict: list[str] of supported versions by service name
     """
-    return _aws_rds("aurora-postgresql")
+    supported_versions = {}
+    for page in aws_pages(
+        "rds.describe_db_engine_versions",
+        "rds",
+        "describe_db_engine_versions",
+        region_name,
+        Filters=[{"Name": "engine", "Values": list(AWS_RDS_ENGINES)}],
+        IncludeAll=False,
+        ListSupportedCharacterSets=False,
+        ListSupportedTimezones=False,
+    ):
+        for version in page["DBEngineVersions"]:
+            service_name = AWS_RDS_ENGINES.get(version["Engine"])
+            if service_name:
+                supported_versions.setdefault(service_name, []).append(
+                    version["EngineVersion"]
+                )
+    return supported_versions
 
 
-def aws_mariadb():
-    """Get AWS MariaDB compatible versions.
+def _aws_eks_is_supported(row):
+    version, eos_date = row[0], row[3]
+    return (
+        version
+        and eos_date
+        and dateutil.parser.parse(eos_date).timestamp()
+        > datetime.datetime.now().timestamp()
+    )
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("mariadb")
 
+# AWS EKS compatible versions
+aws_eks = scraper(
+    ScraperSpec(
+        url="https://docs.aws.amazon.com/eks/latest/userguide/kubernetes-versions.html",
+        tables=(TableLocator(anchor_id="kubernetes-release-calendar"),),
+        row_filter=_aws_eks_is_supported,
+        error="AWS EKS versions not found",
+    )
+)
 
-def aws_mysql():
-    """Get AWS MySQL compatible versions.
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("mysql")
+# All AWS Lambda supported runtimes, as dicts with their name and version
+_aws_lambda_runtimes = scraper(
+    ScraperSpec(
+        url=AWS_LAMBDA_RUNTIMES_URL,
+        tables=(TableLocator(marker="Supported Runtimes"),),
+        column=None,
+        post_process=lambda rows: [{"name": row[0], "version": row[1]} for row in rows],
+        error="AWS Lambda runtimes not found",
+    )
+)
 
 
-def aws_postgres():
-    """Get AWS Postgres compatible versions.
+def aws_lambda():
+    """Get AWS Lambda supported versions of all runtime types.
 
     Returns:
-        list[str] of supported versions
+        dict: list[str] of supported versions by service name
     """
-    return _aws_rds("postgres")
+    runtimes = _aws_lambda_runtimes()
+    return {
+        service_name: [
+            runtime["version"]
+            for runtime in runtimes
+            if runtime["name"].lower().startswith(runtime_type.lower())
+        ]
+        for service_name, runtime_type in AWS_LAMBDA_RUNTIME_TYPES.items()
+    }
+
+
+# Azure MariaDB server compatible versions
+azure_mariadb_server = scraper(
+    ScraperSpec(
+        url="https://docs.microsoft.com/en-us/rest/api/mariadb/servers/create",
+        tables=(TableLocator(anchor_id="serverversion"),),
+        error="Azure MariaDB Server versions not found",
+    )
+)
 
 
-def aws_oracle_ee():
-    """Get AWS Oracle Enterprise Edition compatible versions.
+# Azure PostgreSQL server compatible versions
+azure_postgresql_server = scraper(
+    ScraperSpec(
+        url="https://docs.microsoft.com/en-us/azure/postgresql/concepts-version-policy",
+        tables=(TableLocator(anchor_id="supported--postgresql-versions"),),
+        row_filter=lambda row: "retired" not in row[0].lower(),
+        error="Azure PostgreSQL Server versions not found",
+    )
+)
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("oracle-ee")
 
+def _azure_redis_versions(descriptions):
+    value = descriptions[0].strip(".").split("Supported versions:")[1]
+    return [v.strip() for v in value.split(",")]
 
-def aws_oracle_ee_cdb():
-    """Get AWS Oracle Enterprise Edition compatible versions.
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("oracle-ee-cdb")
+# Azure Redis server compatible versions, listed in the description of the
+# redisVersion property of the API
+azure_redis_server = scraper(
+    ScraperSpec(
+        url="https://docs.microsoft.com/en-us/rest/api/redis/redis/update",
+        tables=(TableLocator(anchor_id="request-body"),),
+        column=2,
+        row_filter=lambda row: row[0] == "properties.redisVersion",
+        post_process=_azure_redis_versions,
+        error="Azure Redis version not found",
+    )
+)
 
 
-def aws_oracle_se2():
-    """Get AWS Oracle Standard Edition Two compatible versions.
+# Azure MySQL server compatible versions
+azure_mysql_server = scraper(
+    ScraperSpec(
+        url="https://docs.microsoft.com/en-us/azure/mysql/concepts-version-policy",
+        tables=(TableLocator(anchor_id="supported-mysql-versions"),),
+        column=1,
+        row_filter=lambda row: "retired" not in row[1].lower(),
+        error="Azure MySQL Server versions not found",
+    )
+)
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("oracle-se2")
 
+def _azure_aks_is_released(row):
+    ga_date = row[3]
+    return (
+        ga_date != "*"
+        and dateutil.parser.parse(ga_date).replace(day=1).timestamp()
+        <= datetime.datetime.now().timestamp()
+    )
 
-def aws_oracle_se2_cdb():
-    """Get AWS Oracle Standard Edition Two Container Database compatible versions.
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("oracle-se2-cdb")
+# Azure Kubernetes compatible versions
+azure_aks = scraper(
+    ScraperSpec(
+        url="https://docs.microsoft.com/en-us/azure/aks/supported-kubernetes-versions",
+        tables=(TableLocator(anchor_id="aks-kubernetes-release-calendar"),),
+        row_filter=_azure_aks_is_released,
+        error="Azure Kubernetes versions not found",
+    )
+)
 
 
-def aws_sqlserver_ee():
-    """Get AWS SQL Server Enterprise Edition compatible versions.
+# Azure HDInsight compatible versions
+azure_hdinsight = scraper(
+    ScraperSpec(
+        url="https://docs.microsoft.com/en-us/azure/hdinsight/hdinsight-component-versioning",
+        tables=(TableLocator(anchor_id="supported-hdinsight-versions"),),
+        error="Azure HDInsight versions not found",
+    )
+)
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("sqlserver-ee")
 
+# Azure Databricks compatible versions
+azure_databricks = scraper(
+    ScraperSpec(
+        url="https://docs.microsoft.com/en-us/azure/databricks/release-notes/runtime/releases",
+        tables=(
+            TableLocator(
+                anchor_id="--supported-azure-databricks-runtime-releases-and-support-schedule"
+            ),
+        ),
+        row_filter=itemgetter(0),
+        error="Azure Databricks versions not found",
+    )
+)
 
-def aws_sqlserver_se():
-    """Get AWS SQL Server Enterprise Edition compatible versions.
 
-    Returns:
-        list[str] of supported versions
+class PollService:
+    """Poll a single service and persist the changes in its supported versions.
+
+    Polling is split in two halves so that it can be run concurrently:
+    `fetch` only calls `poll_fn` (network and parsing, no database access)
+    and is safe to run in a worker thread while `commit` diffs the result
+    against the database and has to run in the main thread.
+
+    Attributes:
+        service: service that is being polled
+        poll_fn: callable returning a list of supported versions, or the
+            regions every supported version is available in, by version
+        host: host `poll_fn` talks to, used to limit concurrent requests per host
+        shared_fetch: multi-service poll function the service shares with others,
+            see `for_services`
+        ran_shared_fetch: the service ran the shared fetch, other services of
+            its group got the results from the run cache and are not timed
+        deadline: `time.monotonic()` after which the service is not fetched anymore
+        alerts: buffer collecting operator alerts of the run, alerts are sent
+            right away if not set
+        poll_run: run the service is polled in, if any
     """
-    return _aws_rds("sqlserver-se")
 
+    def __init__(self, service: Service, poll_fn: Callable, host: str = None):
+        self.service = service
+        self.poll_fn = poll_fn
+        self.host = host or urlparse(service.source_url).netloc or service.name
+        self.shared_fetch = None
+        self.ran_shared_fetch = False
+        self.deadline = None
+        self.alerts = None
+        self.skipped = False
+        self.poll_state = None
+        self.supported_versions = None
+        self.version_regions = None
+        self.not_modified = False
+        self.unchanged = False
+        self.fresh_validators = {}
+        self.snapshots = []
+        self.poll_run = None
+        self.error = None
+        self.fetch_duration = None
+        self.diff_duration = 0
+        self.http_duration = 0
+        self.bytes_received = 0
+        self.api_pages = 0
+        self.token_fetches = 0
+        self.deprecated_versions = []
+        self.added_versions = []
+        self.renewed_versions = []
+        self._lock = threading.Lock()
+        self._requests_in_flight = 0
+        self._requests_started = None
+
+    @classmethod
+    def for_services(
+        cls, service_list: List[Service], poll_fn: Callable, host: str = None
+    ):
+        """Poll many services with a single multi-service poll function.
+
+        `poll_fn` returns supported versions by service name. It is called
+        once per polling run, by the first service being fetched, and its
+        results fan out into one PollService, with its own diff, per
+        service. A service missing from the results has no supported
+        version, as a single-service poll function returning an empty list.
+        The services are fetched as a single task by the polling engines,
+        see `fetch_groups`, and share the host of the first one.
+
+        Args:
+            service_list (list[Service]): services returned by `poll_fn`
+            poll_fn (Callable): returns supported versions by service name
+            host (str): host `poll_fn` talks to
+
+        Returns:
+            list[PollService]: one per service
+        """
+
+        def shared_poll_fn():
+            poll_service = _current_poll.get()
+            if poll_service is not None:
+                poll_service.ran_shared_fetch = True
+            return poll_fn()
+
+        def service_poll_fn(service):
+            return lambda: fetch_once(poll_fn, shared_poll_fn).get(service.name, [])
+
+        poll_services = [
+            cls(service=service, poll_fn=service_poll_fn(service), host=host)
+            for service in service_list
+        ]
+        for poll_service in poll_services:
+            poll_service.shared_fetch = poll_fn
+            poll_service.host = poll_services[0].host
+        return poll_services
 
-def aws_sqlserver_ex():
-    """Get AWS SQL Server Express Edition compatible versions.
+    def poll(self):
+        self.fetch()
+        self.commit()
+
+    def fetch(self):
+        if self._past_deadline():
+            return
+        with self._fetching():
+            self._set_supported_versions(self.poll_fn())
+
+    async def fetch_async(self):
+        """Fetch the service as `fetch` does, without blocking the event loop.
+
+        Only for poll functions with a `poll_async` coroutine function, see
+        `scraper`.
+        """
+        if self._past_deadline():
+            return
+        with self._fetching():
+            self._set_supported_versions(await self.poll_fn.poll_async())
+
+    @property
+    def can_fetch_async(self):
+        """The poll function does not block, see `fetch_async`."""
+        return hasattr(self.poll_fn, "poll_async")
+
+    def _past_deadline(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            logger.warning(f"Service: {self.service.name} - Skipped, deadline passed")
+            self.skipped = True
+            self.fetch_duration = 0
+            return True
+        return False
+
+    @contextmanager
+    def _fetching(self):
+        """Mark the service as being fetched and record the outcome of the fetch."""
+        logger.info(f"Polling service {self.service.name}")
+        started = time.monotonic()
+        token = _current_poll.set(self)
+        try:
+            yield
+        except SourceNotModified:
+            self.not_modified = True
+        except Exception as e:
+            self.error = e
+        finally:
+            _current_poll.reset(token)
+        self.fetch_duration = time.monotonic() - started
+        if self.shared_fetch is not None and not self.ran_shared_fetch:
+            # results of a fetch run by another service of the group, only
+            # that service is timed
+            self.fetch_duration = 0
+
+    def _set_supported_versions(self, supported_versions):
+        if isinstance(supported_versions, dict):
+            self.version_regions = supported_versions
+            supported_versions = list(supported_versions)
+        self.supported_versions = supported_versions
+
+    @property
+    def changed(self):
+        """Supported versions changed, only known after `commit`."""
+        return (
+            self.error is None
+            and not self.skipped
+            and self.supported_versions is not None
+            and not self.not_modified
+            and not self.unchanged
+        )
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("sqlserver-ex")
+    @property
+    def outcome(self):
+        """Outcome of the poll as recorded in `PollResult`, only known after `commit`."""
+        if self.skipped:
+            return PollResult.SKIPPED
+        if self.error is not None:
+            return PollResult.FAILED
+        if self.not_modified:
+            return PollResult.NOT_MODIFIED
+        if self.unchanged:
+            return PollResult.UNCHANGED
+        return PollResult.CHANGED
+
+    @contextmanager
+    def http_request(self):
+        """Time a request, called from the threads fetching it.
+
+        `http_duration` is the wall-clock time during which at least one
+        request is in flight, requests made at the same time by region
+        threads are not summed.
+        """
+        with self._lock:
+            if not self._requests_in_flight:
+                self._requests_started = time.monotonic()
+            self._requests_in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._requests_in_flight -= 1
+                if not self._requests_in_flight:
+                    self.http_duration += time.monotonic() - self._requests_started
+
+    def count_received(self, size):
+        """Count the size of a response, called from the threads fetching it."""
+        with self._lock:
+            self.bytes_received += size
+
+    def add_snapshot(self, key, kind, content):
+        """Keep a raw payload to archive, called from the threads fetching it."""
+        with self._lock:
+            self.snapshots.append((key, kind, content))
+
+    def count_api_page(self):
+        """Count an API response page, called from the threads fetching it."""
+        with self._lock:
+            self.api_pages += 1
+
+    def count_token_fetch(self):
+        """Count an OAuth access token fetch, called from the threads fetching it."""
+        with self._lock:
+            self.token_fetches += 1
+
+    def commit(self):
+        # archived first, payloads breaking the poll function are the useful ones
+        self.save_snapshots()
+        started = time.monotonic()
+        try:
+            self._commit()
+        finally:
+            self.diff_duration = time.monotonic() - started
 
+    def _commit(self):
+        if self.skipped:
+            return
 
-def aws_sqlserver_web():
-    """Get AWS SQL Server Web Edition compatible versions.
+        if self.error is not None:
+            self.report_error(self.error)
+            return
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_rds("sqlserver-web")
+        if self.not_modified:
+            logger.info(f"Service: {self.service.name} - Source not modified")
+            return
 
+        try:
+            logger.info(
+                f"Service: {self.service.name} - Supported versions {self.supported_versions}"
+            )
 
-def aws_eks():
-    """Get AWS EKS compatible versions.
+            fingerprint = ServicePollState.get_fingerprint(
+                self.supported_versions, self.version_regions
+            )
+            state = self.poll_state
+            if state is None:
+                state, _ = ServicePollState.objects.get_or_create(
+                    service=self.service.name
+                )
+                self.poll_state = state
+            if state.fingerprint == fingerprint:
+                self.unchanged = True
+                logger.info(f"Service: {self.service.name} - No change")
+                self.save_validators()
+                return
+
+            with transaction.atomic():
+                (
+                    self.deprecated_versions,
+                    self.added_versions,
+                ) = self.process_versions(self.supported_versions)
+                if self.version_regions is not None:
+                    self.process_regions(self.version_regions)
+
+                state.fingerprint = fingerprint
+                state.last_changed = timezone.now()
+                state.save()
+
+            self.save_validators()
+        except Exception as e:
+            self.error = e
+            self.report_error(e)
+
+    def report_error(self, e):
+        error_message = f"Error occurred while polling service {self.service.name}"
+        if self.poll_state is not None and self.poll_state.circuit_open:
+            # operators were notified when the circuit opened, see `checkpoint_poll`
+            logger.warning(f"{error_message}, circuit still open", exc_info=e)
+            return
+        self.alert(
+            type(e).__name__,
+            f"{error_message}:\n {type(e).__name__} at line {e.__traceback__.tb_lineno} of {__file__}: {e.__str__()}",
+        )
+        logger.error(error_message, exc_info=e)
+
+    def alert(self, alert_type, message):
+        """Alert operators, through the alert buffer of the run if any.
+
+        Args:
+            alert_type (str): deduplicates alerts of the service, e.g. error class
+            message (str): alert message
+        """
+        if self.alerts is None:
+            notify_operator(message)
+        else:
+            self.alerts.add((self.service.name, alert_type), message)
+
+    def save_snapshots(self):
+        """Archive the raw payloads fetched by the poll function, see `services.snapshots`.
+
+        Payloads already archived for their source cost a single query,
+        content already stored for another source is not stored again.
+        Archiving is best effort, it never fails the poll.
+        """
+        if not self.snapshots:
+            return
 
-    Returns:
-        list[str]: supported versions
-    """
+        try:
+            payloads = {
+                (key, get_digest(content)): (kind, content)
+                for key, kind, content in self.snapshots
+            }
+            digests = {digest for _, digest in payloads}
+            archived = set(
+                Snapshot.objects.filter(digest__in=digests).values_list("key", "digest")
+            )
+            stored = {digest for _, digest in archived}
+
+            store = get_snapshot_store()
+            new_snapshots = []
+            for (key, digest), (kind, content) in payloads.items():
+                if (key, digest) in archived:
+                    continue
+                compressed_size = 0
+                if digest not in stored:
+                    compressed_size = store.put(digest, content)
+                    stored.add(digest)
+                new_snapshots.append(
+                    Snapshot(
+                        service=self.service.name,
+                        key=key,
+                        kind=kind,
+                        digest=digest,
+                        size=len(content),
+                        compressed_size=compressed_size,
+                        poll_run=self.poll_run,
+                    )
+                )
+            Snapshot.objects.bulk_create(new_snapshots, ignore_conflicts=True)
+            logger.info(
+                f"Service: {self.service.name} - Archived {len(new_snapshots)} "
+                f"of {len(payloads)} snapshots"
+            )
+        except Exception as e:
+            logger.warning(
+                f"Service: {self.service.name} - Snapshots not archived", exc_info=e
+            )
+        self.snapshots = []
+
+    def save_validators(self):
+        # Remember validators of processed responses for conditional requests,
+        # a shared fetch is saved once all its services are committed, see
+        # `save_shared_validators`
+        if self.shared_fetch is not None:
+            return
+        for url, validator in self.fresh_validators.items():
+            SourceValidator.objects.update_or_create(url=url, defaults=validator)
+
+    def process_versions(self, supported_versions):
+        """Diff supported versions against the stored ones and apply the changes.
+
+        Stored versions of the service are read once, the diff is computed in
+        memory and applied in bulk so the number of statements does not
+        depend on the number of changed versions. Every query is scoped to
+        the service, versions of other services sharing a version string
+        (e.g. "5.7") are never matched and the lookups stay on the
+        unique_service_version index. Every change is appended to the
+        VersionEvent log. Must be called in a transaction.
+
+        Args:
+            supported_versions (list[str]): versions returned by poll_fn
+
+        Returns:
+            tuple[list[str], list[str]]: deprecated versions and supported
+                versions, supported ones being newly added or renewed
+        """
+        stored_versions = {
+            version: (version_id, deprecated)
+            for version_id, version, deprecated in Version.objects.filter(
+                service=self.service.name
+            ).values_list("id", "version", "deprecated")
+        }
+        supported_versions = list(dict.fromkeys(supported_versions))
+        supported_versions_set = set(supported_versions)
+
+        # Deprecated versions (the ones that are no longer supported)
+        deprecated_versions = [
+            version
+            for version, (_, deprecated) in stored_versions.items()
+            if deprecated is None and version not in supported_versions_set
+        ]
+        # Added versions (the ones that we've never seen before)
+        added_versions = [v for v in supported_versions if v not in stored_versions]
+        # Renewed versions (the ones that were previously marked as deprecated but are now supported)
+        renewed_versions = [
+            v
+            for v in supported_versions
+            if v in stored_versions and stored_versions[v][1] is not None
+        ]
+
+        if deprecated_versions:
+            Version.objects.filter(
+                service=self.service.name,
+                id__in=[stored_versions[v][0] for v in deprecated_versions],
+            ).update(deprecated=timezone.now())
+        added_ids = {}
+        if added_versions:
+            added_ids = {
+                version.version: version.id
+                for version in Version.objects.bulk_create(
+                    [
+                        Version(service=self.service.name, version=v)
+                        for v in added_versions
+                    ]
+                )
+            }
+        if renewed_versions:
+            Version.objects.filter(
+                service=self.service.name,
+                id__in=[stored_versions[v][0] for v in renewed_versions],
+            ).update(deprecated=None)
+
+        events = (
+            [
+                (VersionEvent.DEPRECATED, stored_versions[v][0])
+                for v in deprecated_versions
+            ]
+            + [(VersionEvent.ADDED, added_ids[v]) for v in added_versions]
+            + [(VersionEvent.RENEWED, stored_versions[v][0]) for v in renewed_versions]
+        )
+        if events:
+            VersionEvent.objects.bulk_create(
+                [
+                    VersionEvent(
+                        service=self.service.name,
+                        version_id=version_id,
+                        kind=kind,
+                        poll_run=self.poll_run,
+                    )
+                    for kind, version_id in events
+                ]
+            )
 
-    page = requests.get(
-        "https://docs.aws.amazon.com/eks/latest/userguide/kubernetes-versions.html"
-    )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="kubernetes-release-calendar")
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling
-    )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[0].text.strip())
-            eos_date = str(data[3].text.strip())
-            if (
-                version
-                and eos_date
-                and dateutil.parser.parse(eos_date).timestamp()
-                > datetime.datetime.now().timestamp()
-            ):
-                supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("AWS EKS versions not found")
-    return supported_versions
+        self.renewed_versions = renewed_versions
 
+        logger.info(
+            f"Service: {self.service.name} - These versions have been deprecated: {deprecated_versions}",
+        )
+        logger.info(
+            f"Service: {self.service.name} - These versions have been added {added_versions}"
+        )
+        logger.info(
+            f"Service: {self.service.name} - These versions have been renewed {renewed_versions}"
+        )
+        logger.info(
+            f"Service: {self.service.name} - These versions are now supported {added_versions + renewed_versions}",
+        )
 
-def _aws_lambda(runtime_type):
-    """Get AWS Lambda available versions by runtime type.
+        return deprecated_versions, added_versions + renewed_versions
 
-    Args:
-        runtime_type (str): Runtime type (e.g. python)
+    def process_regions(self, version_regions):
+        """Replace the stored regions of the supported versions.
 
-    Raises:
-        ScrappingError: When no versions are found.
+        Region rows of versions that are no longer supported are removed.
+        Must be called in a transaction, after `process_versions`.
 
-    Returns:
-        list[str]: Supported versions.
-    """
+        Args:
+            version_regions (dict): regions by supported version
+        """
+        version_ids = dict(
+            Version.objects.filter(
+                service=self.service.name, version__in=list(version_regions)
+            ).values_list("version", "id")
+        )
+        stored_regions = {
+            (version_id, region): region_id
+            for region_id, version_id, region in VersionRegion.objects.filter(
+                version__service=self.service.name
+            ).values_list("id", "version_id", "region")
+        }
+        supported_regions = {
+            (version_ids[version], region)
+            for version, regions in version_regions.items()
+            for region in regions
+        }
+
+        removed_regions = stored_regions.keys() - supported_regions
+        if removed_regions:
+            VersionRegion.objects.filter(
+                id__in=[stored_regions[key] for key in removed_regions]
+            ).delete()
+        VersionRegion.objects.bulk_create(
+            [
+                VersionRegion(version_id=version_id, region=region)
+                for version_id, region in supported_regions - stored_regions.keys()
+            ]
+        )
 
-    page = requests.get(
-        "https://docs.aws.amazon.com/lambda/latest/dg/lambda-runtimes.html"
-    )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(string=("Supported Runtimes"))
-    server_version_table = server_version_title.parent.parent.parent.parent.parent
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            supported_versions.append(
-                {
-                    "name": str(data[0].text.strip()),
-                    "version": str(data[1].text.strip()),
-                }
-            )
-    if supported_versions == []:
-        raise ScrappingError(
-            f"AWS Lambda versions not found for {runtime_type} runtime"
+        logger.info(
+            f"Service: {self.service.name} - Available in {len(supported_regions)} version regions, "
+            f"{len(supported_regions - stored_regions.keys())} added, {len(removed_regions)} removed"
         )
-    return [
-        v["version"]
-        for v in supported_versions
-        if v["name"].lower().startswith(runtime_type.lower())
-    ]
 
 
-def aws_lambda_nodejs():
-    """Get AWS Lambda Node.js compatible versions.
+def do_polling(executor: PollService):
+    executor.poll()
+    return executor
+
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_lambda("Node.js")
+def fetch_groups(poll_services: List[PollService]):
+    """Group services sharing a fetch.
 
+    A group is fetched as a single task by the polling engines: the first
+    service runs the shared fetch and the others get its results from the
+    run cache right after, instead of each holding a worker while waiting
+    for it.
 
-def aws_lambda_python():
-    """Get AWS Lambda Python compatible versions.
+    Args:
+        poll_services (list[PollService]): services to group
 
     Returns:
-        list[str] of supported versions
+        list[list[PollService]]: groups, in order of their first service,
+            a service not sharing its fetch is alone in its group
     """
-    return _aws_lambda("Python")
+    groups = {}
+    for poll_service in poll_services:
+        key = poll_service.shared_fetch or poll_service.service.name
+        groups.setdefault(key, []).append(poll_service)
+    return list(groups.values())
 
 
-def aws_lambda_ruby():
-    """Get AWS Lambda Ruby compatible versions.
+def fetch_with_threads(poll_services: List[PollService]):
+    """Fetch services in a thread pool.
 
-    Returns:
-        list[str] of supported versions
-    """
-    return _aws_lambda("Ruby")
+    At most `settings.POLLING_HOST_CONCURRENCY` requests are in flight per host.
+    Services sharing a fetch are fetched by a single task, see `fetch_groups`.
 
+    Args:
+        poll_services (list[PollService]): services to fetch
 
-def aws_lambda_java():
-    """Get AWS Lambda Java compatible versions.
-
-    Returns:
-        list[str] of supported versions
+    Yields:
+        PollService: fetched services in order of completion
     """
-    return _aws_lambda("Java")
+    host_limits = {
+        poll_service.host: threading.BoundedSemaphore(settings.POLLING_HOST_CONCURRENCY)
+        for poll_service in poll_services
+    }
+
+    def fetch(group):
+        for poll_service in group:
+            with host_limits[poll_service.host]:
+                poll_service.fetch()
+        return group
+
+    with ThreadPoolExecutor(max_workers=settings.POLLING_THREADS) as executor:
+        futures = [
+            executor.submit(fetch, group) for group in fetch_groups(poll_services)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def fetch_with_asyncio(poll_services: List[PollService]):
+    """Fetch services with an asyncio event loop.
+
+    Scrapers fetch their page with an async HTTP client on the event loop,
+    see `PollService.fetch_async`, so they are all in flight at once
+    whatever the number of threads. Other poll functions are blocking
+    (boto3, googleapiclient) and are run in a bounded executor. At most
+    `settings.POLLING_HOST_CONCURRENCY` services are fetched at the same time
+    per host. The loop runs in its own thread because Django does not allow
+    database access from a thread running an event loop, fetched services
+    are handed over to the calling thread through a queue. Services sharing
+    a fetch are fetched by a single task, see `fetch_groups`.
 
+    Args:
+        poll_services (list[PollService]): services to fetch
 
-def aws_lambda_go():
-    """Get AWS Lambda Go compatible versions.
+    Yields:
+        PollService: fetched services in order of completion
+    """
+    fetched = queue.Queue()
+
+    async def fetch_all():
+        loop = asyncio.get_running_loop()
+        host_limits = {
+            poll_service.host: asyncio.Semaphore(settings.POLLING_HOST_CONCURRENCY)
+            for poll_service in poll_services
+        }
+
+        async def fetch(group):
+            for poll_service in group:
+                try:
+                    async with host_limits[poll_service.host]:
+                        if poll_service.can_fetch_async:
+                            await poll_service.fetch_async()
+                        else:
+                            await loop.run_in_executor(executor, poll_service.fetch)
+                finally:
+                    fetched.put(poll_service)
+
+        with ThreadPoolExecutor(max_workers=settings.POLLING_THREADS) as executor:
+            async with http.async_client():
+                await asyncio.gather(
+                    *[fetch(group) for group in fetch_groups(poll_services)]
+                )
+
+    loop_thread = threading.Thread(target=asyncio.run, args=(fetch_all(),))
+    loop_thread.start()
+    for _ in poll_services:
+        yield fetched.get()
+    loop_thread.join()
+
+
+POLLING_ENGINES = {
+    "threads": fetch_with_threads,
+    "asyncio": fetch_with_asyncio,
+}
+
+
+def run_polling(
+    platform_label: str,
+    poll_services: List[PollService],
+    engine: str = None,
+    deadline: float = None,
+):
+    """Poll services concurrently and commit their changes serially.
+
+    `PollService.fetch` of every service is run concurrently by the polling
+    engine, see `POLLING_ENGINES`. Fetched services are committed one by one
+    in the calling thread as soon as they are done and their poll state is
+    checkpointed right away, see `checkpoint_poll`. Operator alerts are sent
+    as a single digest at the end of the run, or at the deadline if reached
+    first.
+
+    Args:
+        platform_label (str): label used in logs, e.g. "AWS"
+        poll_services (list[PollService]): services to poll
+        engine (str): one of `POLLING_ENGINES`, `settings.POLLING_ENGINE` if not set
+        deadline (float): `time.monotonic()` after which services that are
+            not fetched yet are skipped
 
     Returns:
-        list[str] of supported versions
+        list[PollService]: polled services
     """
-    return _aws_lambda("Go")
+    engine = engine or settings.POLLING_ENGINE
+    logger.info(f"Starting polling {platform_label}", engine=engine)
+    started = time.monotonic()
 
+    subscribers = count_subscribers([ps.service.name for ps in poll_services])
+    states = ServicePollState.objects.in_bulk(
+        [ps.service.name for ps in poll_services], field_name="service"
+    )
+    alerts = AlertBuffer(notify_operator)
+    poll_run = PollRun.objects.create(
+        label=platform_label, engine=engine, services_count=len(poll_services)
+    )
+    for poll_service in poll_services:
+        poll_service.poll_state = states.get(poll_service.service.name)
+        poll_service.deadline = deadline
+        poll_service.alerts = alerts
+        poll_service.poll_run = poll_run
+    validators = SourceValidator.objects.in_bulk(field_name="url")
+    with alerts, run_cache(validators) as cache:
+        if deadline is not None:
+            alerts.flush_at(deadline)
+        for poll_service in POLLING_ENGINES[engine](poll_services):
+            poll_service.commit()
+            checkpoint_poll(poll_service, subscribers.get(poll_service.service.name, 0))
+            record_poll_result(poll_run, poll_service)
+        save_shared_validators(poll_services)
+
+    poll_run.duration = time.monotonic() - started
+    poll_run.cache_hits = cache.hits
+    poll_run.cache_misses = cache.misses
+    poll_run.bytes_saved = cache.bytes_saved
+    poll_run.token_fetches = sum(ps.token_fetches for ps in poll_services)
+    poll_run.save()
+
+    logger.info(
+        f"Finished polling {platform_label}",
+        engine=engine,
+        duration=round(time.monotonic() - started, 3),
+        services_count=len(poll_services),
+        failed=[ps.service.name for ps in poll_services if ps.error is not None],
+        skipped=[ps.service.name for ps in poll_services if ps.skipped],
+        cache_hits=cache.hits,
+        cache_misses=cache.misses,
+        not_modified=[ps.service.name for ps in poll_services if ps.not_modified],
+        unchanged=[ps.service.name for ps in poll_services if ps.unchanged],
+        bytes_saved=cache.bytes_saved,
+        bytes_received=sum(ps.bytes_received for ps in poll_services),
+        token_fetches=sum(ps.token_fetches for ps in poll_services),
+        api_pages={
+            ps.service.name: ps.api_pages for ps in poll_services if ps.api_pages
+        },
+        fetch_durations={
+            ps.service.name: round(ps.fetch_duration, 3) for ps in poll_services
+        },
+    )
+    return poll_services
 
-def aws_lambda_dotnet():
-    """Get AWS Lambda .NET compatible versions.
 
-    Returns:
-        list[str] of supported versions
+def save_shared_validators(poll_services: List[PollService]):
+    """Save validators of shared fetches once every service sharing them is committed.
+
+    A shared fetch is run by the first service of its group and its
+    validators are captured on that service only. Saving them while a
+    sibling failed or was skipped would turn the next runs into
+    "not modified" and the sibling would never be diffed against the
+    source it missed, so the validators of such a group are dropped and
+    the source is fetched in full next time.
+
+    Args:
+        poll_services (list[PollService]): committed services of the run
     """
-    return _aws_lambda(".NET")
+    groups = {}
+    for poll_service in poll_services:
+        if poll_service.shared_fetch is not None:
+            groups.setdefault(poll_service.shared_fetch, []).append(poll_service)
 
+    for group in groups.values():
+        if any(ps.error is not None or ps.skipped for ps in group):
+            continue
+        for poll_service in group:
+            for url, validator in poll_service.fresh_validators.items():
+                SourceValidator.objects.update_or_create(url=url, defaults=validator)
 
-def aws_lambda_custom():
-    """Get AWS Lambda Custom compatible versions.
 
-    Returns:
-        list[str] of supported versions
+def record_poll_result(poll_run: PollRun, poll_service: PollService):
+    """Persist the outcome and timings of a committed service.
+
+    Args:
+        poll_run (PollRun): run the service was polled in
+        poll_service (PollService): committed service
     """
-    return _aws_lambda("Custom")
+    PollResult.objects.create(
+        poll_run=poll_run,
+        service=poll_service.service.name,
+        outcome=poll_service.outcome,
+        fetch_duration=poll_service.http_duration,
+        parse_duration=max(poll_service.fetch_duration - poll_service.http_duration, 0),
+        diff_duration=poll_service.diff_duration,
+        bytes_received=poll_service.bytes_received,
+        api_pages=poll_service.api_pages,
+        added=len(poll_service.added_versions) - len(poll_service.renewed_versions),
+        deprecated=len(poll_service.deprecated_versions),
+        renewed=len(poll_service.renewed_versions),
+        error_class=type(poll_service.error).__name__ if poll_service.error else "",
+    )
 
 
-def azure_mariadb_server():
-    """Get Azure MariaDB server compatible versions.
+def count_subscribers(service_names):
+    """Count active subscriptions of services.
+
+    Args:
+        service_names (list[str]): services
 
     Returns:
-        list[str]: supported versions
+        dict: number of active subscriptions by service name, if any
     """
-
-    page = requests.get(
-        "https://docs.microsoft.com/en-us/rest/api/mariadb/servers/create"
-    )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="serverversion")
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling
+    # lazy import, subscriptions depend on services
+    from subscriptions.models import Subscription
+
+    return dict(
+        Subscription.objects.filter(service__in=service_names, disabled=None)
+        .order_by()
+        .values("service")
+        .annotate(count=Count("id"))
+        .values_list("service", "count")
     )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[0].text.strip())
-            supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("Azure MariaDB Server versions not found")
-    return supported_versions
 
 
-def azure_postgresql_server():
-    """Get Azure PostgreSQL server compatible versions.
+def checkpoint_poll(poll_service: PollService, subscribers: int):
+    """Record a committed poll in the state of its service and schedule the next one.
 
-    Returns:
-        list[str]: supported versions
+    Saved as soon as the service is committed so a run cut short, e.g. by a
+    Lambda timeout, resumes with the services it did not reach. Skipped
+    services are due again right away. Operators are notified once when
+    the circuit breaker of the service opens.
+
+    Args:
+        poll_service (PollService): committed service
+        subscribers (int): active subscriptions to the service
     """
+    state = poll_service.poll_state
+    if state is None:
+        state, _ = ServicePollState.objects.get_or_create(
+            service=poll_service.service.name
+        )
 
-    page = requests.get(
-        "https://docs.microsoft.com/en-us/azure/postgresql/concepts-version-policy"
-    )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="supported--postgresql-versions")
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling
+    was_open = state.circuit_open
+    if poll_service.skipped:
+        state.next_poll_at = None
+    else:
+        state.schedule(
+            timezone.now(),
+            changed=poll_service.changed,
+            failed=poll_service.error is not None,
+            subscribers=subscribers,
+        )
+    state.save(
+        update_fields=[
+            "last_polled",
+            "next_poll_at",
+            "change_rate",
+            "failures",
+            "subscribers",
+            "circuit_opened",
+            "updated",
+        ]
     )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[0].text.strip())
-            if "retired" not in version.lower():
-                supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("Azure PostgreSQL Server versions not found")
-    return supported_versions
+
+    if state.circuit_open and not was_open:
+        poll_service.alert(
+            "CircuitOpened",
+            f"Circuit opened for service {state.service} after {state.failures} "
+            f"consecutive failures, next probe at {state.next_poll_at}",
+        )
+    elif was_open and not state.circuit_open:
+        logger.info(f"Service: {state.service} - Circuit closed")
 
 
-def azure_redis_server():
-    """Get Azure Redis server compatible versions.
+def with_fetch_groups(poll_services: List[PollService], service_names):
+    """Select services along with every service sharing a fetch with them.
+
+    Services sharing a fetch are polled together so they never drift apart:
+    the validators of a shared source are only saved once every service of
+    its group is committed, see `save_shared_validators`, and the shared
+    fetch is made once for all of them.
+
+    Args:
+        poll_services (list[PollService]): services to select from
+        service_names (set[str]): selected services
 
     Returns:
-        list[str]: supported versions
+        list[PollService]: selected services and the rest of their groups
     """
+    shared_fetches = {
+        ps.shared_fetch
+        for ps in poll_services
+        if ps.shared_fetch is not None and ps.service.name in service_names
+    }
+    return [
+        ps
+        for ps in poll_services
+        if ps.service.name in service_names
+        or (ps.shared_fetch is not None and ps.shared_fetch in shared_fetches)
+    ]
 
-    page = requests.get("https://docs.microsoft.com/en-us/rest/api/redis/redis/update")
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="request-body")
-    server_version_table = server_version_title.nextSibling.nextSibling
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if not data:
-            continue
-        prop = str(data[0].text.strip())
-        if prop != "properties.redisVersion":
-            continue
-        value = str(data[2].text.strip()).strip(".").split("Supported versions:")[1]
-        return [v.strip() for v in value.split(",")]
-    raise ScrappingError("Azure Redis version not found")
 
+def without_open_circuits(poll_services: List[PollService]):
+    """Leave out services which circuit breaker is open, unless a probe is due.
 
-def azure_mysql_server():
-    """Get Azure MySQL server compatible versions.
+    A service sharing a fetch with polled services is probed along with them.
+
+    Args:
+        poll_services (list[PollService]): services
 
     Returns:
-        list[str]: supported versions
+        list[PollService]: services to poll
     """
-
-    page = requests.get(
-        "https://docs.microsoft.com/en-us/azure/mysql/concepts-version-policy"
+    circuit_open = set(
+        ServicePollState.objects.filter(
+            service__in=[ps.service.name for ps in poll_services],
+            circuit_opened__isnull=False,
+            next_poll_at__gt=timezone.now(),
+        ).values_list("service", flat=True)
     )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="supported-mysql-versions")
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling
+    polled = with_fetch_groups(
+        poll_services,
+        {ps.service.name for ps in poll_services} - circuit_open,
     )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[1].text.strip())
-            if "retired" not in version.lower():
-                supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("Azure MySQL Server versions not found")
-    return supported_versions
+    skipped = circuit_open - {ps.service.name for ps in polled}
+    if skipped:
+        logger.info("Skipping services with open circuit", services=sorted(skipped))
+    return polled
 
 
-def azure_aks():
-    """Get Azure Kubernetes compatible versions.
+def get_deadline(context):
+    """Deadline of a Lambda invocation, leaving time to commit fetched services.
+
+    Args:
+        context (LambdaContext): Lambda context, None when called directly
 
     Returns:
-        list[str]: supported versions
+        float or None: `time.monotonic()` deadline, None without context
     """
+    if context is None:
+        return None
+    remaining = context.get_remaining_time_in_millis() / 1000
+    return time.monotonic() + remaining - settings.POLLING_COMMIT_MARGIN.total_seconds()
 
-    page = requests.get(
-        "https://docs.microsoft.com/en-us/azure/aks/supported-kubernetes-versions"
-    )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="aks-kubernetes-release-calendar")
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling
-    )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[0].text.strip())
-            ga_date = str(data[3].text.strip())
-            if (
-                ga_date != "*"
-                and dateutil.parser.parse(ga_date).replace(day=1).timestamp()
-                <= datetime.datetime.now().timestamp()
-            ):
-                supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("Azure Kubernetes versions not found")
-    return supported_versions
 
+def shard_poll_services(poll_services: List[PollService], shard_size: int):
+    """Split services into shards polled by separate invocations.
 
-def azure_hdinsight():
-    """Get Azure HDInsight compatible versions.
+    Services sharing a fetch are kept in the same shard so it is still
+    made once, a shard can then be bigger than `shard_size`.
+
+    Args:
+        poll_services (list[PollService]): services to split
+        shard_size (int): max number of services of a shard
 
     Returns:
-        list[str]: supported versions
+        list[list[PollService]]: shards
     """
+    shards = []
+    shard = []
+    for group in fetch_groups(poll_services):
+        if shard and len(shard) + len(group) > shard_size:
+            shards.append(shard)
+            shard = []
+        shard += group
+    if shard:
+        shards.append(shard)
+    return shards
+
+
+def lease_poll_services(service_names):
+    """Mark services as being polled so the next ticks do not poll them again.
+
+    The lease is replaced by the schedule when a service is checkpointed. It
+    expires if its invocation dies, the service is then due again.
 
-    page = requests.get(
-        "https://docs.microsoft.com/en-us/azure/hdinsight/hdinsight-component-versioning"
+    Args:
+        service_names (list[str]): services
+    """
+    lease_until = timezone.now() + settings.POLLING_LEASE
+    leased = set(
+        ServicePollState.objects.filter(service__in=service_names).values_list(
+            "service", flat=True
+        )
     )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(id="supported-hdinsight-versions")
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling
+    ServicePollState.objects.filter(service__in=leased).update(next_poll_at=lease_until)
+    ServicePollState.objects.bulk_create(
+        [
+            ServicePollState(service=name, next_poll_at=lease_until)
+            for name in service_names
+            if name not in leased
+        ]
     )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[0].text.strip())
-            supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("Azure HDInsight versions not found")
-    return supported_versions
 
 
-def azure_databricks():
-    """Get Azure Databricks compatible versions.
+def due_poll_services():
+    """Services due to be polled according to their schedule.
+
+    Services sharing a fetch are due as soon as one of them is, see
+    `with_fetch_groups`.
 
     Returns:
-        list[str]: supported versions
+        list[PollService]: services never polled or whose next poll is due
     """
-
-    page = requests.get(
-        "https://docs.microsoft.com/en-us/azure/databricks/release-notes/runtime/releases"
-    )
-    soup = BeautifulSoup(page.content, "html.parser")
-    server_version_title = soup.find(
-        id="--supported-azure-databricks-runtime-releases-and-support-schedule"
+    not_due = set(
+        ServicePollState.objects.filter(next_poll_at__gt=timezone.now()).values_list(
+            "service", flat=True
+        )
     )
-    server_version_table = (
-        server_version_title.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling.nextSibling
+    poll_services = all_poll_services()
+    return with_fetch_groups(
+        poll_services, {ps.service.name for ps in poll_services} - not_due
     )
-    supported_versions = []
-    for child in server_version_table.findChildren("tr"):
-        data = child.findChildren("td")
-        if data:
-            version = str(data[0].text.strip())
-            if version:
-                supported_versions.append(version)
-    if supported_versions == []:
-        raise ScrappingError("Azure Databricks versions not found")
-    return supported_versions
 
 
-class PollService:
-    def __init__(self, service: Service, poll_fn: Callable):
-        self.service = service
-        self.poll_fn = poll_fn
-        self.deprecated_versions = []
-        self.added_versions = []
+def poll_due(event=None, context=None):
+    """Entrypoint task polling due services of all platforms, run on a short tick.
 
-    def poll(self):
-        logger.info(f"Polling service {self.service.name}")
-        try:
-            supported_versions = self.poll_fn()
+    Due services are leased and split into shards, each polled by its own
+    asynchronous invocation of `poll_shard`.
 
-            logger.info(
-                f"Service: {self.service.name} - Supported versions {supported_versions}"
-            )
+    Args:
+        event (dict): Zappa event, its kwargs can select the polling engine
+        context (LambdaContext): Lambda context
+    """
+    poll_services = due_poll_services()
+    if not poll_services:
+        logger.info("No service is due")
+        return
 
-            self.deprecated_versions = self.process_deprecated_versions(
-                supported_versions
-            )
+    lease_poll_services([ps.service.name for ps in poll_services])
+    shards = shard_poll_services(poll_services, settings.POLLING_SHARD_SIZE)
+    logger.info(f"Polling {len(poll_services)} due services in {len(shards)} shards")
+    for shard in shards:
+        poll_shard([ps.service.name for ps in shard], **get_event_kwargs(event))
 
-            self.added_versions = self.process_added_versions(supported_versions)
-        except Exception as e:
-            error_message = f"Error occurred while polling service {self.service.name}"
-            notify_operator(
-                f"{error_message}:\n {type(e).__name__} at line {e.__traceback__.tb_lineno} of {__file__}: {e.__str__()}"
-            )
-            logger.error(error_message, exc_info=True)
 
-    def process_deprecated_versions(self, supported_versions):
-        # Query versions to deprecate and then set them as deprecated
-        versions_to_deprecate = Version.objects.filter(
-            service=self.service.name, deprecated=None
-        ).exclude(version__in=supported_versions)
-        deprecated_versions = [v.version for v in versions_to_deprecate.only("version")]
-        versions_to_deprecate.update(deprecated=timezone.now())
+@task
+def poll_shard(service_names, engine=None):
+    """Poll a shard of services, in its own invocation when run in Lambda.
 
-        logger.info(
-            f"Service: {self.service.name} - These versions have been deprecated: {deprecated_versions}",
-        )
+    Args:
+        service_names (list[str]): services of the shard
+        engine (str): one of `POLLING_ENGINES`
+    """
+    deadline = time.monotonic() + settings.POLLING_SHARD_TIME_LIMIT.total_seconds()
+    run_polling(
+        "shard", all_poll_services(service_names), engine=engine, deadline=deadline
+    )
 
-        return deprecated_versions
 
-    def process_added_versions(self, supported_versions):
-        # Added versions (the ones that we've never seen before)
-        seen_before = []
-        for v in Version.objects.filter(version__in=supported_versions).only("version"):
-            seen_before.append(v.version)
-        added_support = set(supported_versions) - set(seen_before)
-        for v in added_support:
-            Version.objects.create(service=self.service.name, version=v)
-        logger.info(
-            f"Service: {self.service.name} - These versions have been added {list(added_support)}"
-        )
+def all_poll_services(service_names=None):
+    """Services polled on all platforms.
 
-        # Renewed versions (the ones that were previously marked as deprecated but are now supported)
-        renewed_support = (
-            Version.objects.filter(version__in=supported_versions)
-            .exclude(deprecated=None)
-            .only("version")
-        )
-        renewed_versions = []
-        for v in renewed_support:
-            Version.objects.filter(service=self.service.name, version=v.version).update(
-                deprecated=None
-            )
-            renewed_versions.append(v.version)
-        logger.info(
-            f"Service: {self.service.name} - These versions have been renewed {renewed_versions}"
-        )
+    Args:
+        service_names (list[str]): only include these services if set
 
-        logger.info(
-            f"Service: {self.service.name} - These versions are now supported {list(added_support)+renewed_versions}",
-        )
+    Returns:
+        list[PollService]: services
+    """
+    poll_services = gcp_poll_services() + aws_poll_services() + azure_poll_services()
+    if service_names:
+        poll_services = [ps for ps in poll_services if ps.service.name in service_names]
+    return poll_services
 
-        return list(added_support) + renewed_versions
 
+def get_event_kwargs(event):
+    """Get keyword arguments of a scheduled Zappa event.
 
-def do_polling(executor: PollService):
-    executor.poll()
-    return executor
+    Set with the "kwargs" key of an event in zappa_settings.json, e.g.
+    `"kwargs": {"engine": "asyncio"}`.
 
+    Args:
+        event (dict): Zappa event, None when called directly
+
+    Returns:
+        dict: keyword arguments
+    """
+    return (event or {}).get("kwargs", {})
 
-def poll_gcp():
-    """Entrypoint task for all GCP services."""
-    logger.info("Starting polling GCP")
 
-    gcp_services = [
-        PollService(service=services["gcp_gke"], poll_fn=gcp_gke),
+def gcp_poll_services():
+    """Services polled by `poll_gcp`.
+
+    Returns:
+        list[PollService]: GCP services
+    """
+    return [
         PollService(
-            service=services["gcp_cloudsql_postgres"], poll_fn=gcp_cloudsql_postgres
+            service=services["gcp_gke"],
+            poll_fn=in_regions(gcp_gke, settings.POLLING_GCP_REGIONS),
         ),
-        PollService(
-            service=services["gcp_cloudsql_sqlserver"], poll_fn=gcp_cloudsql_sqlserver
+        *PollService.for_services(
+            [services[name] for name in GCP_CLOUD_SQL_ENGINES],
+            poll_fn=gcp_cloud_sql,
         ),
-        PollService(service=services["gcp_cloudsql_mysql"], poll_fn=gcp_cloudsql_mysql),
         PollService(service=services["gcp_dataproc"], poll_fn=gcp_dataproc),
         PollService(service=services["gcp_dataproc_os"], poll_fn=gcp_dataproc_os),
         PollService(
@@ -896,133 +2121,103 @@ def poll_gcp():
         ),
     ]
 
-    for service in gcp_services:
-        do_polling(service)
 
-    logger.info("Finished polling GCP")
+def poll_gcp(event=None, context=None):
+    """Entrypoint task for all GCP services.
+
+    Args:
+        event (dict): Zappa event, its kwargs can select the polling engine
+        context (LambdaContext): Lambda context
+    """
+    run_polling(
+        "GCP",
+        without_open_circuits(gcp_poll_services()),
+        deadline=get_deadline(context),
+        **get_event_kwargs(event),
+    )
 
 
-def poll_aws():
-    """Entrypoint task for all AWS services."""
-    logger.info("Starting polling AWS")
+def aws_poll_services():
+    """Services polled by `poll_aws`.
 
-    aws_services = [
+    Returns:
+        list[PollService]: AWS services
+    """
+    return [
         PollService(service=services["aws_eks"], poll_fn=aws_eks),
         PollService(
-            service=services["aws_elasticache_redis"], poll_fn=aws_elasticache_redis
+            service=services["aws_elasticache_redis"],
+            poll_fn=in_regions(aws_elasticache_redis, aws_regions("elasticache")),
         ),
         PollService(
             service=services["aws_elasticache_memcached"],
-            poll_fn=aws_elasticache_memcached,
+            poll_fn=in_regions(aws_elasticache_memcached, aws_regions("elasticache")),
         ),
         PollService(
             service=services["aws_kafka"],
-            poll_fn=aws_kafka,
+            poll_fn=in_regions(aws_kafka, aws_regions("kafka")),
         ),
         PollService(
             service=services["aws_es"],
-            poll_fn=aws_es,
+            poll_fn=in_regions(aws_es, aws_regions("es")),
         ),
         PollService(
             service=services["aws_opensearch"],
-            poll_fn=aws_opensearch,
+            poll_fn=in_regions(aws_opensearch, aws_regions("opensearch")),
         ),
         PollService(
             service=services["aws_neptune"],
-            poll_fn=aws_neptune,
+            poll_fn=in_regions(aws_neptune, aws_regions("neptune")),
         ),
         PollService(
             service=services["aws_docdb"],
-            poll_fn=aws_docdb,
+            poll_fn=in_regions(aws_docdb, aws_regions("docdb")),
         ),
         PollService(
             service=services["aws_memorydb"],
-            poll_fn=aws_memorydb,
+            poll_fn=in_regions(aws_memorydb, aws_regions("memorydb")),
         ),
         PollService(
             service=services["aws_rabbitmq"],
-            poll_fn=aws_rabbitmq,
+            poll_fn=in_regions(aws_rabbitmq, aws_regions("mq")),
         ),
         PollService(
             service=services["aws_activemq"],
-            poll_fn=aws_activemq,
+            poll_fn=in_regions(aws_activemq, aws_regions("mq")),
+        ),
+        *PollService.for_services(
+            [services[name] for name in AWS_RDS_ENGINES.values()],
+            poll_fn=in_regions(aws_rds, aws_regions("rds")),
+        ),
+        *PollService.for_services(
+            [services[name] for name in AWS_LAMBDA_RUNTIME_TYPES],
+            poll_fn=aws_lambda,
         ),
-        # PollService(
-        #     service=services["aws_aurora"],
-        #     poll_fn=aws_aurora,
-        # ),
-        # PollService(
-        #     service=services["aws_aurora_mysql"],
-        #     poll_fn=aws_aurora_mysql,
-        # ),
-        # PollService(
-        #     service=services["aws_aurora_postgres"],
-        #     poll_fn=aws_aurora_postgres,
-        # ),
-        # PollService(
-        #     service=services["aws_mariadb"],
-        #     poll_fn=aws_mariadb,
-        # ),
-        # PollService(
-        #     service=services["aws_mysql"],
-        #     poll_fn=aws_mysql,
-        # ),
-        # PollService(
-        #     service=services["aws_postgres"],
-        #     poll_fn=aws_postgres,
-        # ),
-        # PollService(
-        #     service=services["aws_oracle_ee"],
-        #     poll_fn=aws_oracle_ee,
-        # ),
-        # PollService(
-        #     service=services["aws_oracle_ee_cdb"],
-        #     poll_fn=aws_oracle_ee_cdb,
-        # ),
-        # PollService(
-        #     service=services["aws_oracle_se2"],
-        #     poll_fn=aws_oracle_se2,
-        # ),
-        # PollService(
-        #     service=services["aws_oracle_se2_cdb"],
-        #     poll_fn=aws_oracle_se2_cdb,
-        # ),
-        # PollService(
-        #     service=services["aws_sqlserver_ee"],
-        #     poll_fn=aws_sqlserver_ee,
-        # ),
-        # PollService(
-        #     service=services["aws_sqlserver_se"],
-        #     poll_fn=aws_sqlserver_se,
-        # ),
-        # PollService(
-        #     service=services["aws_sqlserver_ex"],
-        #     poll_fn=aws_sqlserver_ex,
-        # ),
-        # PollService(
-        #     service=services["aws_sqlserver_web"],
-        #     poll_fn=aws_sqlserver_web,
-        # ),
-        PollService(service=services["aws_lambda_nodejs"], poll_fn=aws_lambda_nodejs),
-        PollService(service=services["aws_lambda_python"], poll_fn=aws_lambda_python),
-        PollService(service=services["aws_lambda_ruby"], poll_fn=aws_lambda_ruby),
-        PollService(service=services["aws_lambda_java"], poll_fn=aws_lambda_java),
-        PollService(service=services["aws_lambda_go"], poll_fn=aws_lambda_go),
-        PollService(service=services["aws_lambda_dotnet"], poll_fn=aws_lambda_dotnet),
-        PollService(service=services["aws_lambda_custom"], poll_fn=aws_lambda_custom),
     ]
 
-    for service in aws_services:
-        do_polling(service)
 
-    logger.info("Finished polling AWS")
+def poll_aws(event=None, context=None):
+    """Entrypoint task for all AWS services.
+
+    Args:
+        event (dict): Zappa event, its kwargs can select the polling engine
+        context (LambdaContext): Lambda context
+    """
+    run_polling(
+        "AWS",
+        without_open_circuits(aws_poll_services()),
+        deadline=get_deadline(context),
+        **get_event_kwargs(event),
+    )
 
 
-def poll_azure():
-    """Entrypoint task for all Azure services."""
-    logger.info("Starting polling Azure")
+def azure_poll_services():
+    """Services polled by `poll_azure`.
 
-    azure_services = [
+    Returns:
+        list[PollService]: Azure services
+    """
+    return [
         PollService(
             service=services["azure_mariadb_server"], poll_fn=azure_mariadb_server
         ),
@@ -1036,7 +2231,17 @@ def poll_azure():
         PollService(service=services["azure_databricks"], poll_fn=azure_databricks),
     ]
 
-    for service in azure_services:
-        do_polling(service)
 
-    logger.info("Finished polling Azure")
+def poll_azure(event=None, context=None):
+    """Entrypoint task for all Azure services.
+
+    Args:
+        event (dict): Zappa event, its kwargs can select the polling engine
+        context (LambdaContext): Lambda context
+    """
+    run_polling(
+        "Azure",
+        without_open_circuits(azure_poll_services()),
+        deadline=get_deadline(context),
+        **get_event_kwargs(event),
+    )
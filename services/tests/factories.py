@@ -1,5 +1,5 @@
 import factory
-from services.models import Version
+from services.models import PollResult, PollRun, Version
 from services.base import service_choices
 import random
 
@@ -14,3 +14,20 @@ class VersionFactory(factory.django.DjangoModelFactory):
 
     class Meta:
         model = Version
+
+
+class PollRunFactory(factory.django.DjangoModelFactory):
+    label = "AWS"
+    engine = "threads"
+
+    class Meta:
+        model = PollRun
+
+
+class PollResultFactory(factory.django.DjangoModelFactory):
+    poll_run = factory.SubFactory(PollRunFactory)
+    service = factory.Faker("random_element", elements=[k for k, v in service_choices])
+    outcome = PollResult.CHANGED
+
+    class Meta:
+        model = PollResult
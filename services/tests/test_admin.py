@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from services.admin import PollResultAdmin, percentile
+from services.models import PollResult
+from services.tests.factories import PollResultFactory
+from users.tests.factories import UserProfileFactory
+
+
+class PollResultAdminTestCase(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile([3.0], 95) == 3.0
+
+    def test_latency_stats(self):
+        for fetch in [1, 2, 3, 4]:
+            PollResultFactory(
+                service="aws_kafka", fetch_duration=fetch, diff_duration=1
+            )
+        PollResultFactory(service="aws_es", fetch_duration=10)
+
+        stats = PollResultAdmin.get_latency_stats(PollResult.objects.all())
+
+        assert [row["service"] for row in stats] == ["aws_es", "aws_kafka"]
+        kafka = stats[1]
+        assert kafka["count"] == 4
+        assert kafka["total_p50"] == 3
+        assert kafka["total_p95"] == 5
+        assert kafka["fetch_p50"] == 2
+        assert kafka["diff_p95"] == 1
+
+    def test_latency_stats_latest_results(self):
+        PollResultFactory(
+            service="aws_kafka",
+            fetch_duration=10,
+            created=timezone.now() - timedelta(hours=1),
+        )
+        PollResultFactory(service="aws_kafka", fetch_duration=1)
+
+        (kafka,) = PollResultAdmin.get_latency_stats(PollResult.objects.all(), limit=1)
+
+        assert kafka["count"] == 1
+        assert kafka["fetch_p95"] == 1
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+    )
+    def test_changelist_filtered_stats(self):
+        user = UserProfileFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(user)
+        PollResultFactory(service="aws_kafka", fetch_duration=1)
+        PollResultFactory(service="aws_es", fetch_duration=2)
+
+        response = self.client.get(
+            reverse("admin:services_pollresult_changelist"),
+            {"service__exact": "aws_kafka"},
+        )
+
+        assert response.status_code == 200
+        assert [row["service"] for row in response.context["latency_stats"]] == [
+            "aws_kafka"
+        ]
+        self.assertContains(response, "Latency per service")
+
+    @override_settings(
+        STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+        POLLING_STATS_WINDOW=timedelta(days=7),
+    )
+    def test_changelist_stats_window(self):
+        user = UserProfileFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(user)
+        last_year = timezone.now() - timedelta(days=400)
+        PollResultFactory(service="aws_kafka", fetch_duration=1)
+        PollResultFactory(service="aws_es", fetch_duration=2, created=last_year)
+        url = reverse("admin:services_pollresult_changelist")
+
+        response = self.client.get(url)
+
+        assert [row["service"] for row in response.context["latency_stats"]] == [
+            "aws_kafka"
+        ]
+
+        response = self.client.get(url, {"created__year": last_year.year})
+
+        assert [row["service"] for row in response.context["latency_stats"]] == [
+            "aws_es"
+        ]
+        assert response.context.get("latency_since") is None
@@ -0,0 +1,58 @@
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase, TestCase
+from services.base import services
+from services.cache import fetch_once, run_cache
+from services.tasks import PollService, aws_lambda, run_polling
+
+
+class FetchOnceTestCase(SimpleTestCase):
+    def test_fetched_once_per_run(self):
+        fetch_fn = Mock(return_value=["1.0"])
+
+        with run_cache() as cache:
+            assert fetch_once("foo", fetch_fn) == ["1.0"]
+            assert fetch_once("foo", fetch_fn) == ["1.0"]
+
+        fetch_fn.assert_called_once()
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_errors_are_cached(self):
+        fetch_fn = Mock(side_effect=ValueError("broken"))
+
+        with run_cache():
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    fetch_once("foo", fetch_fn)
+
+        fetch_fn.assert_called_once()
+
+    def test_not_cached_outside_of_run(self):
+        fetch_fn = Mock(return_value=["1.0"])
+
+        fetch_once("foo", fetch_fn)
+        fetch_once("foo", fetch_fn)
+
+        assert fetch_fn.call_count == 2
+
+
+class AwsLambdaFetchOnceTestCase(TestCase):
+    @patch("services.tasks._aws_lambda_runtimes")
+    def test_runtimes_page_fetched_once(self, mocked_aws_lambda_runtimes):
+        mocked_aws_lambda_runtimes.return_value = [
+            {"name": "Python 3.9", "version": "python3.9"},
+            {"name": "Ruby 2.7", "version": "ruby2.7"},
+        ]
+
+        python, ruby = run_polling(
+            "AWS",
+            PollService.for_services(
+                [services["aws_lambda_python"], services["aws_lambda_ruby"]],
+                aws_lambda,
+            ),
+        )
+
+        mocked_aws_lambda_runtimes.assert_called_once()
+        assert python.added_versions == ["python3.9"]
+        assert ruby.added_versions == ["ruby2.7"]
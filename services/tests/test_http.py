@@ -0,0 +1,122 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import requests
+from django.conf import settings
+from django.test import SimpleTestCase
+from services import http
+
+
+def _response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b"<html></html>"
+    return response
+
+
+@patch("backoff._sync.time.sleep", Mock())
+class HttpGetTestCase(SimpleTestCase):
+    @patch("services.http.get_session")
+    def test_timeouts_are_set(self, mocked_get_session):
+        mocked_get_session.return_value.get.return_value = _response(200)
+
+        http.get("https://docs.example.com")
+
+        mocked_get_session.return_value.get.assert_called_once_with(
+            "https://docs.example.com",
+            headers=None,
+            timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT),
+        )
+
+    @patch("services.http.get_session")
+    def test_server_errors_are_retried(self, mocked_get_session):
+        mocked_get_session.return_value.get.side_effect = [
+            _response(503),
+            requests.ConnectionError(),
+            _response(200),
+        ]
+
+        response = http.get("https://docs.example.com")
+
+        assert response.status_code == 200
+        assert mocked_get_session.return_value.get.call_count == 3
+
+    @patch("services.http.get_session")
+    def test_client_errors_are_not_retried(self, mocked_get_session):
+        mocked_get_session.return_value.get.return_value = _response(404)
+
+        with self.assertRaises(requests.HTTPError):
+            http.get("https://docs.example.com")
+
+        mocked_get_session.return_value.get.assert_called_once()
+
+    @patch("services.http.get_session")
+    def test_not_modified_is_returned(self, mocked_get_session):
+        mocked_get_session.return_value.get.return_value = _response(304)
+
+        assert http.get("https://docs.example.com").status_code == 304
+
+
+def _httpx_response(status_code):
+    return httpx.Response(
+        status_code,
+        content=b"<html></html>",
+        request=httpx.Request("GET", "https://docs.example.com"),
+    )
+
+
+def _get_async(url):
+    async def get():
+        async with http.async_client():
+            return await http.get_async(url)
+
+    return asyncio.run(get())
+
+
+@patch("backoff._async.asyncio.sleep", AsyncMock())
+@patch("services.http.httpx.AsyncClient.get", new_callable=AsyncMock)
+class HttpGetAsyncTestCase(SimpleTestCase):
+    def test_server_errors_are_retried(self, mocked_get):
+        mocked_get.side_effect = [
+            _httpx_response(503),
+            httpx.ConnectError("Connection refused"),
+            _httpx_response(200),
+        ]
+
+        response = _get_async("https://docs.example.com")
+
+        assert response.status_code == 200
+        assert response.content == b"<html></html>"
+        assert mocked_get.call_count == 3
+
+    def test_client_errors_are_not_retried(self, mocked_get):
+        mocked_get.return_value = _httpx_response(404)
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            _get_async("https://docs.example.com")
+
+        mocked_get.assert_called_once()
+
+    def test_not_modified_is_returned(self, mocked_get):
+        mocked_get.return_value = _httpx_response(304)
+
+        assert _get_async("https://docs.example.com").status_code == 304
+
+    def test_client_is_required(self, mocked_get):
+        with self.assertRaises(RuntimeError):
+            asyncio.run(http.get_async("https://docs.example.com"))
+
+        mocked_get.assert_not_called()
+
+
+class GetSessionTestCase(SimpleTestCase):
+    def test_session_is_shared(self):
+        session = http.get_session()
+
+        assert http.get_session() is session
+        assert session.headers["Accept-Encoding"] == http.ACCEPT_ENCODING
+        assert (
+            session.get_adapter("https://docs.example.com")._pool_maxsize
+            == settings.HTTP_POOL_MAXSIZE
+        )
@@ -1,8 +1,11 @@
+from datetime import timedelta
 from unittest.mock import patch
 from grpc import services
 from services.tests.factories import VersionFactory
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 from services.base import Service, services, aws
+from services.models import ServicePollState
 
 
 class VersionServiceObjTestCase(TestCase):
@@ -52,3 +55,101 @@ class VersionServiceIsPublicTestCase(TestCase):
         version = VersionFactory(service="foo_bar")
 
         assert version.service_is_public is False
+
+
+@override_settings(
+    POLLING_MIN_INTERVAL=timedelta(hours=2),
+    POLLING_DEFAULT_INTERVAL=timedelta(hours=12),
+    POLLING_MAX_INTERVAL=timedelta(days=2),
+    POLLING_TARGET_CHANGES_PER_POLL=0.25,
+    POLLING_CHANGE_RATE_SMOOTHING=0.5,
+)
+class ServicePollStateScheduleTestCase(SimpleTestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.state = ServicePollState(service="aws_eks")
+
+    def test_first_poll_uses_default_interval(self):
+        self.state.schedule(self.now, changed=True, subscribers=1)
+
+        assert self.state.last_polled == self.now
+        assert self.state.next_poll_at == self.now + timedelta(hours=12)
+        assert self.state.change_rate == 0
+
+    def test_interval_adapts_to_changes(self):
+        self.state.schedule(self.now, subscribers=1)
+
+        # a change observed after a day: 0.5 changes per day
+        self.now += timedelta(days=1)
+        self.state.schedule(self.now, changed=True, subscribers=1)
+        assert self.state.change_rate == 0.5
+        assert self.state.next_poll_at == self.now + timedelta(hours=12)
+
+        # no change after half a day: 0.25 changes per day
+        self.now += timedelta(hours=12)
+        self.state.schedule(self.now, subscribers=1)
+        assert self.state.change_rate == 0.25
+        assert self.state.next_poll_at == self.now + timedelta(days=1)
+
+    def test_interval_bounds(self):
+        self.state.last_polled = self.now - timedelta(minutes=1)
+        self.state.schedule(self.now, changed=True, subscribers=1)
+        assert self.state.next_poll_at == self.now + timedelta(hours=2)
+
+        self.state.change_rate = 0
+        self.state.schedule(self.now + timedelta(days=1), subscribers=1)
+        assert self.state.next_poll_at == self.now + timedelta(days=3)
+
+    def test_services_without_subscribers_are_polled_less(self):
+        self.state.last_polled = self.now - timedelta(days=1)
+        self.state.change_rate = 1
+
+        self.state.schedule(self.now, subscribers=0)
+
+        # 0.5 changes per day, 12 hours interval for services with subscribers
+        assert self.state.next_poll_at == self.now + timedelta(hours=24)
+
+    def test_failure_is_retried_after_min_interval(self):
+        self.state.last_polled = self.now - timedelta(days=1)
+
+        self.state.schedule(self.now, failed=True)
+        self.state.schedule(self.now, failed=True)
+
+        assert self.state.failures == 2
+        assert self.state.last_polled == self.now - timedelta(days=1)
+        assert self.state.next_poll_at == self.now + timedelta(hours=2)
+
+        self.state.schedule(self.now)
+        assert self.state.failures == 0
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.state.schedule(self.now, failed=True)
+        assert not self.state.circuit_open
+
+        self.state.schedule(self.now, failed=True)
+        assert self.state.circuit_opened == self.now
+        assert self.state.next_poll_at == self.now + timedelta(hours=2)
+
+    def test_open_circuit_probes_back_off(self):
+        self.state.failures = 3
+        self.state.circuit_opened = self.now
+
+        self.state.schedule(self.now, failed=True)
+        assert self.state.next_poll_at == self.now + timedelta(hours=4)
+        self.state.schedule(self.now, failed=True)
+        assert self.state.next_poll_at == self.now + timedelta(hours=8)
+
+        self.state.failures = 20
+        self.state.schedule(self.now, failed=True)
+        assert self.state.next_poll_at == self.now + timedelta(days=7)
+        assert self.state.circuit_opened == self.now
+
+    def test_successful_probe_closes_circuit(self):
+        self.state.failures = 5
+        self.state.circuit_opened = self.now - timedelta(days=1)
+
+        self.state.schedule(self.now, subscribers=1)
+
+        assert not self.state.circuit_open
+        assert self.state.failures == 0
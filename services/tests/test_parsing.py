@@ -0,0 +1,155 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from services import parsing
+from services.parsing import (
+    ScraperSpec,
+    ScrappingError,
+    TableLocator,
+    TableNotFound,
+    compile_spec,
+    extract_table,
+    extract_tables,
+)
+from services.tasks import azure_redis_server
+
+PAGE = """
+<html><body>
+<table><tr><td>before anchor</td></tr></table>
+<h2 id="versions">Versions</h2>
+<p>Some text</p>
+<table>
+  <tr><th>Version</th><th>End of support</th></tr>
+  <tr><td> 1.2 </td><td>2030-01-01</td></tr>
+  <tr><td>1.1</td><td><table><tr><td>nested</td></tr></table></td></tr>
+</table>
+<h2 id="runtimes">Runtimes</h2>
+<table><tr><td>other</td></tr></table>
+<table><caption>Supported Runtimes</caption><tr><td>python3.9</td></tr></table>
+</body></html>
+"""
+
+
+class ExtractTableTestCase(SimpleTestCase):
+    def test_anchor(self):
+        rows = extract_table(PAGE, TableLocator(anchor_id="versions"))
+
+        self.assertEqual(rows, [["1.2", "2030-01-01"], ["1.1", "nested"]])
+
+    def test_marker(self):
+        rows = extract_table(PAGE, TableLocator(marker="Supported Runtimes"))
+
+        self.assertEqual(rows, [["python3.9"]])
+
+    def test_anchor_and_marker(self):
+        rows = extract_table(
+            PAGE, TableLocator(anchor_id="runtimes", marker="Supported Runtimes")
+        )
+
+        self.assertEqual(rows, [["python3.9"]])
+
+    def test_bytes(self):
+        rows = extract_table(
+            "<h2 id='a'></h2><table><tr><td>é</td></tr></table>".encode(),
+            TableLocator(anchor_id="a"),
+        )
+
+        self.assertEqual(rows, [["é"]])
+
+    def test_multiple_tables(self):
+        tables = extract_tables(
+            PAGE,
+            [TableLocator(anchor_id="runtimes"), TableLocator(anchor_id="versions")],
+        )
+
+        self.assertEqual(tables[0], [["other"]])
+        self.assertEqual(tables[1][0], ["1.2", "2030-01-01"])
+
+    def test_stops_once_tables_are_read(self):
+        content = PAGE + "<p>filler</p>" * 10000
+
+        with patch.object(parsing, "CHUNK_SIZE", len(PAGE)), patch.object(
+            parsing.TableExtractor,
+            "feed",
+            autospec=True,
+            side_effect=parsing.TableExtractor.feed,
+        ) as feed:
+            extract_table(content, TableLocator(anchor_id="versions"))
+
+        self.assertEqual(feed.call_count, 1)
+
+    def test_table_not_found(self):
+        with self.assertRaises(TableNotFound):
+            extract_table(PAGE, TableLocator(anchor_id="missing"))
+
+        with self.assertRaises(TableNotFound):
+            extract_table(PAGE, TableLocator(anchor_id="versions", marker="missing"))
+
+
+class CompiledScraperTestCase(SimpleTestCase):
+    def test_column_and_row_filter(self):
+        spec = ScraperSpec(
+            url="https://example.com",
+            tables=(TableLocator(anchor_id="versions"),),
+            column=1,
+            row_filter=lambda row: row[0] != "1.1",
+            error="Versions not found",
+        )
+
+        self.assertEqual(compile_spec(spec).extract(PAGE), ["2030-01-01"])
+
+    def test_whole_rows_and_post_process(self):
+        spec = ScraperSpec(
+            url="https://example.com",
+            tables=(
+                TableLocator(anchor_id="versions"),
+                TableLocator(marker="Runtimes"),
+            ),
+            column=None,
+            post_process=lambda rows: [len(row) for row in rows],
+            error="Versions not found",
+        )
+
+        self.assertEqual(compile_spec(spec).extract(PAGE), [2, 2, 1])
+
+    def test_table_without_values(self):
+        spec = ScraperSpec(
+            url="https://example.com",
+            tables=(
+                TableLocator(anchor_id="versions"),
+                TableLocator(anchor_id="runtimes"),
+            ),
+            row_filter=lambda row: row[0] != "other",
+            error="Versions not found",
+        )
+
+        with self.assertRaisesMessage(ScrappingError, "Versions not found"):
+            compile_spec(spec).extract(PAGE)
+
+    def test_compiled_once(self):
+        spec = ScraperSpec(
+            url="https://example.com",
+            tables=(TableLocator(anchor_id="versions"),),
+            error="Versions not found",
+        )
+
+        self.assertIs(compile_spec(spec), compile_spec(spec))
+
+
+class ScraperTestCase(SimpleTestCase):
+    @patch("services.tasks.fetch_page")
+    def test_azure_redis_server(self, fetch_page):
+        fetch_page.return_value = MagicMock(content=b"""
+            <h2 id="request-body">Request Body</h2>
+            <table>
+              <tr><th>Name</th><th>Type</th><th>Description</th></tr>
+              <tr><td>location</td><td>string</td><td>Location.</td></tr>
+              <tr>
+                <td>properties.redisVersion</td><td>string</td>
+                <td>Redis version. Supported versions: 4.0, 6.0.</td>
+              </tr>
+            </table>
+            """)
+
+        self.assertEqual(azure_redis_server(), ["4.0", "6.0"])
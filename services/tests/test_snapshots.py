@@ -0,0 +1,198 @@
+import gzip
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from services.base import services
+from services.models import ServicePollState, Snapshot, Version, VersionEvent
+from services.snapshots import (
+    LocalSnapshotStore,
+    SnapshotNotFound,
+    get_digest,
+    get_snapshot_store,
+)
+from services.tasks import PollService, aws_kafka, fetch_page, run_polling
+from services.tests.factories import VersionFactory
+
+URL = "https://docs.example.com/versions.html"
+
+
+def _page_versions():
+    return fetch_page(URL).content.decode().split()
+
+
+class SnapshotDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.snapshot_dir)
+        settings = override_settings(
+            SNAPSHOT_STORAGE="local", SNAPSHOT_DIR=self.snapshot_dir
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        get_snapshot_store.cache_clear()
+        self.addCleanup(get_snapshot_store.cache_clear)
+
+
+class LocalSnapshotStoreTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = LocalSnapshotStore(self.directory)
+
+    def test_content_addressed_and_compressed(self):
+        content = b"<html>" + b"<p>version</p>" * 1000 + b"</html>"
+        digest = get_digest(content)
+
+        compressed_size = self.store.put(digest, content)
+
+        path = self.store.directory / digest[:2] / f"{digest}.gz"
+        assert gzip.decompress(path.read_bytes()) == content
+        assert compressed_size == path.stat().st_size < len(content)
+        assert self.store.get(digest) == content
+        assert self.store.put(digest, content) == compressed_size
+
+    def test_not_found(self):
+        with self.assertRaises(SnapshotNotFound):
+            self.store.get(get_digest(b"missing"))
+
+    @override_settings(SNAPSHOT_STORAGE="")
+    def test_disabled(self):
+        get_snapshot_store.cache_clear()
+        self.addCleanup(get_snapshot_store.cache_clear)
+
+        assert get_snapshot_store() is None
+
+
+class SnapshotCaptureTestCase(SnapshotDirMixin, TestCase):
+    @patch("services.http.get")
+    def test_payloads_archived_once_per_content(self, mocked_get):
+        mocked_get.return_value = Mock(status_code=200, headers={}, content=b"1.0")
+
+        run_polling("AWS", [PollService(services["aws_eks"], _page_versions)])
+        run_polling("AWS", [PollService(services["aws_eks"], _page_versions)])
+
+        snapshot = Snapshot.objects.get()
+        assert (snapshot.service, snapshot.key, snapshot.kind) == (
+            "aws_eks",
+            URL,
+            Snapshot.HTML,
+        )
+        assert snapshot.digest == get_digest(b"1.0")
+        assert snapshot.size == 3
+        assert snapshot.poll_run is not None
+        assert get_snapshot_store().get(snapshot.digest) == b"1.0"
+
+        mocked_get.return_value.content = b"1.0 1.1"
+        run_polling("AWS", [PollService(services["aws_eks"], _page_versions)])
+        assert Snapshot.objects.count() == 2
+
+    @patch("services.tasks.notify_operator")
+    @patch("services.http.get")
+    def test_payload_breaking_parser_is_archived(
+        self, mocked_get, mocked_notify_operator
+    ):
+        mocked_get.return_value = Mock(status_code=200, headers={}, content=b"new")
+
+        def _broken_poll_fn():
+            fetch_page(URL)
+            raise ValueError("Layout changed")
+
+        (poll_service,) = run_polling(
+            "AWS", [PollService(services["aws_eks"], _broken_poll_fn)]
+        )
+
+        assert poll_service.error is not None
+        assert Snapshot.objects.filter(key=URL, digest=get_digest(b"new")).exists()
+
+    @patch("services.tasks.get_aws_client")
+    def test_api_pages_archived_without_request_metadata(self, mocked_get_aws_client):
+        client = mocked_get_aws_client.return_value
+        client.can_paginate.return_value = False
+        for request_id in ["a", "b"]:
+            client.list_kafka_versions.return_value = {
+                "KafkaVersions": [{"Version": "2.8.1", "Status": "ACTIVE"}],
+                "ResponseMetadata": {"RequestId": request_id},
+            }
+            run_polling("AWS", [PollService(services["aws_kafka"], aws_kafka)])
+
+        snapshot = Snapshot.objects.get()
+        assert snapshot.key == "kafka.list_kafka_versions"
+        assert snapshot.kind == Snapshot.JSON
+        assert b"RequestId" not in get_snapshot_store().get(snapshot.digest)
+
+
+class ReparseSnapshotsTestCase(SnapshotDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.archive(b"1.0", self.now - timedelta(days=2))
+        self.archive(b"1.0 1.1", self.now - timedelta(days=1))
+        VersionFactory(service="aws_eks", version="1.0")
+
+        patcher = patch(
+            "services.management.commands.reparse_snapshots.all_poll_services",
+            return_value=[
+                PollService(services["aws_eks"], _page_versions),
+                PollService(services["aws_kafka"], aws_kafka),
+            ],
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def archive(self, content, created):
+        digest = get_digest(content)
+        get_snapshot_store().put(digest, content)
+        Snapshot.objects.create(
+            service="aws_eks",
+            key=URL,
+            kind=Snapshot.HTML,
+            digest=digest,
+            size=len(content),
+            compressed_size=0,
+            created=created,
+        )
+
+    def test_missing_versions_backfilled(self):
+        call_command("reparse_snapshots", stdout=StringIO())
+
+        version = Version.objects.get(service="aws_eks", version="1.1")
+        assert version.created == self.now - timedelta(days=1)
+        assert Version.objects.count() == 2
+        (event,) = version.events.all()
+        assert event.kind == VersionEvent.ADDED
+        assert event.created == version.created
+
+    def test_dry_run(self):
+        stdout = StringIO()
+
+        call_command("reparse_snapshots", "--dry-run", stdout=stdout)
+
+        assert "aws_eks                      1.1" in stdout.getvalue()
+        assert "1 missing versions" in stdout.getvalue()
+        assert Version.objects.count() == 1
+
+    def test_dropped_versions_backfilled_deprecated(self):
+        dropped_at = self.now - timedelta(hours=12)
+        # same versions as the first page, laid out differently
+        self.archive(b"1.0\n", dropped_at)
+        ServicePollState.objects.create(service="aws_eks", fingerprint="abc")
+
+        call_command("reparse_snapshots", stdout=StringIO())
+
+        version = Version.objects.get(service="aws_eks", version="1.1")
+        assert version.deprecated == dropped_at.date()
+        assert list(
+            version.events.order_by("created").values_list("kind", "created")
+        ) == [
+            (VersionEvent.ADDED, self.now - timedelta(days=1)),
+            (VersionEvent.DEPRECATED, dropped_at),
+        ]
+        assert ServicePollState.objects.get(service="aws_eks").fingerprint == ""
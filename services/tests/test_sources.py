@@ -0,0 +1,126 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+
+from services.sources import (
+    RECORD,
+    REPLAY,
+    FixtureNotFound,
+    fetch_api,
+    fetch_api_pages,
+    fixture_path,
+    source_mode,
+)
+from services.tasks import aws_kafka, fetch_page
+
+KAFKA_VERSIONS = {
+    "KafkaVersions": [
+        {"Version": "2.8.1", "Status": "ACTIVE"},
+        {"Version": "1.1.1", "Status": "DEPRECATED"},
+    ]
+}
+
+
+class SourceModeTestCase(SimpleTestCase):
+    def setUp(self):
+        self.fixtures_dir = Path(tempfile.mkdtemp())
+
+    @patch("services.tasks.get_aws_client")
+    def test_record_and_replay_api(self, mocked_get_aws_client):
+        paginator = mocked_get_aws_client.return_value.get_paginator.return_value
+        paginator.paginate.return_value = [
+            KAFKA_VERSIONS,
+            {"KafkaVersions": [{"Version": "3.1.1", "Status": "ACTIVE"}]},
+        ]
+
+        with source_mode(RECORD, self.fixtures_dir):
+            assert aws_kafka() == ["2.8.1", "3.1.1"]
+
+        mocked_get_aws_client.reset_mock()
+        with source_mode(REPLAY, self.fixtures_dir):
+            assert aws_kafka() == ["2.8.1", "3.1.1"]
+        mocked_get_aws_client.assert_not_called()
+
+    def test_replay_single_page_fixture(self):
+        with source_mode(REPLAY, self.fixtures_dir):
+            fixture_path("kafka.list_kafka_versions", "json").write_text(
+                json.dumps(KAFKA_VERSIONS)
+            )
+
+            assert list(fetch_api_pages("kafka.list_kafka_versions", list)) == [
+                KAFKA_VERSIONS
+            ]
+
+    @patch("services.http.get")
+    def test_replay_page(self, mocked_get):
+        url = "https://docs.example.com/versions.html"
+        with source_mode(REPLAY, self.fixtures_dir):
+            fixture_path(url, "html").write_bytes(b"<html>1.0</html>")
+
+            assert fetch_page(url).content == b"<html>1.0</html>"
+
+        mocked_get.assert_not_called()
+
+    def test_missing_fixture(self):
+        with source_mode(REPLAY, self.fixtures_dir):
+            with self.assertRaises(FixtureNotFound):
+                fetch_api("kafka.list_kafka_versions", dict)
+
+
+@override_settings(POLLING_AWS_REGIONS=["eu-central-1"])
+class BenchmarkPollFnsTestCase(SimpleTestCase):
+    def setUp(self):
+        self.fixtures_dir = Path(tempfile.mkdtemp())
+        with source_mode(REPLAY, self.fixtures_dir):
+            fixture_path("kafka.list_kafka_versions.eu-central-1", "json").write_text(
+                json.dumps(KAFKA_VERSIONS)
+            )
+
+    def test_benchmark(self):
+        json_path = self.fixtures_dir / "results.json"
+        out = StringIO()
+
+        call_command(
+            "benchmark_poll_fns",
+            "--service=aws_kafka",
+            f"--fixtures-dir={self.fixtures_dir}",
+            f"--json={json_path}",
+            "--repeat=1",
+            stdout=out,
+        )
+
+        assert "aws_kafka" in out.getvalue()
+        (result,) = json.loads(json_path.read_text())
+        assert result["service"] == "aws_kafka"
+        assert result["versions"] == ["2.8.1"]
+        assert result["peak_memory_kib"] > 0
+
+    def test_missing_fixture_fails(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                "benchmark_poll_fns",
+                "--service=aws_es",
+                f"--fixtures-dir={self.fixtures_dir}",
+                stdout=StringIO(),
+            )
+
+    def test_docs_pages_only(self):
+        with self.assertRaises(CommandError) as raised:
+            call_command(
+                "benchmark_poll_fns",
+                "--docs-pages",
+                f"--fixtures-dir={self.fixtures_dir}",
+                "--repeat=1",
+                stdout=StringIO(),
+            )
+
+        failed = str(raised.exception)
+        assert "aws_eks" in failed
+        assert "aws_lambda_go" in failed
+        assert "aws_kafka" not in failed
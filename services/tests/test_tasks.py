@@ -1,9 +1,60 @@
-from django.test import TestCase
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient import discovery_cache
+
 from services.base import services
-from services.models import Version
-from services.tasks import PollService
+from services.models import (
+    PollResult,
+    PollRun,
+    ServicePollState,
+    SourceValidator,
+    Version,
+    VersionEvent,
+    VersionRegion,
+)
+from services.tasks import (
+    AWS_RDS_ENGINES,
+    POLLING_ENGINES,
+    PollService,
+    ScrappingError,
+    aws_pages,
+    aws_poll_services,
+    aws_kafka,
+    aws_rds,
+    fetch_page,
+    fetch_page_async,
+    get_aws_client,
+    get_aws_session,
+    get_gcp_credentials,
+    get_gcp_discovery_path,
+    get_gcp_service,
+    in_regions,
+    poll_aws,
+    poll_azure,
+    poll_due,
+    run_polling,
+    shard_poll_services,
+)
 from services.tests.factories import VersionFactory
+from subscriptions.tests.factories import SubscriptionFactory
 
 
 class VersionServiceUpdate(TestCase):
@@ -61,3 +112,1101 @@ class VersionServiceIsDeprecatedThenSupportedAgain(TestCase):
             version=version_to_deprecate.version,
             deprecated=None,
         ).exists()
+
+
+class VersionServiceBulkDiff(TestCase):
+    def _count_queries(self, service, supported_versions):
+        poll_service = PollService(service, lambda: supported_versions)
+        with CaptureQueriesContext(connection) as ctx:
+            poll_service.poll()
+        return len(ctx.captured_queries)
+
+    def test_statement_count_does_not_depend_on_changed_versions(self):
+        few_versions = [f"1.{i}" for i in range(2)]
+        many_versions = [f"1.{i}" for i in range(50)]
+
+        added_few = self._count_queries(services["aws_kafka"], few_versions)
+        added_many = self._count_queries(services["aws_es"], many_versions)
+        assert added_few == added_many
+
+        # deprecate everything, then renew everything
+        deprecated_few = self._count_queries(services["aws_kafka"], ["2.0"])
+        deprecated_many = self._count_queries(services["aws_es"], ["2.0"])
+        assert deprecated_few == deprecated_many
+
+        renewed_few = self._count_queries(services["aws_kafka"], few_versions)
+        renewed_many = self._count_queries(services["aws_es"], many_versions)
+        assert renewed_few == renewed_many
+
+        assert Version.objects.filter(service="aws_es", deprecated=None).count() == 50
+
+    @patch("services.tasks.notify_operator")
+    @patch("services.tasks.Version.objects.bulk_create")
+    def test_failed_diff_is_rolled_back(
+        self, mocked_bulk_create, mocked_notify_operator
+    ):
+        mocked_bulk_create.side_effect = DatabaseError("Connection lost")
+        version_to_deprecate = VersionFactory(service="aws_kafka", version="1.0")
+
+        poll_service = PollService(services["aws_kafka"], lambda: ["2.0"])
+        poll_service.poll()
+
+        assert isinstance(poll_service.error, DatabaseError)
+        version_to_deprecate.refresh_from_db()
+        assert version_to_deprecate.deprecated is None
+        assert ServicePollState.objects.get(service="aws_kafka").fingerprint == ""
+
+
+class VersionEventLogTestCase(TestCase):
+    def test_changes_are_logged(self):
+        deprecated = VersionFactory(service="aws_kafka", version="1.0")
+        renewed = VersionFactory(
+            service="aws_kafka", version="1.1", deprecated=timezone.now().date()
+        )
+        VersionFactory(service="aws_kafka", version="1.2")
+
+        (poll_service,) = run_polling(
+            "AWS", [PollService(services["aws_kafka"], lambda: ["1.1", "1.2", "2.0"])]
+        )
+
+        events = {
+            (event.version.version, event.kind)
+            for event in VersionEvent.objects.filter(service="aws_kafka")
+        }
+        assert events == {
+            ("1.0", VersionEvent.DEPRECATED),
+            ("1.1", VersionEvent.RENEWED),
+            ("2.0", VersionEvent.ADDED),
+        }
+        assert set(VersionEvent.objects.values_list("poll_run", flat=True)) == {
+            poll_service.poll_run.id
+        }
+        assert deprecated.events.get().kind == VersionEvent.DEPRECATED
+        assert renewed.events.get().kind == VersionEvent.RENEWED
+
+    def test_unchanged_versions_are_not_logged(self):
+        PollService(services["aws_kafka"], lambda: ["1.0"]).poll()
+        PollService(services["aws_kafka"], lambda: ["1.0"]).poll()
+
+        assert VersionEvent.objects.count() == 1
+
+    @patch("services.tasks.notify_operator")
+    @patch("services.tasks.VersionEvent.objects.bulk_create")
+    def test_log_is_written_with_the_diff(
+        self, mocked_bulk_create, mocked_notify_operator
+    ):
+        mocked_bulk_create.side_effect = DatabaseError("Connection lost")
+
+        poll_service = PollService(services["aws_kafka"], lambda: ["2.0"])
+        poll_service.poll()
+
+        assert isinstance(poll_service.error, DatabaseError)
+        assert not Version.objects.filter(service="aws_kafka").exists()
+
+
+class VersionServiceScopedDiff(TestCase):
+    def test_version_of_other_service_is_not_seen_before(self):
+        VersionFactory(service="aws_mysql", version="5.7")
+        aurora_version = VersionFactory(
+            service="aws_aurora", version="5.7", deprecated=timezone.now()
+        )
+
+        poll_service = PollService(services["aws_mariadb"], lambda: ["5.7"])
+        poll_service.poll()
+
+        assert poll_service.added_versions == ["5.7"]
+        assert Version.objects.filter(service="aws_mariadb", version="5.7").exists()
+        aurora_version.refresh_from_db()
+        assert aurora_version.deprecated is not None
+
+    def test_cost_does_not_grow_with_other_services(self):
+        def _poll_queries(service):
+            poll_service = PollService(service, lambda: ["5.7", "8.0"])
+            with CaptureQueriesContext(connection) as ctx:
+                poll_service.poll()
+            return [q["sql"] for q in ctx.captured_queries]
+
+        small_table_queries = _poll_queries(services["aws_mysql"])
+
+        Version.objects.bulk_create(
+            [
+                Version(service=service_name, version=f"{major}.{minor}")
+                for service_name in ["aws_aurora", "aws_mariadb", "aws_postgres"]
+                for major in range(10)
+                for minor in range(10)
+            ]
+        )
+        large_table_queries = _poll_queries(services["aws_aurora_mysql"])
+
+        assert len(small_table_queries) == len(large_table_queries)
+        version_reads = [
+            sql
+            for sql in large_table_queries
+            if sql.startswith("SELECT") and '"services_version"' in sql
+        ]
+        assert version_reads
+        for sql in version_reads:
+            assert '"services_version"."service" = ' in sql
+
+
+class VersionServiceUnchanged(TestCase):
+    def test_unchanged_versions_skip_db_work(self):
+        aws_activemq = services["aws_activemq"]
+        PollService(aws_activemq, lambda: ["5.16.4", "5.15.9"]).poll()
+
+        poll_service = PollService(aws_activemq, lambda: ["5.15.9", "5.16.4", "5.15.9"])
+        with self.assertNumQueries(1):
+            poll_service.poll()
+
+        assert poll_service.unchanged is True
+        assert poll_service.added_versions == []
+        assert poll_service.deprecated_versions == []
+
+    def test_changed_versions_update_fingerprint(self):
+        aws_activemq = services["aws_activemq"]
+        PollService(aws_activemq, lambda: ["5.16.4"]).poll()
+
+        poll_service = PollService(aws_activemq, lambda: ["5.17.0"])
+        poll_service.poll()
+
+        assert poll_service.unchanged is False
+        assert poll_service.added_versions == ["5.17.0"]
+        assert ServicePollState.objects.get(
+            service=aws_activemq.name
+        ).fingerprint == ServicePollState.get_fingerprint(["5.17.0"])
+
+
+class VersionRegionsTestCase(TestCase):
+    def regions(self, service_name):
+        return {
+            (r.version.version, r.region)
+            for r in VersionRegion.objects.filter(version__service=service_name)
+        }
+
+    @override_settings(POLLING_AWS_REGIONS=["eu-central-1", "ap-northeast-3"])
+    @patch("services.tasks.get_aws_client")
+    def test_regions_without_the_service_are_left_out(self, mocked_get_aws_client):
+        def get_aws_client(service_name, region_name=None):
+            if region_name == "ap-northeast-3":
+                raise AssertionError("MemoryDB is not available in ap-northeast-3")
+            client = Mock()
+            client.can_paginate.return_value = False
+            client.describe_engine_versions.return_value = {
+                "EngineVersions": [{"EngineVersion": "6.2"}]
+            }
+            return client
+
+        mocked_get_aws_client.side_effect = get_aws_client
+        (memorydb,) = [
+            ps for ps in aws_poll_services() if ps.service.name == "aws_memorydb"
+        ]
+
+        memorydb.poll()
+
+        assert memorydb.error is None
+        assert self.regions("aws_memorydb") == {("6.2", "eu-central-1")}
+
+    @patch("services.tasks.notify_operator")
+    def test_no_region_fails_the_poll(self, mocked_notify_operator):
+        version = VersionFactory(service="aws_memorydb", version="6.2")
+        poll_fn = Mock(return_value=["6.2"])
+
+        (memorydb,) = run_polling(
+            "AWS", [PollService(services["aws_memorydb"], in_regions(poll_fn, []))]
+        )
+
+        assert isinstance(memorydb.error, ValueError)
+        poll_fn.assert_not_called()
+        version.refresh_from_db()
+        assert version.deprecated is None
+
+    def test_regions_are_merged_by_version(self):
+        regional_versions = {"eu-west-1": ["1.0", "2.0"], "us-east-1": ["2.0"]}
+
+        poll_fn = in_regions(regional_versions.get, ["eu-west-1", "us-east-1"])
+
+        assert poll_fn() == {"1.0": ["eu-west-1"], "2.0": ["eu-west-1", "us-east-1"]}
+
+    @override_settings(POLLING_REGION_CONCURRENCY=2)
+    def test_region_concurrency_is_limited(self):
+        lock = threading.Lock()
+        running = []
+        max_running = []
+
+        def poll_region(region):
+            with lock:
+                running.append(region)
+                max_running.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(region)
+            return ["1.0"]
+
+        regions = [f"region-{i}" for i in range(6)]
+        assert in_regions(poll_region, regions)() == {"1.0": regions}
+        assert max(max_running) == 2
+
+    def test_failing_region_fails_poll(self):
+        def poll_region(region):
+            if region == "us-east-1":
+                raise ScrappingError("Throttled")
+            return ["1.0"]
+
+        poll_service = PollService(
+            services["aws_kafka"], in_regions(poll_region, ["eu-west-1", "us-east-1"])
+        )
+        with patch("services.tasks.notify_operator"):
+            poll_service.poll()
+
+        assert isinstance(poll_service.error, ScrappingError)
+        assert not Version.objects.filter(service="aws_kafka").exists()
+
+    def test_regions_are_synced(self):
+        aws_kafka = services["aws_kafka"]
+        PollService(
+            aws_kafka,
+            lambda: {"2.8.1": ["eu-west-1", "us-east-1"], "2.7.0": ["eu-west-1"]},
+        ).poll()
+        assert self.regions(aws_kafka.name) == {
+            ("2.8.1", "eu-west-1"),
+            ("2.8.1", "us-east-1"),
+            ("2.7.0", "eu-west-1"),
+        }
+
+        # 2.7.0 is dropped, 2.8.1 is no longer available in eu-west-1
+        poll_service = PollService(aws_kafka, lambda: {"2.8.1": ["us-east-1"]})
+        poll_service.poll()
+
+        assert poll_service.unchanged is False
+        assert poll_service.deprecated_versions == ["2.7.0"]
+        assert self.regions(aws_kafka.name) == {("2.8.1", "us-east-1")}
+
+
+class RunPollingTestCase(TestCase):
+    def test_services_are_fetched_and_committed(self):
+        aws_activemq = services["aws_activemq"]
+        aws_rabbitmq = services["aws_rabbitmq"]
+
+        poll_services = run_polling(
+            "AWS",
+            [
+                PollService(aws_activemq, lambda: ["5.16.4"]),
+                PollService(aws_rabbitmq, lambda: ["3.9.16", "3.8.27"]),
+            ],
+        )
+
+        assert all(ps.error is None for ps in poll_services)
+        assert Version.objects.filter(service=aws_activemq.name).count() == 1
+        assert Version.objects.filter(service=aws_rabbitmq.name).count() == 2
+
+    def test_asyncio_engine(self):
+        aws_activemq = services["aws_activemq"]
+        aws_rabbitmq = services["aws_rabbitmq"]
+
+        poll_services = run_polling(
+            "AWS",
+            [
+                PollService(aws_activemq, lambda: ["5.16.4"]),
+                PollService(aws_rabbitmq, lambda: ["3.9.16", "3.8.27"]),
+            ],
+            engine="asyncio",
+        )
+
+        assert all(ps.error is None for ps in poll_services)
+        assert Version.objects.filter(service=aws_activemq.name).count() == 1
+        assert Version.objects.filter(service=aws_rabbitmq.name).count() == 2
+
+    @override_settings(POLLING_THREADS=1)
+    @patch("services.http.get_async")
+    def test_asyncio_engine_fetches_scrapers_on_the_event_loop(self, mocked_get_async):
+        lock = threading.Lock()
+        in_flight = []
+        max_in_flight = []
+
+        async def _get_async(url, headers):
+            with lock:
+                in_flight.append(url)
+                max_in_flight.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            with lock:
+                in_flight.remove(url)
+            return Mock(status_code=200, headers={}, content=url.encode())
+
+        mocked_get_async.side_effect = _get_async
+
+        def _scraper(url):
+            # blocking variant, never called by the asyncio engine
+            poll_fn = Mock(side_effect=AssertionError)
+
+            async def poll_async():
+                return [(await fetch_page_async(url)).content.decode()]
+
+            poll_fn.poll_async = poll_async
+            return poll_fn
+
+        names = ["aws_eks", "azure_aks", "gcp_dataproc", "azure_hdinsight"]
+        poll_services = run_polling(
+            "All",
+            [
+                PollService(services[name], _scraper(f"https://{name}.example.com"))
+                for name in names
+            ],
+            engine="asyncio",
+        )
+
+        # all pages in flight at once with a single thread
+        assert max(max_in_flight) == len(names)
+        assert all(ps.error is None for ps in poll_services)
+        assert all(ps.http_duration > 0 for ps in poll_services)
+        assert Version.objects.get(service="aws_eks").version == (
+            "https://aws_eks.example.com"
+        )
+
+    @patch("services.tasks.run_polling")
+    def test_engine_selected_by_event(self, mocked_run_polling):
+        poll_azure({"kwargs": {"engine": "asyncio"}}, None)
+        assert mocked_run_polling.call_args.kwargs == {
+            "engine": "asyncio",
+            "deadline": None,
+        }
+
+        poll_azure()
+        assert mocked_run_polling.call_args.kwargs == {"deadline": None}
+
+    def test_host_concurrency_is_limited(self):
+        lock = threading.Lock()
+        in_flight = []
+        max_in_flight = []
+
+        def _poll_fn():
+            with lock:
+                in_flight.append(1)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+            return ["1.0"]
+
+        poll_services = [
+            PollService(services[name], _poll_fn, host="docs.example.com")
+            for name in ["aws_eks", "aws_kafka", "aws_es", "aws_opensearch"]
+        ]
+
+        for engine in POLLING_ENGINES:
+            max_in_flight.clear()
+            with self.settings(POLLING_THREADS=4, POLLING_HOST_CONCURRENCY=2):
+                run_polling("AWS", poll_services, engine=engine)
+
+            assert max(max_in_flight) <= 2
+
+    @patch("services.tasks.notify_operator")
+    def test_failing_service_does_not_stop_others(self, mocked_notify_operator):
+        def _failing_poll_fn():
+            raise ScrappingError("Layout changed")
+
+        poll_services = run_polling(
+            "AWS",
+            [
+                PollService(services["aws_eks"], _failing_poll_fn),
+                PollService(services["aws_kafka"], lambda: ["3.1.1"]),
+            ],
+        )
+
+        assert isinstance(poll_services[0].error, ScrappingError)
+        assert poll_services[1].error is None
+        assert Version.objects.filter(service="aws_kafka").count() == 1
+        mocked_notify_operator.assert_called_once()
+
+    @patch("services.tasks.notify_operator")
+    def test_errors_are_sent_in_one_digest(self, mocked_notify_operator):
+        def _failing_poll_fn():
+            raise ScrappingError("Layout changed")
+
+        run_polling(
+            "AWS",
+            [
+                PollService(services[name], _failing_poll_fn)
+                for name in ["aws_eks", "aws_kafka", "aws_es"]
+            ],
+        )
+
+        mocked_notify_operator.assert_called_once()
+        digest = mocked_notify_operator.call_args.args[0]
+        assert digest.startswith("3 alerts:")
+        for name in ["aws_eks", "aws_kafka", "aws_es"]:
+            assert f"polling service {name}" in digest
+
+
+class PollScheduleTestCase(TestCase):
+    @staticmethod
+    def _all_poll_services(**poll_fns):
+        def _all_poll_services(service_names=None):
+            return [
+                PollService(services[name], poll_fn)
+                for name, poll_fn in poll_fns.items()
+                if not service_names or name in service_names
+            ]
+
+        return _all_poll_services
+
+    def test_polls_are_scheduled(self):
+        SubscriptionFactory(service="aws_kafka")
+        SubscriptionFactory(service="aws_kafka")
+        SubscriptionFactory(service="aws_es", disabled=timezone.now())
+        ServicePollState.objects.create(service="aws_es", failures=1)
+
+        with patch("services.tasks.notify_operator"):
+            run_polling(
+                "AWS",
+                [
+                    PollService(services["aws_kafka"], lambda: ["2.8.1"]),
+                    PollService(services["aws_es"], Mock(side_effect=ScrappingError)),
+                ],
+            )
+
+        kafka = ServicePollState.objects.get(service="aws_kafka")
+        assert kafka.last_polled is not None
+        assert kafka.next_poll_at > kafka.last_polled
+        assert kafka.subscribers == 2
+        es = ServicePollState.objects.get(service="aws_es")
+        assert es.last_polled is None
+        assert es.failures == 2
+        assert es.subscribers == 0
+
+    @patch("services.tasks.all_poll_services")
+    def test_only_due_services_are_polled(self, mocked_all_poll_services):
+        kafka_fn = Mock(return_value=["2.8.1"])
+        es_fn = Mock(return_value=["7.10"])
+        mocked_all_poll_services.side_effect = self._all_poll_services(
+            aws_kafka=kafka_fn, aws_es=es_fn
+        )
+        ServicePollState.objects.create(
+            service="aws_es", next_poll_at=timezone.now() + timedelta(hours=1)
+        )
+
+        poll_due()
+
+        kafka_fn.assert_called_once()
+        es_fn.assert_not_called()
+
+    @patch("services.tasks.run_polling")
+    @patch("services.tasks.all_poll_services", return_value=[])
+    def test_nothing_due(self, mocked_all_poll_services, mocked_run_polling):
+        poll_due()
+
+        mocked_run_polling.assert_not_called()
+
+    @override_settings(POLLING_SHARD_SIZE=2)
+    @patch("services.tasks.poll_shard")
+    @patch("services.tasks.all_poll_services")
+    def test_due_services_are_sharded_and_leased(
+        self, mocked_all_poll_services, mocked_poll_shard
+    ):
+        mocked_all_poll_services.side_effect = self._all_poll_services(
+            aws_kafka=Mock(), aws_es=Mock(), aws_opensearch=Mock()
+        )
+        ServicePollState.objects.create(service="aws_es")
+
+        poll_due()
+
+        assert [call.args for call in mocked_poll_shard.call_args_list] == [
+            (["aws_kafka", "aws_es"],),
+            (["aws_opensearch"],),
+        ]
+        leases = ServicePollState.objects.values_list("next_poll_at", flat=True)
+        assert len(leases) == 3
+        assert all(lease > timezone.now() for lease in leases)
+
+    @patch("services.tasks.poll_shard")
+    @patch("services.tasks.all_poll_services")
+    def test_services_sharing_a_fetch_are_due_together(
+        self, mocked_all_poll_services, mocked_poll_shard
+    ):
+        mocked_all_poll_services.return_value = [
+            PollService(services["aws_kafka"], Mock()),
+            *PollService.for_services(
+                [services["aws_lambda_python"], services["aws_lambda_go"]], Mock()
+            ),
+        ]
+        later = timezone.now() + timedelta(hours=1)
+        ServicePollState.objects.create(service="aws_kafka", next_poll_at=later)
+        ServicePollState.objects.create(service="aws_lambda_go", next_poll_at=later)
+
+        poll_due()
+
+        mocked_poll_shard.assert_called_once_with(
+            ["aws_lambda_python", "aws_lambda_go"]
+        )
+        leases = dict(ServicePollState.objects.values_list("service", "next_poll_at"))
+        assert leases["aws_kafka"] == later
+        assert leases["aws_lambda_go"] != later
+        assert leases["aws_lambda_python"] > timezone.now()
+
+    def test_shards_keep_shared_fetches_together(self):
+        poll_services = PollService.for_services(
+            [services["gcp_cloudsql_mysql"], services["gcp_cloudsql_postgres"]],
+            Mock(),
+        )
+        poll_services.insert(0, PollService(services["aws_kafka"], Mock()))
+
+        shards = shard_poll_services(poll_services, 2)
+
+        assert [[ps.service.name for ps in shard] for shard in shards] == [
+            ["aws_kafka"],
+            ["gcp_cloudsql_mysql", "gcp_cloudsql_postgres"],
+        ]
+
+    def test_services_past_deadline_are_released(self):
+        ServicePollState.objects.create(
+            service="aws_es", next_poll_at=timezone.now() + timedelta(minutes=15)
+        )
+        es_fn = Mock(return_value=["7.10"])
+
+        (poll_service,) = run_polling(
+            "AWS",
+            [PollService(services["aws_es"], es_fn)],
+            deadline=time.monotonic() - 1,
+        )
+
+        es_fn.assert_not_called()
+        assert poll_service.skipped is True
+        assert ServicePollState.objects.get(service="aws_es").next_poll_at is None
+
+
+class PollRunTestCase(TestCase):
+    @patch("services.tasks.notify_operator")
+    def test_results_are_recorded(self, mocked_notify_operator):
+        VersionFactory(service="aws_kafka", version="2.7.0")
+        VersionFactory(
+            service="aws_kafka", version="2.6.0", deprecated=timezone.now().date()
+        )
+
+        run_polling(
+            "AWS",
+            [
+                PollService(services["aws_kafka"], lambda: ["2.8.1", "2.6.0"]),
+                PollService(services["aws_es"], Mock(side_effect=ScrappingError)),
+            ],
+        )
+
+        poll_run = PollRun.objects.get()
+        assert poll_run.label == "AWS"
+        assert poll_run.services_count == 2
+        assert poll_run.duration > 0
+        kafka = poll_run.results.get(service="aws_kafka")
+        assert kafka.outcome == PollResult.CHANGED
+        assert (kafka.added, kafka.deprecated, kafka.renewed) == (1, 1, 1)
+        assert kafka.diff_duration > 0
+        es = poll_run.results.get(service="aws_es")
+        assert es.outcome == PollResult.FAILED
+        assert es.error_class == "ScrappingError"
+
+    def test_shared_fetch_is_timed_once(self):
+        def _shared_poll_fn():
+            time.sleep(0.1)
+            return {"aws_lambda_python": ["python3.9"], "aws_lambda_go": ["go1.x"]}
+
+        run_polling(
+            "AWS",
+            PollService.for_services(
+                [
+                    services["aws_lambda_python"],
+                    services["aws_lambda_ruby"],
+                    services["aws_lambda_go"],
+                ],
+                _shared_poll_fn,
+            ),
+        )
+
+        durations = dict(PollResult.objects.values_list("service", "parse_duration"))
+        assert durations.pop("aws_lambda_python") >= 0.1
+        assert durations == {"aws_lambda_ruby": 0, "aws_lambda_go": 0}
+        assert not PollResult.objects.exclude(fetch_duration=0).exists()
+
+    @patch("services.tasks.get_aws_client")
+    def test_api_pages_are_timed(self, mocked_get_aws_client):
+        client = mocked_get_aws_client.return_value
+        client.can_paginate.return_value = False
+        client.list_kafka_versions.return_value = {
+            "KafkaVersions": [{"Version": "2.8.1", "Status": "ACTIVE"}],
+            "ResponseMetadata": {"HTTPHeaders": {"content-length": "120"}},
+        }
+
+        (poll_service,) = run_polling(
+            "AWS", [PollService(services["aws_kafka"], aws_kafka)]
+        )
+
+        result = PollResult.objects.get(service="aws_kafka")
+        assert result.api_pages == 1
+        assert result.bytes_received == 120
+        assert result.fetch_duration == poll_service.http_duration > 0
+
+    @patch("services.http.get")
+    def test_concurrent_region_requests_are_not_summed(self, mocked_get):
+        both_in_flight = threading.Barrier(2)
+
+        def _get(url, headers):
+            both_in_flight.wait(timeout=5)
+            time.sleep(0.1)
+            return Mock(status_code=200, headers={}, content=b"1.0")
+
+        mocked_get.side_effect = _get
+        poll_fn = in_regions(
+            lambda region: fetch_page(f"https://{region}.example.com")
+            .content.decode()
+            .split(),
+            ["eu-west-1", "us-east-1"],
+        )
+
+        run_polling("AWS", [PollService(services["aws_eks"], poll_fn)])
+
+        result = PollResult.objects.get(service="aws_eks")
+        assert result.outcome == PollResult.CHANGED
+        assert 0.1 <= result.fetch_duration < 0.2
+        assert result.bytes_received == 6
+
+
+class CircuitBreakerTestCase(TestCase):
+    @patch("services.tasks.notify_operator")
+    def test_operators_notified_once_circuit_opens(self, mocked_notify_operator):
+        ServicePollState.objects.create(service="aws_es", failures=2)
+
+        def poll_services():
+            return [PollService(services["aws_es"], Mock(side_effect=ScrappingError))]
+
+        run_polling("AWS", poll_services())
+        state = ServicePollState.objects.get(service="aws_es")
+        assert state.circuit_open
+        # the failure and the circuit opening, in one digest
+        mocked_notify_operator.assert_called_once()
+        digest = mocked_notify_operator.call_args.args[0]
+        assert "ScrappingError" in digest
+        assert "Circuit opened" in digest
+
+        mocked_notify_operator.reset_mock()
+        run_polling("AWS", poll_services())
+        mocked_notify_operator.assert_not_called()
+        assert ServicePollState.objects.get(service="aws_es").failures == 4
+
+    @patch("services.tasks.aws_poll_services")
+    @patch("services.tasks.run_polling")
+    def test_open_circuits_are_skipped_until_probe(
+        self, mocked_run_polling, mocked_aws_poll_services
+    ):
+        now = timezone.now()
+        ServicePollState.objects.create(
+            service="aws_es",
+            failures=3,
+            circuit_opened=now,
+            next_poll_at=now + timedelta(hours=2),
+        )
+        ServicePollState.objects.create(
+            service="aws_opensearch",
+            failures=3,
+            circuit_opened=now - timedelta(hours=2),
+            next_poll_at=now,
+        )
+        mocked_aws_poll_services.return_value = [
+            PollService(services[name], Mock())
+            for name in ["aws_kafka", "aws_es", "aws_opensearch"]
+        ]
+
+        poll_aws()
+
+        polled = mocked_run_polling.call_args.args[1]
+        assert [ps.service.name for ps in polled] == ["aws_kafka", "aws_opensearch"]
+
+    def test_successful_probe_closes_circuit(self):
+        ServicePollState.objects.create(
+            service="aws_kafka", failures=3, circuit_opened=timezone.now()
+        )
+
+        run_polling("AWS", [PollService(services["aws_kafka"], lambda: ["2.8.1"])])
+
+        state = ServicePollState.objects.get(service="aws_kafka")
+        assert not state.circuit_open
+        assert state.failures == 0
+
+
+class ConditionalPollingTestCase(TestCase):
+    url = "https://docs.example.com/versions.html"
+
+    def _poll_fn(self):
+        fetch_page(self.url)
+        return ["1.0"]
+
+    @patch("services.http.get")
+    def test_validators_saved_after_commit(self, mocked_get):
+        mocked_get.return_value = Mock(
+            status_code=200,
+            headers={"ETag": '"abc"', "Last-Modified": "Wed, 01 Jun 2022 10:00:00 GMT"},
+            content=b"<html></html>",
+        )
+
+        run_polling("AWS", [PollService(services["aws_eks"], self._poll_fn)])
+
+        validator = SourceValidator.objects.get(url=self.url)
+        assert validator.etag == '"abc"'
+        assert validator.last_modified == "Wed, 01 Jun 2022 10:00:00 GMT"
+        assert validator.content_length == 13
+
+    @patch("services.http.get")
+    def test_not_modified_skips_diff(self, mocked_get):
+        SourceValidator.objects.create(url=self.url, etag='"abc"', content_length=100)
+        version = VersionFactory(service="aws_eks", version="0.9")
+        mocked_get.return_value = Mock(status_code=304, headers={}, content=b"")
+
+        (poll_service,) = run_polling(
+            "AWS", [PollService(services["aws_eks"], self._poll_fn)]
+        )
+
+        mocked_get.assert_called_once_with(self.url, headers={"If-None-Match": '"abc"'})
+        assert poll_service.not_modified is True
+        assert poll_service.error is None
+        assert poll_service.added_versions == []
+        version.refresh_from_db()
+        assert version.deprecated is None
+
+    @patch("services.tasks.notify_operator")
+    @patch("services.http.get")
+    def test_validators_not_saved_on_error(self, mocked_get, mocked_notify_operator):
+        mocked_get.return_value = Mock(
+            status_code=200, headers={"ETag": '"abc"'}, content=b"<html></html>"
+        )
+
+        def _failing_poll_fn():
+            fetch_page(self.url)
+            raise ScrappingError("Layout changed")
+
+        run_polling("AWS", [PollService(services["aws_eks"], _failing_poll_fn)])
+
+        assert not SourceValidator.objects.filter(url=self.url).exists()
+
+    def _shared_poll_fn(self):
+        fetch_page(self.url)
+        return {"aws_eks": ["1.0"], "aws_kafka": ["2.8.1"]}
+
+    @patch("services.http.get")
+    def test_shared_fetch_validators_saved_after_all_commits(self, mocked_get):
+        mocked_get.return_value = Mock(
+            status_code=200, headers={"ETag": '"abc"'}, content=b"<html></html>"
+        )
+
+        run_polling(
+            "AWS",
+            PollService.for_services(
+                [services["aws_eks"], services["aws_kafka"]], self._shared_poll_fn
+            ),
+        )
+
+        mocked_get.assert_called_once()
+        assert SourceValidator.objects.get(url=self.url).etag == '"abc"'
+
+    @patch("services.tasks.notify_operator")
+    @patch("services.http.get")
+    def test_shared_fetch_validators_not_saved_on_sibling_error(
+        self, mocked_get, mocked_notify_operator
+    ):
+        mocked_get.return_value = Mock(
+            status_code=200, headers={"ETag": '"abc"'}, content=b"<html></html>"
+        )
+        process_versions = PollService.process_versions
+
+        def _failing_process_versions(poll_service, supported_versions):
+            if poll_service.service.name == "aws_kafka":
+                raise ValueError("Diff failed")
+            return process_versions(poll_service, supported_versions)
+
+        with patch.object(
+            PollService,
+            "process_versions",
+            autospec=True,
+            side_effect=_failing_process_versions,
+        ):
+            eks, kafka = run_polling(
+                "AWS",
+                PollService.for_services(
+                    [services["aws_eks"], services["aws_kafka"]], self._shared_poll_fn
+                ),
+            )
+
+        assert eks.error is None
+        assert kafka.error is not None
+        assert not SourceValidator.objects.filter(url=self.url).exists()
+
+
+class AwsPagesTestCase(TestCase):
+    @override_settings(POLLING_AWS_PAGE_SIZE=20)
+    @patch("services.tasks.get_aws_client")
+    def test_all_pages_are_read(self, mocked_get_aws_client):
+        client = mocked_get_aws_client.return_value
+        client.can_paginate.return_value = True
+        client.get_paginator.return_value.paginate.return_value = iter(
+            [
+                {"DBEngineVersions": [{"Engine": "mysql", "EngineVersion": "8.0.28"}]},
+                {"DBEngineVersions": [{"Engine": "mysql", "EngineVersion": "5.7.38"}]},
+            ]
+        )
+
+        poll_service = PollService(
+            services["aws_mysql"], lambda: aws_rds(region_name="eu-west-1")["aws_mysql"]
+        )
+        poll_service.fetch()
+
+        assert poll_service.supported_versions == ["8.0.28", "5.7.38"]
+        assert poll_service.api_pages == 2
+        mocked_get_aws_client.assert_called_once_with("rds", "eu-west-1")
+        client.get_paginator.assert_called_once_with("describe_db_engine_versions")
+        paginate_kwargs = client.get_paginator.return_value.paginate.call_args.kwargs
+        assert paginate_kwargs["PaginationConfig"] == {"PageSize": 20}
+
+    @patch("services.tasks.get_aws_client")
+    def test_next_token_is_followed_without_paginator(self, mocked_get_aws_client):
+        client = mocked_get_aws_client.return_value
+        client.can_paginate.return_value = False
+        client.list_versions.side_effect = [
+            {"Versions": ["OpenSearch_2.3"], "NextToken": "next"},
+            {"Versions": ["OpenSearch_1.3"]},
+        ]
+
+        pages = list(
+            aws_pages("opensearch.list_versions", "opensearch", "list_versions")
+        )
+
+        assert [page["Versions"] for page in pages] == [
+            ["OpenSearch_2.3"],
+            ["OpenSearch_1.3"],
+        ]
+        assert client.list_versions.call_args.kwargs["NextToken"] == "next"
+
+    @override_settings(POLLING_AWS_REGIONS=["eu-west-1", "us-east-1"])
+    @patch("services.tasks.get_aws_client")
+    def test_pages_are_counted_across_regions(self, mocked_get_aws_client):
+        client = mocked_get_aws_client.return_value
+        client.can_paginate.return_value = True
+        client.get_paginator.return_value.paginate.side_effect = lambda **kwargs: iter(
+            [{"KafkaVersions": [{"Version": "2.8.1", "Status": "ACTIVE"}]}] * 3
+        )
+
+        (poll_service,) = [
+            ps for ps in aws_poll_services() if ps.service.name == "aws_kafka"
+        ]
+        poll_service.fetch()
+
+        assert poll_service.supported_versions == ["2.8.1"]
+        assert poll_service.api_pages == 6
+
+
+class MultiServicePollTestCase(TestCase):
+    @override_settings(POLLING_AWS_REGIONS=["eu-west-1", "us-east-1"])
+    @patch("services.tasks.get_aws_client")
+    def test_rds_engines_share_one_call_per_region(self, mocked_get_aws_client):
+        client = mocked_get_aws_client.return_value
+        client.can_paginate.return_value = True
+        client.get_paginator.return_value.paginate.side_effect = lambda **kwargs: iter(
+            [
+                {
+                    "DBEngineVersions": [
+                        {"Engine": "mysql", "EngineVersion": "8.0.28"},
+                        {"Engine": "postgres", "EngineVersion": "14.4"},
+                    ]
+                },
+                {"DBEngineVersions": [{"Engine": "mysql", "EngineVersion": "5.7.38"}]},
+            ]
+        )
+        rds_services = [
+            ps
+            for ps in aws_poll_services()
+            if ps.service.name in ["aws_mysql", "aws_postgres", "aws_oracle_ee"]
+        ]
+
+        mysql, oracle, postgres = sorted(
+            run_polling("AWS", rds_services), key=lambda ps: ps.service.name
+        )
+
+        # one paginated stream per region for all engines
+        assert client.get_paginator.return_value.paginate.call_count == 2
+        paginate_kwargs = client.get_paginator.return_value.paginate.call_args.kwargs
+        assert "mysql" in paginate_kwargs["Filters"][0]["Values"]
+        assert mysql.added_versions == ["8.0.28", "5.7.38"]
+        assert mysql.version_regions == {
+            "8.0.28": ["eu-west-1", "us-east-1"],
+            "5.7.38": ["eu-west-1", "us-east-1"],
+        }
+        assert postgres.added_versions == ["14.4"]
+        assert oracle.supported_versions == []
+        assert oracle.error is None
+
+    def test_service_failures_are_shared(self):
+        poll_fn = Mock(side_effect=ScrappingError("Page changed"))
+
+        with patch("services.tasks.notify_operator"):
+            poll_services = run_polling(
+                "AWS",
+                PollService.for_services(
+                    [services["aws_lambda_python"], services["aws_lambda_ruby"]],
+                    poll_fn,
+                ),
+            )
+
+        poll_fn.assert_called_once()
+        assert all(isinstance(ps.error, ScrappingError) for ps in poll_services)
+
+    @override_settings(POLLING_THREADS=2)
+    def test_shared_fetch_holds_a_single_worker(self):
+        kafka_fetched = threading.Event()
+
+        def _shared_poll_fn():
+            # only returns once kafka got a worker of its own
+            assert kafka_fetched.wait(timeout=2)
+            return {"aws_mysql": ["8.0.28"]}
+
+        def _kafka_poll_fn():
+            kafka_fetched.set()
+            return ["2.8.1"]
+
+        for engine in POLLING_ENGINES:
+            with self.subTest(engine=engine):
+                kafka_fetched.clear()
+                rds_services = PollService.for_services(
+                    [services[name] for name in AWS_RDS_ENGINES.values()],
+                    _shared_poll_fn,
+                )
+
+                poll_services = run_polling(
+                    "AWS",
+                    [*rds_services, PollService(services["aws_kafka"], _kafka_poll_fn)],
+                    engine=engine,
+                )
+
+                assert [ps.error for ps in poll_services] == [None] * 15
+                assert len({ps.host for ps in rds_services}) == 1
+
+
+class GetAwsClientTestCase(SimpleTestCase):
+    def test_clients_are_cached(self):
+        client = get_aws_client("kafka", region_name="eu-central-1")
+
+        assert get_aws_client("kafka", region_name="eu-central-1") is client
+        assert get_aws_client("kafka", region_name="us-east-1") is not client
+        assert get_aws_session() is get_aws_session()
+
+
+def service_account_info():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return {
+        "type": "service_account",
+        "client_email": "poller@project.iam.gserviceaccount.com",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "private_key": private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode(),
+    }
+
+
+@patch("services.tasks._gcp_credentials", None)
+class GetGcpCredentialsTestCase(SimpleTestCase):
+    def setUp(self):
+        patcher = override_settings(
+            GOOGLE_APPLICATION_CREDENTIALS=json.dumps(service_account_info())
+        )
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+    def test_credentials_are_parsed_once(self):
+        credentials = get_gcp_credentials()
+
+        assert get_gcp_credentials() is credentials
+        assert credentials.requires_scopes is False
+
+    @patch("google.oauth2.service_account.Credentials.refresh", autospec=True)
+    def test_token_is_reused_and_fetches_counted(self, mocked_refresh):
+        def refresh(credentials, request):
+            credentials.token = "token"
+            credentials.expiry = timezone.now().replace(tzinfo=None) + timedelta(
+                hours=1
+            )
+
+        mocked_refresh.side_effect = refresh
+
+        def poll_fn():
+            for _ in range(3):
+                get_gcp_credentials().before_request(Mock(), "GET", "url", {})
+            return ["1.24"]
+
+        poll_service = PollService(services["gcp_gke"], poll_fn)
+        poll_service.fetch()
+
+        assert poll_service.supported_versions == ["1.24"]
+        assert poll_service.token_fetches == 1
+        assert mocked_refresh.call_count == 1
+
+
+class GetGcpServiceTestCase(SimpleTestCase):
+    def setUp(self):
+        self.discovery_dir = Path(tempfile.mkdtemp())
+        patcher = patch.dict("services.tasks._gcp_services", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            "services.tasks.get_gcp_credentials", return_value=AnonymousCredentials()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("services.tasks.build")
+    def test_bundled_document_is_used(self, mocked_build):
+        with override_settings(GCP_DISCOVERY_DIR=self.discovery_dir):
+            shutil.copy(
+                Path(discovery_cache.__file__).parent
+                / "documents"
+                / "sqladmin.v1.json",
+                get_gcp_discovery_path("sqladmin", "v1"),
+            )
+
+            sqladmin = get_gcp_service("sqladmin", "v1")
+
+            assert get_gcp_service("sqladmin", "v1") is sqladmin
+        assert (
+            sqladmin.flags().list().uri.startswith("https://sqladmin.googleapis.com/")
+        )
+        mocked_build.assert_not_called()
+
+    @patch("services.tasks.build")
+    def test_library_document_is_used_if_not_bundled(self, mocked_build):
+        with override_settings(GCP_DISCOVERY_DIR=self.discovery_dir):
+            get_gcp_service("sqladmin", "v1")
+            get_gcp_service("sqladmin", "v1")
+
+        mocked_build.assert_called_once()
+        assert mocked_build.call_args.kwargs["static_discovery"] is True
+
+
+class RefreshGcpDiscoveryTestCase(SimpleTestCase):
+    def setUp(self):
+        self.discovery_dir = Path(tempfile.mkdtemp())
+
+    @patch("services.http.get")
+    def test_document_is_saved(self, mocked_get):
+        document = json.dumps({"name": "sqladmin", "revision": "20220101"})
+        mocked_get.return_value = Mock(text=document)
+
+        with override_settings(GCP_DISCOVERY_DIR=self.discovery_dir):
+            call_command("refresh_gcp_discovery", stdout=StringIO())
+
+            assert get_gcp_discovery_path("sqladmin", "v1").read_text() == document
+        assert mocked_get.call_args.args[0] == (
+            "https://sqladmin.googleapis.com/$discovery/rest?version=v1"
+        )
+
+    @patch("services.http.get")
+    def test_unexpected_document_is_not_saved(self, mocked_get):
+        mocked_get.return_value = Mock(text=json.dumps({"name": "other"}))
+
+        with override_settings(GCP_DISCOVERY_DIR=self.discovery_dir):
+            with self.assertRaises(CommandError):
+                call_command("refresh_gcp_discovery", "--api=sqladmin:v1")
+
+            assert not get_gcp_discovery_path("sqladmin", "v1").exists()
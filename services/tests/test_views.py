@@ -0,0 +1,21 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from services.models import VersionRegion
+from services.tests.factories import VersionFactory
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class ServiceDetailViewTestCase(TestCase):
+    def test_regions_are_listed_by_name(self):
+        version = VersionFactory(service="aws_kafka", version="2.8.1")
+        for region in ["us-east-1", "ap-south-1", "eu-west-1"]:
+            VersionRegion.objects.create(version=version, region=region)
+
+        response = self.client.get(
+            reverse("service_detail", kwargs={"service_name": "aws-kafka"})
+        )
+
+        self.assertContains(response, "ap-south-1, eu-west-1, us-east-1")
@@ -1,7 +1,8 @@
 from core.views import BaseView
+from django.db.models import Prefetch
 from django.http import Http404
 
-from services.models import Version
+from services.models import Version, VersionRegion
 
 from .base import services
 
@@ -15,7 +16,13 @@ class ServiceDetailView(BaseView):
             return super().get(
                 request,
                 service=services[service_key],
-                available_versions=list(Version.available([service_key])),
+                available_versions=list(
+                    Version.available([service_key]).prefetch_related(
+                        Prefetch(
+                            "regions", queryset=VersionRegion.objects.order_by("region")
+                        )
+                    )
+                ),
                 unsupported_versions=list(Version.unsupported([service_key])),
                 started_polling=Version.bigbang(service_key),
             )